@@ -9,10 +9,17 @@ __all__ = [
     'setup_mlflow',
     'log_parameters_safe',
     'log_metrics_safe', 
+    'log_step_metrics_safe',
     'log_artifacts_safe',
     'log_directories_safe',
     'log_metrics_files_safe',
+    'upload_artifacts_safe',
+    'log_run_outputs_safe',
     'create_run_context',
+    'async_run_context',
+    'start_child_run',
+    'finish_child_run',
+    'get_batch_logger',
     'get_experiment_info',
     'get_mlflow_server_command'
 ]
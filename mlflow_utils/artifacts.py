@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+"""
+Deduplicating, parallel artifact uploads for the marketing workflow project.
+
+Files are identified by the SHA-256 of their content. The experiment keeps a
+content index (hash -> run and artifact path holding that content) as an
+artifact of a dedicated ``artifact-store`` run. A run uploads only files
+whose content is not in the index yet; the others, typically unchanged
+scripts and reports, are skipped. Every run gets an ``artifact_manifest.json``
+mapping each of its artifact paths to the hash and to the run that stores
+the content, so nothing is lost by skipping. New files go up on a bounded
+thread pool, so end-of-run upload time follows the new bytes, not the total.
+
+The ``artifact-store`` run is tagged ``marketing.artifact_store``; the
+monitor leaves it out of summaries, reports and exports.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Tuple
+
+from .config import ARTIFACT_UPLOAD_WORKERS, ARTIFACT_STORE_RUN_NAME
+
+MANIFEST_FILE = "artifact_manifest.json"
+INDEX_FILE = "content_index.json"
+STORE_TAG = "marketing.artifact_store"
+
+# Content index per experiment, kept for the life of the process
+_indexes = {}
+_index_lock = threading.Lock()
+
+def file_sha256(path: str) -> str:
+    """Return the SHA-256 hex digest of a file, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def collect_files(paths: List[str]) -> List[Tuple[str, str]]:
+    """Expand files and directories into ``(local_path, artifact_path)`` pairs.
+
+    Artifact paths follow ``mlflow.log_artifact``: a file goes to the
+    artifact root, a directory's files go under the directory's name.
+    """
+    files = []
+    for path in paths:
+        if os.path.isfile(path):
+            files.append((path, os.path.basename(path)))
+        elif os.path.isdir(path):
+            root = os.path.basename(os.path.normpath(path))
+            for directory, _, names in os.walk(path):
+                for name in sorted(names):
+                    local = os.path.join(directory, name)
+                    files.append((local, os.path.join(root, os.path.relpath(local, path)).replace(os.sep, "/")))
+    return files
+
+def _store_run_id(client, experiment_id: str) -> str:
+    runs = client.search_runs([experiment_id], filter_string=f"tags.`{STORE_TAG}` = 'true'", max_results=1)
+    if runs:
+        return runs[0].info.run_id
+    run = client.create_run(experiment_id, run_name=ARTIFACT_STORE_RUN_NAME, tags={STORE_TAG: "true"})
+    client.set_terminated(run.info.run_id)
+    return run.info.run_id
+
+def _download_index(client, store_run_id: str) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            path = client.download_artifacts(store_run_id, INDEX_FILE, tmp)
+        except Exception:
+            return {}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+def _log_json(client, run_id: str, name: str, data: Dict[str, Any]):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, name)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        client.log_artifact(run_id, path)
+
+def _content_index(client, experiment_id: str) -> Tuple[str, Dict[str, Any]]:
+    with _index_lock:
+        cached = _indexes.get(experiment_id)
+        if cached is None:
+            store_run_id = _store_run_id(client, experiment_id)
+            cached = _indexes[experiment_id] = (store_run_id, _download_index(client, store_run_id))
+        return cached
+
+def _publish_index(client, experiment_id: str, additions: Dict[str, Any]):
+    with _index_lock:
+        store_run_id, index = _indexes[experiment_id]
+        # Merge with what other processes published since we loaded it
+        index.update(_download_index(client, store_run_id))
+        index.update(additions)
+        _log_json(client, store_run_id, INDEX_FILE, index)
+
+def upload_artifacts(client, run_id: str, paths: List[str], max_workers: int = ARTIFACT_UPLOAD_WORKERS, progress=None) -> Dict[str, float]:
+    """Upload the files under ``paths`` to ``run_id``, skipping content the experiment already stores.
+
+    ``progress(files_done, files_total, bytes_done)`` is called after each
+    upload. Returns file and byte counts and the upload time as metrics.
+    """
+    start = time.perf_counter()
+    files = collect_files(paths)
+    experiment_id = client.get_run(run_id).info.experiment_id
+    _, index = _content_index(client, experiment_id)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="artifact-upload") as pool:
+        hashes = list(pool.map(file_sha256, [local for local, _ in files]))
+
+        manifest = {}
+        uploads = []
+        additions = {}
+        total_bytes = 0
+        for (local, artifact_path), digest in zip(files, hashes):
+            size = os.path.getsize(local)
+            total_bytes += size
+            stored = index.get(digest) or additions.get(digest)
+            if stored is None:
+                stored = additions[digest] = {"run_id": run_id, "path": artifact_path, "bytes": size}
+                uploads.append((local, artifact_path, size, digest))
+            manifest[artifact_path] = {"sha256": digest, "bytes": size, "run_id": stored["run_id"], "path": stored["path"]}
+
+        def upload(local: str, artifact_path: str):
+            directory = os.path.dirname(artifact_path)
+            client.log_artifact(run_id, local, directory or None)
+
+        futures = {pool.submit(upload, local, artifact_path): (size, digest) for local, artifact_path, size, digest in uploads}
+        uploaded_bytes = 0
+        failed = 0
+        for done, future in enumerate(as_completed(futures), 1):
+            size, digest = futures[future]
+            try:
+                future.result()
+                uploaded_bytes += size
+            except Exception as e:
+                failed += 1
+                print(f"Warning: artifact upload failed: {e}")
+                # Neither the index nor the manifest may point at content that is not stored
+                additions.pop(digest, None)
+                manifest = {path: entry for path, entry in manifest.items() if entry["sha256"] != digest or entry["run_id"] != run_id}
+            if progress is not None:
+                progress(done, len(futures), uploaded_bytes)
+
+    if additions:
+        _publish_index(client, experiment_id, additions)
+    if manifest:
+        _log_json(client, run_id, MANIFEST_FILE, manifest)
+
+    return {
+        "artifacts_files_total": len(files),
+        "artifacts_files_uploaded": len(uploads) - failed,
+        "artifacts_files_deduplicated": len(files) - len(uploads),
+        "artifacts_files_failed": failed,
+        "artifacts_bytes_total": total_bytes,
+        "artifacts_bytes_uploaded": uploaded_bytes,
+        "artifacts_bytes_deduplicated": total_bytes - sum(size for _, _, size, _ in uploads),
+        "artifacts_upload_seconds": time.perf_counter() - start,
+    }
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+"""
+Single-file, compressed bundles of a run's outputs.
+
+A bundle is a tar archive in which every member is compressed as its own
+zstd frame (when the ``zstandard`` package is installed) or gzip member.
+Concatenated frames form a valid stream, so ``tar -xzf run_outputs.tar.gz``
+(or ``tar --zstd -xf``) still unpacks the whole bundle, but one file can be
+read by decompressing only its own frame. Before the end of the archive the
+bundle holds ``bundle_index.json``, mapping each path to the byte offset and
+length of its frame; a fixed-size trailer frame that decompresses to nothing
+points at the index, so readers find it with one read from the end.
+
+Uploading one bundle instead of every markdown file and image keeps the
+per-file overhead of the tracking server and artifact volume to one file.
+
+Usage:
+    python -m mlflow_utils.bundle pack run_outputs.tar.gz resources/drafts research_blogs.md
+    python -m mlflow_utils.bundle list run_outputs.tar.gz
+    python -m mlflow_utils.bundle extract run_outputs.tar.gz drafts/post.md -o out/
+"""
+
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import os
+import struct
+import sys
+import tarfile
+from typing import Any, BinaryIO, Dict, List, Optional, Union
+
+from .artifacts import collect_files
+
+try:
+    import zstandard
+except ImportError:  # gzip is always available
+    zstandard = None
+
+INDEX_NAME = "bundle_index.json"
+_TRAILER_MAGIC = b"MKBUNDLE"
+_TRAILER_PAYLOAD = struct.Struct("<8sQQ")
+# Where the payload starts in the trailer frame of each codec
+_TRAILER_PAYLOAD_START = {"zstd": 8, "gzip": 16}
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_ZSTD_SKIPPABLE_MAGIC = 0x184D2A50
+_GZIP_MAGIC = b"\x1f\x8b"
+
+def default_codec() -> str:
+    """Return ``"zstd"`` when zstandard is installed, else ``"gzip"``."""
+    return "zstd" if zstandard is not None else "gzip"
+
+def bundle_suffix(codec: str) -> str:
+    return ".tar.zst" if codec == "zstd" else ".tar.gz"
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+def _decompress(frame: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Reading zstd bundles requires the zstandard package")
+        return zstandard.ZstdDecompressor().decompress(frame)
+    return gzip.decompress(frame)
+
+def _trailer(codec: str, offset: int, length: int) -> bytes:
+    """A frame that decompresses to nothing and records where the index frame is."""
+    payload = _TRAILER_PAYLOAD.pack(_TRAILER_MAGIC, offset, length)
+    if codec == "zstd":
+        return struct.pack("<II", _ZSTD_SKIPPABLE_MAGIC, len(payload)) + payload
+    # Empty gzip member carrying the payload in its FEXTRA field
+    extra = b"MK" + struct.pack("<H", len(payload)) + payload
+    header = _GZIP_MAGIC + b"\x08\x04" + b"\x00" * 4 + b"\x00\xff" + struct.pack("<H", len(extra)) + extra
+    return header + b"\x03\x00" + struct.pack("<II", 0, 0)
+
+def _trailer_size(codec: str) -> int:
+    return len(_trailer(codec, 0, 0))
+
+def _tar_member(name: str, data: bytes, mtime: float = 0) -> bytes:
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = int(mtime)
+    info.mode = 0o644
+    padding = -len(data) % tarfile.BLOCKSIZE
+    return info.tobuf(tarfile.PAX_FORMAT, "utf-8", "surrogateescape") + data + b"\0" * padding
+
+def pack_bundle(paths: List[str], destination: str, codec: Optional[str] = None) -> Dict[str, Any]:
+    """Pack the files under ``paths`` into a bundle at ``destination`` and return its index.
+
+    Artifact paths inside the bundle follow ``mlflow.log_artifact``, as in
+    ``mlflow_utils.artifacts.collect_files``.
+    """
+    codec = codec or default_codec()
+    if codec == "zstd" and zstandard is None:
+        raise RuntimeError("zstd bundles require the zstandard package")
+    files = {}
+    offset = 0
+    with open(destination, "wb") as out:
+        def write(frame: bytes) -> int:
+            nonlocal offset
+            out.write(frame)
+            start, offset = offset, offset + len(frame)
+            return start
+
+        for local, artifact_path in collect_files(paths):
+            with open(local, "rb") as f:
+                data = f.read()
+            frame = _compress(_tar_member(artifact_path, data, os.path.getmtime(local)), codec)
+            files[artifact_path] = {
+                "offset": write(frame),
+                "length": len(frame),
+                "size": len(data),
+                "sha256": hashlib.sha256(data).hexdigest(),
+            }
+
+        index = {"codec": codec, "files": files}
+        frame = _compress(_tar_member(INDEX_NAME, json.dumps(index, sort_keys=True).encode("utf-8")), codec)
+        index_offset = write(frame)
+        write(_compress(b"\0" * 2 * tarfile.BLOCKSIZE, codec))
+        write(_trailer(codec, index_offset, len(frame)))
+    return index
+
+class BundleReader:
+    """Random access to the files of a bundle, decompressing only the frames read."""
+
+    def __init__(self, source: Union[str, BinaryIO]):
+        self._file = open(source, "rb") if isinstance(source, (str, os.PathLike)) else source
+        self._owned = isinstance(source, (str, os.PathLike))
+        self._file.seek(0)
+        magic = self._file.read(4)
+        if magic == _ZSTD_MAGIC:
+            self.codec = "zstd"
+        elif magic[:2] == _GZIP_MAGIC:
+            self.codec = "gzip"
+        else:
+            raise ValueError("Not a bundle: unknown compression")
+
+        size = _trailer_size(self.codec)
+        self._file.seek(-size, os.SEEK_END)
+        trailer = self._file.read(size)
+        start = _TRAILER_PAYLOAD_START[self.codec]
+        magic, offset, length = _TRAILER_PAYLOAD.unpack(trailer[start:start + _TRAILER_PAYLOAD.size])
+        if magic != _TRAILER_MAGIC:
+            raise ValueError("Not a bundle: index trailer missing")
+        self.index = json.loads(self._read_member(offset, length))
+        self.files: Dict[str, Dict[str, Any]] = self.index["files"]
+
+    def _read_member(self, offset: int, length: int) -> bytes:
+        self._file.seek(offset)
+        block = _decompress(self._file.read(length), self.codec)
+        with tarfile.open(fileobj=io.BytesIO(block), mode="r:") as tar:
+            member = tar.next()
+            return tar.extractfile(member).read()
+
+    def names(self) -> List[str]:
+        return list(self.files)
+
+    def read(self, name: str, verify: bool = True) -> bytes:
+        """Return the content of ``name``, checked against its recorded hash."""
+        entry = self.files.get(name)
+        if entry is None:
+            raise KeyError(f"{name} is not in the bundle")
+        data = self._read_member(entry["offset"], entry["length"])
+        if verify and hashlib.sha256(data).hexdigest() != entry["sha256"]:
+            raise ValueError(f"{name} is corrupt: content hash mismatch")
+        return data
+
+    def extract(self, name: str, destination: str = ".") -> str:
+        """Write ``name`` under ``destination`` and return the written path."""
+        path = os.path.join(destination, *name.split("/"))
+        if os.path.commonpath([os.path.abspath(destination), os.path.abspath(path)]) != os.path.abspath(destination):
+            raise ValueError(f"Refusing to extract {name} outside {destination}")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(self.read(name))
+        return path
+
+    def close(self):
+        if self._owned:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point for packing, listing and extracting bundles."""
+    parser = argparse.ArgumentParser(description="Pack or read single-file artifact bundles")
+    commands = parser.add_subparsers(dest="command", required=True)
+    pack = commands.add_parser("pack", help="Pack files and directories into a bundle")
+    pack.add_argument("bundle")
+    pack.add_argument("paths", nargs="+")
+    pack.add_argument("--codec", choices=["zstd", "gzip"], default=None)
+    listing = commands.add_parser("list", help="List the files in a bundle")
+    listing.add_argument("bundle")
+    extract = commands.add_parser("extract", help="Extract files from a bundle")
+    extract.add_argument("bundle")
+    extract.add_argument("names", nargs="*", help="Files to extract (default: all)")
+    extract.add_argument("-o", "--output", default=".")
+    args = parser.parse_args(argv)
+
+    if args.command == "pack":
+        index = pack_bundle(args.paths, args.bundle, args.codec)
+        print(f"Packed {len(index['files'])} files into {args.bundle} ({index['codec']}, {os.path.getsize(args.bundle)} bytes)")
+        return 0
+    with BundleReader(args.bundle) as reader:
+        if args.command == "list":
+            for name, entry in reader.files.items():
+                print(f"{entry['size']:>10}  {entry['length']:>10}  {name}")
+            return 0
+        for name in args.names or reader.names():
+            print(reader.extract(name, args.output))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
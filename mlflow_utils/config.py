@@ -22,6 +22,20 @@ MLFLOW_PORT = 5001
 # Experiment Settings
 DEFAULT_RUN_NAME = "crewai_deep_technical_analysis"
 
+# Batch Logging: metrics, params and tags are buffered and sent with
+# MlflowClient.log_batch when this many are pending or this often
+MLFLOW_BATCH_FLUSH_SIZE = 1000
+MLFLOW_BATCH_FLUSH_SECONDS = 5.0
+MLFLOW_BATCH_MAX_RETRIES = 3
+
+# Artifact Uploads: new content is uploaded on this many threads; the
+# experiment's content index lives in a run with this name
+ARTIFACT_UPLOAD_WORKERS = 8
+ARTIFACT_STORE_RUN_NAME = "artifact-store"
+
+# Local mirror of finished runs used by the monitor (relative to the working directory)
+RUN_MIRROR_PATH = os.path.join(".cache", "mlflow", "runs.sqlite")
+
 # Artifact Paths
 ARTIFACT_PATHS = [
     "research_market_analysis.md",
@@ -45,6 +59,9 @@ DIRECTORY_PATHS = [
     "resources/images"
 ]
 
+# Single-artifact bundle of the paths above (suffix added per codec)
+BUNDLE_PATH = "resources/outputs/run_outputs"
+
 def get_mlflow_server_command():
     """Get the command to start MLflow server."""
     return [
@@ -6,12 +6,20 @@ Comprehensive metrics calculation and analysis for content quality, technical de
 
 import os
 import re
+import sys
 import json
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any
 import mlflow
 
+if __name__ == "__main__" and not __package__:
+    # Run as a script: import through the package so relative imports resolve
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    __package__ = "mlflow_utils"
+
+from .utils import get_batch_logger
+
 class ResearchScientistMetricsAnalyzer:
     """Analyzes metrics for AI/ML Research Scientist content generation"""
     
@@ -356,23 +364,24 @@ class ResearchScientistMetricsAnalyzer:
             for metric_name, value in category_metrics.items():
                 flat_metrics[f"{category}_{metric_name}"] = value
         
-        # Log all metrics
-        for metric_name, value in flat_metrics.items():
-            if isinstance(value, (int, float)):
-                mlflow.log_metric(metric_name, value)
+        # Numeric metrics only
+        batch = {metric_name: value for metric_name, value in flat_metrics.items() if isinstance(value, (int, float))}
+        
+        # Summary metrics
+        batch["overall_content_quality_score"] = (
+            metrics["quality_metrics"]["technical_depth_score"] + 
+            metrics["quality_metrics"]["research_credibility_score"]) / 2
         
-        # Log summary metrics
-        mlflow.log_metric("overall_content_quality_score", 
-                         (metrics["quality_metrics"]["technical_depth_score"] + 
-                          metrics["quality_metrics"]["research_credibility_score"]) / 2)
+        batch["overall_business_impact_score"] = (
+            metrics["business_impact"]["target_audience_relevance"] + 
+            metrics["business_impact"]["thought_leadership_potential"]) / 2
         
-        mlflow.log_metric("overall_business_impact_score",
-                         (metrics["business_impact"]["target_audience_relevance"] + 
-                          metrics["business_impact"]["thought_leadership_potential"]) / 2)
+        batch["overall_engagement_score"] = (
+            metrics["engagement_metrics"]["hashtag_optimization_score"] + 
+            metrics["engagement_metrics"]["content_shareability_score"]) / 2
         
-        mlflow.log_metric("overall_engagement_score",
-                         (metrics["engagement_metrics"]["hashtag_optimization_score"] + 
-                          metrics["engagement_metrics"]["content_shareability_score"]) / 2)
+        # Buffered and sent with log_batch instead of one request per metric
+        get_batch_logger().log_metrics(batch)
 
 def main():
     """Main function to demonstrate metrics analysis"""
@@ -5,10 +5,18 @@ Comprehensive dashboard for analyzing system performance, content quality, and b
 """
 
 import os
+import sys
 import json
 from datetime import datetime
-from metrics_analyzer import ResearchScientistMetricsAnalyzer
-from mlflow_monitor import CrewAIMLflowMonitor
+from pathlib import Path
+
+if __name__ == "__main__" and not __package__:
+    # Run as a script: import through the package so relative imports resolve
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    __package__ = "mlflow_utils"
+
+from .metrics_analyzer import ResearchScientistMetricsAnalyzer
+from .mlflow_monitor import CrewAIMLflowMonitor
 
 class ResearchScientistMetricsDashboard:
     """Dashboard for AI/ML Research Scientist metrics analysis"""
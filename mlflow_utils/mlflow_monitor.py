@@ -9,19 +9,37 @@ import mlflow.tracking
 from mlflow.tracking import MlflowClient
 import pandas as pd
 from datetime import datetime
+from itertools import islice
 import json
 import os
+import sys
 from pathlib import Path
 
+if __name__ == "__main__" and not __package__:
+    # Run as a script: import through the package so relative imports resolve
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    __package__ = "mlflow_utils"
+
+from .artifacts import STORE_TAG
+from .config import RUN_MIRROR_PATH
+from .run_cache import RunMirror, iter_runs
+from .run_export import export_runs
+
 class CrewAIMLflowMonitor:
     """MLflow monitoring class for CrewAI experiments"""
     
-    def __init__(self, tracking_uri="http://localhost:5001"):
-        """Initialize MLflow monitor"""
+    def __init__(self, tracking_uri="http://localhost:5001", mirror_path=RUN_MIRROR_PATH):
+        """Initialize MLflow monitor
+
+        Finished runs are mirrored in a local SQLite file at ``mirror_path``
+        so summaries only fetch new and active runs; ``None`` disables it.
+        """
         self.tracking_uri = tracking_uri
         mlflow.set_tracking_uri(tracking_uri)
         self.client = MlflowClient()
         self.experiment_name = "ai-ml-research-scientist-marketing"
+        self.mirror_path = mirror_path
+        self._mirror = None
         
         # Ensure experiment exists
         try:
@@ -44,15 +62,13 @@ class CrewAIMLflowMonitor:
             # Log parameters
             mlflow.log_params(inputs)
             
-            # Log metrics
-            if metrics:
-                for key, value in metrics.items():
-                    mlflow.log_metric(key, value)
-            
-            # Log execution metrics
-            mlflow.log_metric("execution_timestamp", datetime.now().timestamp())
-            mlflow.log_metric("total_inputs", len(inputs))
-            mlflow.log_metric("total_outputs", len(outputs) if outputs else 0)
+            # Log metrics and execution metrics in one log_batch request
+            mlflow.log_metrics({
+                **(metrics or {}),
+                "execution_timestamp": datetime.now().timestamp(),
+                "total_inputs": len(inputs),
+                "total_outputs": len(outputs) if outputs else 0,
+            })
             
             # Log artifacts
             if artifacts:
@@ -67,33 +83,68 @@ class CrewAIMLflowMonitor:
             
             return run.info.run_id
     
-    def get_experiment_summary(self):
-        """Get summary of all experiments"""
+    @staticmethod
+    def _epoch_ms(value):
+        if isinstance(value, datetime):
+            return int(value.timestamp() * 1000)
+        return value
+    
+    @property
+    def mirror(self):
+        """The local mirror of finished runs, or ``None`` when disabled"""
+        if self._mirror is None and self.mirror_path and self.experiment_id is not None:
+            self._mirror = RunMirror(self.client, self.experiment_id, self.mirror_path)
+        return self._mirror
+    
+    def iter_runs(self, filter_string=None, start_time=None, end_time=None):
+        """Yield the experiment's runs, newest first, without loading them all at once
+        
+        ``filter_string`` uses MLflow search syntax; ``start_time`` and
+        ``end_time`` (datetimes or epoch milliseconds) bound the run start
+        time. With the mirror, only new and active runs are fetched from the
+        server; without it, pages are streamed with the filter pushed down.
+        The bookkeeping run holding the artifact content index is skipped.
+        """
+        if self.experiment_id is None:
+            return
+        start_time, end_time = self._epoch_ms(start_time), self._epoch_ms(end_time)
+        if self.mirror is not None:
+            runs = self.mirror.iter_runs(filter_string, start_time, end_time)
+        else:
+            runs = iter_runs(self.client, [self.experiment_id], filter_string, start_time, end_time)
+        for run in runs:
+            if run.data.tags.get(STORE_TAG) != "true":
+                yield run
+    
+    @staticmethod
+    def _run_info(run):
+        return {
+            "run_id": run.info.run_id,
+            "run_name": run.data.tags.get("mlflow.runName", "Unknown"),
+            "start_time": datetime.fromtimestamp(run.info.start_time / 1000).strftime("%Y-%m-%d %H:%M:%S"),
+            "status": run.info.status,
+            "metrics": dict(run.data.metrics),
+            "params": dict(run.data.params)
+        }
+    
+    def get_experiment_summary(self, filter_string=None, start_time=None, end_time=None, max_runs=None):
+        """Get summary of all experiments
+        
+        Runs come from ``iter_runs``; ``max_runs`` keeps only the newest ones.
+        """
         if self.experiment_id is None:
             return "MLflow server not available"
-            
-        runs = self.client.search_runs(
-            experiment_ids=[self.experiment_id],
-            order_by=["attributes.start_time DESC"]
-        )
+        
+        runs = self.iter_runs(filter_string, start_time, end_time)
+        kept = [self._run_info(run) for run in islice(runs, max_runs)]
         
         summary = {
-            "total_runs": len(runs),
+            # Runs beyond max_runs are counted, not kept
+            "total_runs": len(kept) + sum(1 for _ in runs),
             "experiment_name": self.experiment_name,
-            "runs": []
+            "runs": kept
         }
         
-        for run in runs:
-            run_info = {
-                "run_id": run.info.run_id,
-                "run_name": run.data.tags.get("mlflow.runName", "Unknown"),
-                "start_time": datetime.fromtimestamp(run.info.start_time / 1000).strftime("%Y-%m-%d %H:%M:%S"),
-                "status": run.info.status,
-                "metrics": dict(run.data.metrics),
-                "params": dict(run.data.params)
-            }
-            summary["runs"].append(run_info)
-        
         return summary
     
     def export_experiment_data(self, output_file="mlflow_experiment_data.json"):
@@ -106,9 +157,20 @@ class CrewAIMLflowMonitor:
         print(f"📊 Experiment data exported to {output_file}")
         return output_file
     
+    def export_experiment_columnar(self, output_dir="mlflow_experiment_data", format="parquet"):
+        """Append finished runs not exported yet to a columnar Parquet/Arrow dataset
+        
+        One row per run with metric and parameter columns; long parameter
+        values are deduplicated into a side table (see ``mlflow_utils.run_export``).
+        """
+        counts = export_runs(self.iter_runs(), output_dir, format=format)
+        print(f"📊 Exported {counts['runs_exported']} new runs to {output_dir} "
+              f"({counts['runs_skipped_existing']} already exported, {counts['runs_skipped_active']} still active)")
+        return counts
+    
     def create_experiment_report(self, output_file="mlflow_experiment_report.md"):
         """Create a markdown report of experiments"""
-        summary = self.get_experiment_summary()
+        summary = self.get_experiment_summary(max_runs=10)
         
         if isinstance(summary, str):
             report_content = f"# MLflow Experiment Report\n\n{summary}"
@@ -160,6 +222,7 @@ def main():
     
     # Export data
     monitor.export_experiment_data()
+    monitor.export_experiment_columnar()
     monitor.create_experiment_report()
     
     print("\n✅ MLflow monitoring complete!")
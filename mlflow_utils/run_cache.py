@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+"""
+Paginated run iteration with a local SQLite mirror of finished runs.
+
+``iter_runs`` walks ``MlflowClient.search_runs`` page by page, with filters
+and start-time windows pushed down to the tracking server, so memory stays
+bounded by the page size however large the experiment grows.
+
+``RunMirror`` keeps a local copy of every run in a terminal state
+(FINISHED, FAILED, KILLED); such runs never change, so they are fetched
+once. Each sync asks the server only for runs started since the last sync
+and for runs that were still active then. Iterating a mirrored experiment
+then reads finished runs from SQLite and only the active ones from the
+server's latest answer. Deleting a run on the server does not remove it
+from the mirror; delete the mirror file to rebuild it.
+"""
+
+import heapq
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterator, List, Optional
+
+from .config import RUN_MIRROR_PATH
+
+DEFAULT_PAGE_SIZE = 500
+TERMINAL_STATUSES = ("FINISHED", "FAILED", "KILLED")
+# run_id IN (...) lists are sent in chunks of this size
+_ID_CHUNK = 100
+
+def _window_filter(filter_string: Optional[str], start_time: Optional[int], end_time: Optional[int]) -> str:
+    """Combine ``filter_string`` with a start-time window given in epoch milliseconds."""
+    clauses = [filter_string] if filter_string else []
+    if start_time is not None:
+        clauses.append(f"attributes.start_time >= {int(start_time)}")
+    if end_time is not None:
+        clauses.append(f"attributes.start_time < {int(end_time)}")
+    return " AND ".join(clauses)
+
+def iter_runs(
+    client,
+    experiment_ids: List[str],
+    filter_string: Optional[str] = None,
+    start_time: Optional[int] = None,
+    end_time: Optional[int] = None,
+    order_by: Optional[List[str]] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> Iterator[Any]:
+    """Yield the matching runs one page at a time, following the server's page tokens."""
+    token = None
+    while True:
+        page = client.search_runs(
+            experiment_ids=experiment_ids,
+            filter_string=_window_filter(filter_string, start_time, end_time),
+            order_by=order_by or ["attributes.start_time DESC"],
+            max_results=page_size,
+            page_token=token,
+        )
+        yield from page
+        token = page.token
+        if not token:
+            return
+
+class RunMirror:
+    """SQLite copy of an experiment's terminal-state runs."""
+
+    def __init__(self, client, experiment_id: str, path: str = RUN_MIRROR_PATH, page_size: int = DEFAULT_PAGE_SIZE):
+        self.client = client
+        self.experiment_id = experiment_id
+        self.page_size = page_size
+        # Runs from different tracking servers must not mix
+        self.scope = f"{client.tracking_uri}#{experiment_id}"
+        self.active: Dict[str, Any] = {}
+        self.fetched = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS runs (
+                scope TEXT NOT NULL,
+                run_id TEXT NOT NULL,
+                start_time INTEGER NOT NULL,
+                proto BLOB NOT NULL,
+                PRIMARY KEY (scope, run_id)
+            );
+            CREATE INDEX IF NOT EXISTS runs_by_start ON runs (scope, start_time);
+            CREATE TABLE IF NOT EXISTS sync_state (
+                scope TEXT PRIMARY KEY,
+                max_start_time INTEGER NOT NULL,
+                active_run_ids TEXT NOT NULL
+            );
+            """
+        )
+
+    def _state(self):
+        row = self._conn.execute("SELECT max_start_time, active_run_ids FROM sync_state WHERE scope = ?", (self.scope,)).fetchone()
+        return (row[0], json.loads(row[1])) if row else (None, [])
+
+    def _absorb(self, runs) -> int:
+        """Store terminal runs, remember active ones; return the latest start time seen."""
+        latest = 0
+        rows = []
+        for run in runs:
+            self.fetched += 1
+            latest = max(latest, run.info.start_time or 0)
+            if run.info.status in TERMINAL_STATUSES:
+                self.active.pop(run.info.run_id, None)
+                rows.append((self.scope, run.info.run_id, run.info.start_time or 0, run.to_proto().SerializeToString()))
+            else:
+                self.active[run.info.run_id] = run
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?)", rows)
+        return latest
+
+    def sync(self) -> int:
+        """Fetch runs started since the last sync and runs that were active then; return how many were fetched."""
+        self.fetched = 0
+        max_start_time, active_ids = self._state()
+        self.active = {}
+        latest = max_start_time or 0
+
+        # Runs active at the last sync: finished since, or still active
+        for start in range(0, len(active_ids), _ID_CHUNK):
+            ids = ", ".join(f"'{run_id}'" for run_id in active_ids[start:start + _ID_CHUNK])
+            page = iter_runs(self.client, [self.experiment_id], f"attributes.run_id IN ({ids})", page_size=self.page_size)
+            latest = max(latest, self._absorb(page))
+
+        # Runs started since the last sync; >= because start times are only millisecond precise
+        pages = iter_runs(
+            self.client, [self.experiment_id], start_time=max_start_time,
+            order_by=["attributes.start_time ASC"], page_size=self.page_size,
+        )
+        batch = []
+        for run in pages:
+            batch.append(run)
+            if len(batch) == self.page_size:
+                latest = max(latest, self._absorb(batch))
+                batch = []
+        latest = max(latest, self._absorb(batch))
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)",
+                (self.scope, latest, json.dumps(sorted(self.active))),
+            )
+        return self.fetched
+
+    def iter_runs(
+        self,
+        filter_string: Optional[str] = None,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        sync: bool = True,
+    ) -> Iterator[Any]:
+        """Yield mirrored and active runs, newest first, matching ``filter_string`` and the time window.
+
+        The window is applied in SQLite; ``filter_string`` is evaluated with
+        MLflow's own search semantics on each chunk of runs.
+        """
+        from mlflow.entities import Run
+        from mlflow.protos.service_pb2 import Run as RunProto
+        from mlflow.utils.search_utils import SearchUtils
+
+        if sync:
+            self.sync()
+
+        def in_window(run) -> bool:
+            started = run.info.start_time or 0
+            return (start_time is None or started >= start_time) and (end_time is None or started < end_time)
+
+        def mirrored() -> Iterator[Any]:
+            query = "SELECT proto FROM runs WHERE scope = ?"
+            arguments: List[Any] = [self.scope]
+            if start_time is not None:
+                query += " AND start_time >= ?"
+                arguments.append(int(start_time))
+            if end_time is not None:
+                query += " AND start_time < ?"
+                arguments.append(int(end_time))
+            with self._lock:
+                rows = self._conn.execute(query + " ORDER BY start_time DESC", arguments)
+            while True:
+                with self._lock:
+                    chunk = rows.fetchmany(self.page_size)
+                if not chunk:
+                    return
+                runs = [Run.from_proto(RunProto.FromString(proto)) for proto, in chunk]
+                yield from (SearchUtils.filter(runs, filter_string) if filter_string else runs)
+
+        active = [run for run in self.active.values() if in_window(run)]
+        if filter_string:
+            active = SearchUtils.filter(active, filter_string)
+        active.sort(key=lambda run: -(run.info.start_time or 0))
+        yield from heapq.merge(active, mirrored(), key=lambda run: -(run.info.start_time or 0))
+
+    def count(self) -> int:
+        """Number of runs in the mirror plus the runs active at the last sync."""
+        with self._lock:
+            mirrored = self._conn.execute("SELECT COUNT(*) FROM runs WHERE scope = ?", (self.scope,)).fetchone()[0]
+        return mirrored + len(self.active)
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+"""
+Columnar export of experiment runs to Parquet or Arrow IPC.
+
+Runs are written as a flat table, one row per run: ``run_id``, ``run_name``,
+``status``, ``start_time`` and ``end_time``, then one ``params.<name>``
+column per parameter and one ``metrics.<name>`` column per metric. Parameter
+values longer than ``LONG_PARAM_LENGTH`` characters (the multi-kilobyte
+``user_projects`` profile, for instance) are stored once in a
+``long_params`` side table keyed by their SHA-256; the run gets the hash in
+a ``params_hash.<name>`` column instead, so a ``params.<name>`` cell always
+holds a real value and only hashed cells need the join.
+
+Exports append: each one writes new part files for runs not exported
+before, and only runs in a terminal state are exported, so a row never
+needs rewriting. Runs are streamed and written in batches, so memory is
+bounded by the batch size. Layout::
+
+    <output_dir>/runs/part-<timestamp>-<id>-<n>.parquet
+    <output_dir>/long_params/part-<timestamp>-<id>-<n>.parquet   (param_hash, key, value)
+
+Parts written at different times may have different metric and parameter
+columns; ``load_runs`` unifies them, as does DuckDB with
+``read_parquet('<output_dir>/runs/*.parquet', union_by_name = true)``.
+"""
+
+import hashlib
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Set
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+LONG_PARAM_LENGTH = 256
+DEFAULT_BATCH_SIZE = 1000
+TERMINAL_STATUSES = ("FINISHED", "FAILED", "KILLED")
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+_RUN_FIELDS = [
+    pa.field("run_id", pa.string()),
+    pa.field("run_name", pa.string()),
+    pa.field("status", pa.string()),
+    pa.field("start_time", pa.timestamp("ms")),
+    pa.field("end_time", pa.timestamp("ms")),
+]
+_LONG_PARAM_SCHEMA = pa.schema([
+    pa.field("param_hash", pa.string()),
+    pa.field("key", pa.string()),
+    pa.field("value", pa.string()),
+])
+
+def _parts(directory: str, format: str) -> List[str]:
+    if not os.path.isdir(directory):
+        return []
+    suffix = FORMATS[format]
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(suffix))
+
+def _read_column(directory: str, column: str, format: str) -> Set[str]:
+    """Return the values of one column across all part files."""
+    files = _parts(directory, format)
+    if not files:
+        return set()
+    table = ds.dataset(files, format="parquet" if format == "parquet" else "ipc").to_table(columns=[column])
+    return set(table.column(column).to_pylist())
+
+def _write_part(table: pa.Table, directory: str, name: str, format: str) -> str:
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name + FORMATS[format])
+    tmp_path = path + ".tmp"
+    if format == "parquet":
+        pq.write_table(table, tmp_path, compression="zstd")
+    else:
+        with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema, options=pa.ipc.IpcWriteOptions(compression="zstd")) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    return path
+
+def export_runs(
+    runs: Iterable[Any],
+    output_dir: str,
+    format: str = "parquet",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    long_param_length: int = LONG_PARAM_LENGTH,
+) -> Dict[str, int]:
+    """Append the terminal-state ``runs`` not exported yet to ``output_dir``; return counts."""
+    if format not in FORMATS:
+        raise ValueError(f"Unknown export format '{format}', expected one of {', '.join(FORMATS)}")
+    runs_dir = os.path.join(output_dir, "runs")
+    params_dir = os.path.join(output_dir, "long_params")
+    exported = _read_column(runs_dir, "run_id", format)
+    known_hashes = _read_column(params_dir, "param_hash", format)
+    # Unique per export, so part files of concurrent or quick successive exports never collide
+    stamp = f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    counts = {"runs_exported": 0, "runs_skipped_existing": 0, "runs_skipped_active": 0, "long_params_exported": 0, "parts_written": 0}
+
+    rows: List[Dict[str, Any]] = []
+    long_params: List[Dict[str, str]] = []
+
+    def flush():
+        if not rows:
+            return
+        params = sorted({key for row in rows for key in row if key.startswith(("params.", "params_hash."))})
+        metrics = sorted({key for row in rows for key in row if key.startswith("metrics.")})
+        schema = pa.schema(_RUN_FIELDS + [pa.field(key, pa.string()) for key in params] + [pa.field(key, pa.float64()) for key in metrics])
+        part = f"part-{stamp}-{counts['parts_written']:05d}"
+        # Values first: a crash in between leaves hashes no run refers to yet,
+        # which the next export skips, rather than runs whose values are lost
+        if long_params:
+            _write_part(pa.Table.from_pylist(long_params, schema=_LONG_PARAM_SCHEMA), params_dir, part, format)
+        _write_part(pa.Table.from_pylist(rows, schema=schema), runs_dir, part, format)
+        counts["parts_written"] += 1
+        rows.clear()
+        long_params.clear()
+
+    for run in runs:
+        if run.info.run_id in exported:
+            counts["runs_skipped_existing"] += 1
+            continue
+        if run.info.status not in TERMINAL_STATUSES:
+            # Exported once finished, so rows never change
+            counts["runs_skipped_active"] += 1
+            continue
+        row = {
+            "run_id": run.info.run_id,
+            "run_name": run.data.tags.get("mlflow.runName"),
+            "status": run.info.status,
+            # Epoch milliseconds, stored as timestamp[ms]
+            "start_time": run.info.start_time or None,
+            "end_time": run.info.end_time or None,
+        }
+        for key, value in run.data.params.items():
+            if len(value) > long_param_length:
+                digest = hashlib.sha256(value.encode("utf-8")).hexdigest()
+                if digest not in known_hashes:
+                    known_hashes.add(digest)
+                    long_params.append({"param_hash": digest, "key": key, "value": value})
+                    counts["long_params_exported"] += 1
+                row[f"params_hash.{key}"] = digest
+            else:
+                row[f"params.{key}"] = value
+        for key, value in run.data.metrics.items():
+            row[f"metrics.{key}"] = float(value)
+        rows.append(row)
+        exported.add(run.info.run_id)
+        counts["runs_exported"] += 1
+        if len(rows) >= batch_size:
+            flush()
+    flush()
+    return counts
+
+def _load(directory: str, format: str) -> pa.Table:
+    files = _parts(directory, format)
+    if not files:
+        return pa.table({})
+    file_format = "parquet" if format == "parquet" else "ipc"
+    schema = pa.unify_schemas([ds.dataset(path, format=file_format).schema for path in files])
+    return ds.dataset(files, schema=schema, format=file_format).to_table()
+
+def load_runs(output_dir: str, format: str = "parquet") -> pa.Table:
+    """Load every exported run into one table, with missing columns as nulls."""
+    return _load(os.path.join(output_dir, "runs"), format)
+
+def load_long_params(output_dir: str, format: str = "parquet") -> pa.Table:
+    """Load the ``(param_hash, key, value)`` side table of long parameter values."""
+    return _load(os.path.join(output_dir, "long_params"), format)
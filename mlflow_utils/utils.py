@@ -3,8 +3,12 @@
 Utility functions for MLflow operations in the marketing workflow project.
 """
 
-import mlflow
+import atexit
 import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, List
@@ -15,75 +19,454 @@ from .config import (
     ARTIFACT_PATHS, 
     DIRECTORY_PATHS,
     METRICS_FILES,
-    DEFAULT_RUN_NAME
+    BUNDLE_PATH,
+    DEFAULT_RUN_NAME,
+    MLFLOW_BATCH_FLUSH_SIZE,
+    MLFLOW_BATCH_FLUSH_SECONDS,
+    MLFLOW_BATCH_MAX_RETRIES
 )
 
+# Tracking server limits on a single log_batch request
+MAX_METRICS_PER_BATCH = 1000
+MAX_PARAMS_PER_BATCH = 100
+MAX_TAGS_PER_BATCH = 100
+MAX_ENTITIES_PER_BATCH = 1000
+MAX_PARAM_VALUE_LENGTH = 6000
+# MLflow error codes worth retrying; other errors with a code are permanent
+_TRANSIENT_ERROR_CODES = {"INTERNAL_ERROR", "TEMPORARILY_UNAVAILABLE", "REQUEST_LIMIT_EXCEEDED"}
+
+_mlflow_ready = False
+# Set while an AsyncRunLogger is active; the *_safe functions then enqueue
+_async_logger = None
+
+def _mlflow():
+    """Import MLflow and connect to the tracking server on first use.
+
+    Importing mlflow and resolving the experiment takes seconds, so it is
+    deferred until something is actually logged.
+    """
+    import mlflow
+    if not _mlflow_ready:
+        setup_mlflow()
+    return mlflow
+
 def setup_mlflow():
     """Setup MLflow tracking and experiment."""
+    global _mlflow_ready
+    import mlflow
     mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
     mlflow.set_experiment(MLFLOW_EXPERIMENT_NAME)
+    _mlflow_ready = True
 
 def log_parameters_safe(params: Dict[str, Any]):
-    """Safely log parameters to MLflow."""
+    """Safely log parameters to MLflow (buffered, see ``BatchLogger``)."""
+    if _async_logger is not None:
+        _async_logger.log_params(params)
+        return
     try:
-        mlflow.log_params(params)
+        _mlflow()
+        get_batch_logger().log_params(params)
     except Exception as e:
         print(f"Warning: MLflow parameter logging failed: {e}")
 
 def log_metrics_safe(metrics: Dict[str, Any]):
-    """Safely log metrics to MLflow."""
+    """Safely log metrics to MLflow (buffered, see ``BatchLogger``)."""
+    if _async_logger is not None:
+        _async_logger.log_metrics(metrics)
+        return
     try:
-        for key, value in metrics.items():
-            mlflow.log_metric(key, value)
+        _mlflow()
+        get_batch_logger().log_metrics(metrics)
     except Exception as e:
         print(f"Warning: MLflow metrics logging failed: {e}")
 
+def log_step_metrics_safe(rows: List[Dict[str, Any]]):
+    """Safely log step-indexed metrics given as ``{"step": n, "metrics": {...}}`` rows."""
+    if _async_logger is not None:
+        for row in rows:
+            _async_logger.log_metrics(row["metrics"], step=row["step"])
+        return
+    try:
+        _mlflow()
+        logger = get_batch_logger()
+        for row in rows:
+            logger.log_metrics(row["metrics"], step=row["step"])
+    except Exception as e:
+        print(f"Warning: MLflow step metrics logging failed: {e}")
+
+def upload_artifacts_safe(paths: List[str]):
+    """Safely upload files and directories, skipping content the experiment already stores.
+
+    Uploads run in parallel (see ``mlflow_utils.artifacts``); file and byte
+    counts are logged as metrics, and upload progress as the step-indexed
+    ``artifacts_uploaded_bytes`` metric.
+    """
+    paths = [path for path in paths if os.path.exists(path)]
+    if not paths:
+        return
+    if _async_logger is not None:
+        _async_logger.log_artifacts(paths)
+        return
+    try:
+        mlflow = _mlflow()
+        from .artifacts import upload_artifacts
+        run_id = (mlflow.active_run() or mlflow.start_run()).info.run_id
+        logger = get_batch_logger()
+
+        def progress(files_done, files_total, bytes_done):
+            logger.log_metrics({"artifacts_uploaded_bytes": bytes_done}, step=files_done, run_id=run_id)
+
+        logger.log_metrics(upload_artifacts(mlflow.MlflowClient(), run_id, paths, progress=progress), run_id=run_id)
+    except Exception as e:
+        print(f"Warning: MLflow artifact upload failed: {e}")
+
 def log_artifacts_safe(artifact_paths: List[str] = None):
     """Safely log artifacts to MLflow."""
     if artifact_paths is None:
         artifact_paths = ARTIFACT_PATHS
-    
-    for artifact_path in artifact_paths:
-        if os.path.exists(artifact_path):
-            try:
-                mlflow.log_artifact(artifact_path)
-            except Exception as e:
-                print(f"Warning: Could not log artifact {artifact_path}: {e}")
+    upload_artifacts_safe(artifact_paths)
 
 def log_directories_safe(directory_paths: List[str] = None):
     """Safely log directories to MLflow."""
     if directory_paths is None:
         directory_paths = DIRECTORY_PATHS
-    
-    for dir_path in directory_paths:
-        if os.path.exists(dir_path):
-            try:
-                mlflow.log_artifact(dir_path)
-            except Exception as e:
-                print(f"Warning: Could not log directory {dir_path}: {e}")
+    upload_artifacts_safe(directory_paths)
 
 def log_metrics_files_safe(metrics_files: List[str] = None):
     """Safely log metrics files to MLflow."""
     if metrics_files is None:
         metrics_files = METRICS_FILES
-    
-    for metrics_file in metrics_files:
-        if os.path.exists(metrics_file):
-            try:
-                mlflow.log_artifact(metrics_file)
-            except Exception as e:
-                print(f"Warning: Could not log metrics file {metrics_file}: {e}")
+    upload_artifacts_safe(metrics_files)
+
+def log_run_outputs_safe(extra_paths: List[str] = None, bundle: bool = False):
+    """Safely upload the run's artifacts, directories and metrics files, plus ``extra_paths``, in one pass.
 
+    With ``bundle=True`` they are packed into one compressed bundle at
+    ``BUNDLE_PATH`` (see ``mlflow_utils.bundle``) and uploaded as a single
+    artifact instead.
+    """
+    paths = [path for path in list(extra_paths or []) + ARTIFACT_PATHS + DIRECTORY_PATHS + METRICS_FILES if os.path.exists(path)]
+    if not bundle:
+        upload_artifacts_safe(paths)
+        return
+    try:
+        from .bundle import bundle_suffix, default_codec, pack_bundle
+        codec = default_codec()
+        bundle_path = BUNDLE_PATH + bundle_suffix(codec)
+        os.makedirs(os.path.dirname(bundle_path) or ".", exist_ok=True)
+        index = pack_bundle(paths, bundle_path, codec)
+    except Exception as e:
+        print(f"Warning: Could not bundle run outputs, uploading them separately: {e}")
+        upload_artifacts_safe(paths)
+        return
+    log_metrics_safe({
+        "bundle_files": len(index["files"]),
+        "bundle_bytes_raw": sum(entry["size"] for entry in index["files"].values()),
+        "bundle_bytes_compressed": os.path.getsize(bundle_path),
+    })
+    upload_artifacts_safe([bundle_path])
+
+@contextmanager
 def create_run_context(run_name: str = None):
-    """Create a context manager for MLflow runs."""
+    """Create a context manager for MLflow runs.
+
+    Buffered metrics, parameters and tags are flushed before the run ends.
+    """
     if run_name is None:
         run_name = DEFAULT_RUN_NAME
     
-    return mlflow.start_run(run_name=run_name)
+    with _mlflow().start_run(run_name=run_name) as run:
+        try:
+            yield run
+        finally:
+            get_batch_logger().flush()
+
+def _is_transient(error: Exception) -> bool:
+    code = getattr(error, "error_code", None)
+    return code is None or code in _TRANSIENT_ERROR_CODES
+
+def batch_chunks(metrics: List[Any] = (), params: List[Any] = (), tags: List[Any] = ()):
+    """Split metric, param and tag entities into ``(metrics, params, tags)`` chunks within the log_batch limits."""
+    metrics, params, tags = list(metrics), list(params), list(tags)
+    while metrics or params or tags:
+        chunk_params, params = params[:MAX_PARAMS_PER_BATCH], params[MAX_PARAMS_PER_BATCH:]
+        chunk_tags, tags = tags[:MAX_TAGS_PER_BATCH], tags[MAX_TAGS_PER_BATCH:]
+        room = min(MAX_METRICS_PER_BATCH, MAX_ENTITIES_PER_BATCH - len(chunk_params) - len(chunk_tags))
+        chunk_metrics, metrics = metrics[:room], metrics[room:]
+        yield chunk_metrics, chunk_params, chunk_tags
+
+def _param_value(value: Any) -> str:
+    return str(value)[:MAX_PARAM_VALUE_LENGTH]
+
+def _metric_entities(metrics: Dict[str, Any], timestamp: int, step: int) -> List[Any]:
+    """Convert ``metrics`` to MLflow ``Metric`` entities, skipping non-numeric values with a warning."""
+    from mlflow.entities import Metric
+    entities = []
+    for key, value in metrics.items():
+        try:
+            entities.append(Metric(key, float(value), timestamp, step))
+        except (TypeError, ValueError):
+            print(f"Warning: MLflow metric {key} is not numeric, skipping: {value!r}")
+    return entities
+
+class BatchLogger:
+    """Buffers metrics, parameters and tags and sends them with ``MlflowClient.log_batch``.
+
+    Entities are buffered per run (the active run unless a ``run_id`` is
+    given) and sent in chunks within the server's per-request limits, so a
+    run's metrics take one or two requests instead of one per key. A
+    background thread flushes the buffer every ``flush_seconds`` or as soon
+    as ``flush_size`` entities are pending; ``flush()`` sends immediately and
+    also runs at interpreter exit. Failed requests are retried with
+    exponential backoff unless the server rejected them as invalid.
+    """
+
+    def __init__(
+        self,
+        flush_size: int = MLFLOW_BATCH_FLUSH_SIZE,
+        flush_seconds: float = MLFLOW_BATCH_FLUSH_SECONDS,
+        max_retries: int = MLFLOW_BATCH_MAX_RETRIES,
+    ):
+        self.flush_size = flush_size
+        self.flush_seconds = flush_seconds
+        self.max_retries = max_retries
+        self.requests = 0
+        self.failed_requests = 0
+        self._lock = threading.Lock()
+        # Held while sending so flush() returns only after earlier batches went out
+        self._send_lock = threading.Lock()
+        self._pending = {}
+        self._size = 0
+        self._clients = {}
+        self._wake = threading.Event()
+        self._thread = None
+
+    def _buffer(self, run_id: str = None):
+        import mlflow
+        if run_id is None:
+            run_id = (mlflow.active_run() or mlflow.start_run()).info.run_id
+        target = (mlflow.get_tracking_uri(), run_id)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._work, name="mlflow-batch-logger", daemon=True)
+            self._thread.start()
+            atexit.register(self.flush)
+        return self._pending.setdefault(target, {"metrics": [], "params": {}, "tags": {}})
+
+    def _added(self, count: int):
+        self._size += count
+        if self._size >= self.flush_size:
+            self._wake.set()
+
+    def log_metrics(self, metrics: Dict[str, Any], step: int = 0, run_id: str = None, timestamp: int = None):
+        """Buffer numeric ``metrics``; other values are skipped with a warning."""
+        timestamp = timestamp or int(datetime.now().timestamp() * 1000)
+        entities = _metric_entities(metrics, timestamp, step)
+        with self._lock:
+            self._buffer(run_id)["metrics"].extend(entities)
+            self._added(len(entities))
+
+    def log_params(self, params: Dict[str, Any], run_id: str = None):
+        with self._lock:
+            buffered = self._buffer(run_id)["params"]
+            for key, value in params.items():
+                buffered[key] = _param_value(value)
+            self._added(len(params))
+
+    def set_tags(self, tags: Dict[str, Any], run_id: str = None):
+        with self._lock:
+            buffered = self._buffer(run_id)["tags"]
+            for key, value in tags.items():
+                buffered[key] = str(value)
+            self._added(len(tags))
+
+    def flush(self):
+        """Send everything buffered so far and wait until it has been sent."""
+        with self._send_lock:
+            with self._lock:
+                pending, self._pending, self._size = self._pending, {}, 0
+            if not pending:
+                return
+            import mlflow
+            from mlflow.entities import Param, RunTag
+            for (tracking_uri, run_id), buffered in pending.items():
+                client = self._clients.get(tracking_uri)
+                if client is None:
+                    client = self._clients[tracking_uri] = mlflow.MlflowClient(tracking_uri)
+                params = [Param(key, value) for key, value in buffered["params"].items()]
+                tags = [RunTag(key, value) for key, value in buffered["tags"].items()]
+                for chunk in batch_chunks(buffered["metrics"], params, tags):
+                    self._send(client, run_id, *chunk)
+
+    def _send(self, client, run_id: str, metrics: List[Any], params: List[Any], tags: List[Any]):
+        for attempt in range(self.max_retries + 1):
+            try:
+                client.log_batch(run_id, metrics=metrics, params=params, tags=tags)
+                self.requests += 1
+                return
+            except Exception as e:
+                if attempt == self.max_retries or not _is_transient(e):
+                    self.failed_requests += 1
+                    print(f"Warning: MLflow batch logging failed ({len(metrics)} metrics, {len(params)} params, {len(tags)} tags): {e}")
+                    return
+                time.sleep(0.5 * 2 ** attempt)
+
+    def _work(self):
+        while True:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Warning: MLflow batch flush failed: {e}")
+
+_batch_logger = None
+_batch_logger_lock = threading.Lock()
+
+def get_batch_logger() -> BatchLogger:
+    """Return the process-wide ``BatchLogger``."""
+    global _batch_logger
+    if _batch_logger is None:
+        with _batch_logger_lock:
+            if _batch_logger is None:
+                _batch_logger = BatchLogger()
+    return _batch_logger
+
+class AsyncRunLogger:
+    """Context manager for an MLflow run whose tracking I/O happens in a background thread.
+
+    While it is active, ``log_parameters_safe``, ``log_metrics_safe`` and the
+    artifact helpers only enqueue their work, so a slow tracking server never
+    holds up the workflow. The run itself is created by the worker thread.
+    Leaving the context (normally, on an exception, or at interpreter exit)
+    marks the run FINISHED or FAILED and waits until the queue is drained.
+    """
+
+    def __init__(self, run_name: str = None):
+        self.run_name = run_name or DEFAULT_RUN_NAME
+        self.run_id = None
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._work, name="mlflow-logger", daemon=True)
+        self._closed = False
+
+    def __enter__(self):
+        global _async_logger
+        _async_logger = self
+        self._thread.start()
+        atexit.register(self.close)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close("FAILED" if exc_type is not None else "FINISHED")
+        return False
+
+    def log_params(self, params: Dict[str, Any]):
+        self._queue.put(("params", dict(params)))
+
+    def log_metrics(self, metrics: Dict[str, Any], step: int = 0):
+        self._queue.put(("metrics", (dict(metrics), int(datetime.now().timestamp() * 1000), step)))
+
+    def log_artifacts(self, paths: List[str]):
+        self._queue.put(("artifacts", list(paths)))
+
+    def close(self, status: str = "FINISHED"):
+        """Terminate the run and block until every queued call has been sent."""
+        global _async_logger
+        if self._closed:
+            return
+        self._closed = True
+        if _async_logger is self:
+            _async_logger = None
+        atexit.unregister(self.close)
+        self._queue.put(("terminated", status))
+        self._queue.put(None)
+        self._thread.join()
+
+    def _work(self):
+        client = None
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            kind, payload = item
+            if client is None:
+                try:
+                    # mlflow is imported here too, so not even the import blocks the workflow
+                    client = _mlflow().MlflowClient()
+                    experiment = client.get_experiment_by_name(MLFLOW_EXPERIMENT_NAME)
+                    self.run_id = client.create_run(experiment.experiment_id, run_name=self.run_name).info.run_id
+                except Exception as e:
+                    print(f"Warning: MLflow run creation failed, dropping queued tracking calls: {e}")
+                    client = False
+            if client is False:
+                continue
+            try:
+                from mlflow.entities import Metric, Param
+                if kind == "params":
+                    for _, chunk, _ in batch_chunks(params=[Param(key, _param_value(value)) for key, value in payload.items()]):
+                        client.log_batch(self.run_id, params=chunk)
+                elif kind == "metrics":
+                    metrics, timestamp, step = payload
+                    for chunk, _, _ in batch_chunks(_metric_entities(metrics, timestamp, step)):
+                        client.log_batch(self.run_id, metrics=chunk)
+                elif kind == "artifacts":
+                    from .artifacts import upload_artifacts
+                    metrics = upload_artifacts(client, self.run_id, payload)
+                    timestamp = int(datetime.now().timestamp() * 1000)
+                    client.log_batch(self.run_id, metrics=[Metric(key, float(value), timestamp, 0) for key, value in metrics.items()])
+                elif kind == "terminated":
+                    client.set_terminated(self.run_id, status=payload)
+            except Exception as e:
+                print(f"Warning: MLflow {kind} logging failed: {e}")
+
+def async_run_context(run_name: str = None):
+    """Create a context manager for an MLflow run logged from a background thread."""
+    return AsyncRunLogger(run_name)
+
+def start_child_run(parent_run_id: str, run_name: str, params: Dict[str, Any] = None):
+    """Create a nested run under ``parent_run_id`` and return its ID, or ``None`` on failure.
+
+    Uses ``MlflowClient`` with explicit run IDs, so it is safe to call from
+    worker threads while the parent run is active in the main thread.
+    """
+    try:
+        mlflow = _mlflow()
+        from mlflow.entities import Param
+
+        client = mlflow.MlflowClient()
+        experiment = client.get_experiment_by_name(MLFLOW_EXPERIMENT_NAME)
+        run = client.create_run(
+            experiment.experiment_id,
+            run_name=run_name,
+            tags={"mlflow.parentRunId": parent_run_id},
+        )
+        if params:
+            for _, chunk, _ in batch_chunks(params=[Param(key, _param_value(value)) for key, value in params.items()]):
+                client.log_batch(run.info.run_id, params=chunk)
+        return run.info.run_id
+    except Exception as e:
+        print(f"Warning: MLflow child run creation failed: {e}")
+        return None
+
+def finish_child_run(run_id: str, metrics: Dict[str, Any] = None, status: str = "FINISHED"):
+    """Log ``metrics`` to a run created by ``start_child_run`` and close it."""
+    if run_id is None:
+        return
+    try:
+        mlflow = _mlflow()
+        from mlflow.entities import Metric
+
+        client = mlflow.MlflowClient()
+        timestamp = int(datetime.now().timestamp() * 1000)
+        if metrics:
+            for chunk, _, _ in batch_chunks([Metric(key, float(value), timestamp, 0) for key, value in metrics.items()]):
+                client.log_batch(run_id, metrics=chunk)
+        client.set_terminated(run_id, status=status)
+    except Exception as e:
+        print(f"Warning: MLflow child run logging failed: {e}")
 
 def get_experiment_info():
     """Get information about the current experiment."""
-    experiment = mlflow.get_experiment_by_name(MLFLOW_EXPERIMENT_NAME)
+    experiment = _mlflow().get_experiment_by_name(MLFLOW_EXPERIMENT_NAME)
     if experiment:
         return {
             "experiment_id": experiment.experiment_id,
@@ -0,0 +1,194 @@
+"""
+Batch kickoff of the crew for many researcher profiles.
+
+Profiles are streamed from a JSONL file, one JSON object of crew inputs per
+line (an optional ``profile_id`` names the profile; the line number is used
+otherwise). A thread pool runs one crew per profile. Workers live in one
+process, so they share the tool registry, the tool and LLM response caches
+and the rate limiters.
+
+Each profile is logged as an MLflow child run of the batch run, its result
+or failure is appended to a JSONL results file as soon as it finishes, and
+task output files go to a per-profile directory so concurrent crews do not
+overwrite each other. The batch ends with a throughput report.
+"""
+
+import json
+import os
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_WORKERS = 4
+DEFAULT_RESULTS_PATH = "resources/outputs/batch_results.jsonl"
+PROFILE_OUTPUT_DIR = "resources/outputs/profiles"
+
+
+def parse_profile(line: str, line_number: int) -> Tuple[str, Dict[str, Any]]:
+    """Return ``(profile_id, inputs)`` for one JSONL line; raise ``ValueError`` if it is malformed."""
+    inputs = json.loads(line)
+    if not isinstance(inputs, dict):
+        raise ValueError(f"line {line_number}: expected a JSON object of crew inputs")
+    profile_id = str(inputs.pop("profile_id", line_number))
+    inputs.setdefault("current_date", datetime.now().strftime("%Y-%m-%d"))
+    return profile_id, inputs
+
+
+def iter_profiles(path: str) -> Iterator[Tuple[int, str]]:
+    """Yield ``(line_number, line)`` for each non-empty line of a JSONL file."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if line.strip():
+                yield line_number, line
+
+
+def _profile_dir(profile_id: str) -> str:
+    safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in profile_id)
+    return os.path.join(PROFILE_OUTPUT_DIR, safe)
+
+
+def run_profile(
+    profile_id: str,
+    inputs: Dict[str, Any],
+    scheduler: str = "sequential",
+    max_concurrency: Optional[int] = None,
+) -> Any:
+    """Build a crew for one profile, run it and return its ``CrewOutput``."""
+    from marketing.crew import Marketing
+
+    crew = Marketing().crew()
+    output_dir = _profile_dir(profile_id)
+    for task in crew.tasks:
+        if task.output_file:
+            task.output_file = os.path.join(output_dir, os.path.basename(task.output_file))
+    if scheduler == "dag":
+        from marketing.scheduler import kickoff_dag
+        return kickoff_dag(crew, inputs, max_concurrency=max_concurrency, verbose=False)
+    return crew.kickoff(inputs)
+
+
+def throughput_report(runtimes: List[float], failures: int, elapsed: float) -> Dict[str, float]:
+    """Summarize a batch: profiles/hour and runtime percentiles of completed profiles."""
+    completed = len(runtimes)
+    return {
+        "batch_profiles_completed": completed,
+        "batch_profiles_failed": failures,
+        "batch_elapsed_seconds": elapsed,
+        "batch_profiles_per_hour": completed / elapsed * 3600 if elapsed > 0 else 0.0,
+        "batch_runtime_p50_seconds": float(np.percentile(runtimes, 50)) if runtimes else 0.0,
+        "batch_runtime_p95_seconds": float(np.percentile(runtimes, 95)) if runtimes else 0.0,
+    }
+
+
+def format_report(report: Dict[str, float]) -> str:
+    """Render a throughput report as plain text."""
+    return (
+        f"Batch: {report['batch_profiles_completed']} completed, {report['batch_profiles_failed']} failed "
+        f"in {report['batch_elapsed_seconds']:.1f}s ({report['batch_profiles_per_hour']:.1f} profiles/hour)\n"
+        f"Runtime per profile: p50 {report['batch_runtime_p50_seconds']:.1f}s, "
+        f"p95 {report['batch_runtime_p95_seconds']:.1f}s"
+    )
+
+
+def _execute(
+    profile_id: str,
+    inputs: Dict[str, Any],
+    parent_run_id: Optional[str],
+    scheduler: str,
+    max_concurrency: Optional[int],
+) -> Dict[str, Any]:
+    from mlflow_utils import finish_child_run, start_child_run
+
+    run_id = start_child_run(parent_run_id, f"profile_{profile_id}", inputs) if parent_run_id else None
+    start = time.perf_counter()
+    try:
+        result = run_profile(profile_id, inputs, scheduler=scheduler, max_concurrency=max_concurrency)
+    except Exception as e:
+        seconds = time.perf_counter() - start
+        finish_child_run(run_id, {"execution_successful": 0, "total_execution_time_seconds": seconds}, status="FAILED")
+        return {
+            "profile_id": profile_id,
+            "status": "failed",
+            "seconds": seconds,
+            "run_id": run_id,
+            "error": f"{type(e).__name__}: {e}",
+            "traceback": traceback.format_exc(),
+        }
+
+    seconds = time.perf_counter() - start
+    usage = result.token_usage
+    finish_child_run(run_id, {
+        "execution_successful": 1,
+        "total_execution_time_seconds": seconds,
+        "total_tasks_completed": len(result.tasks_output),
+        "total_tokens": usage.total_tokens,
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "successful_requests": usage.successful_requests,
+    })
+    return {
+        "profile_id": profile_id,
+        "status": "ok",
+        "seconds": seconds,
+        "run_id": run_id,
+        "output_dir": _profile_dir(profile_id),
+        "outputs": {task_output.name: task_output.raw for task_output in result.tasks_output},
+    }
+
+
+def run_batch(
+    profiles_path: str,
+    results_path: str = DEFAULT_RESULTS_PATH,
+    workers: int = DEFAULT_WORKERS,
+    parent_run_id: Optional[str] = None,
+    scheduler: str = "sequential",
+    max_concurrency: Optional[int] = None,
+) -> Dict[str, float]:
+    """Run the crew for every profile in ``profiles_path`` and return the throughput report.
+
+    At most ``workers`` profiles run at once and only a few more are read
+    ahead, so large profile files are never loaded whole. Each finished
+    profile is appended to ``results_path`` immediately.
+    """
+    os.makedirs(os.path.dirname(results_path) or ".", exist_ok=True)
+    runtimes: List[float] = []
+    failures = 0
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="profile") as pool, \
+            open(results_path, "a", encoding="utf-8") as results:
+
+        def record(result: Dict[str, Any]) -> None:
+            nonlocal failures
+            results.write(json.dumps(result, default=str) + "\n")
+            results.flush()
+            if result["status"] == "ok":
+                runtimes.append(result["seconds"])
+                print(f"Profile {result['profile_id']} completed in {result['seconds']:.1f}s")
+            else:
+                failures += 1
+                print(f"Profile {result['profile_id']} failed: {result['error']}")
+
+        def collect(done: set) -> None:
+            for future in done:
+                record(future.result())
+
+        pending: set = set()
+        for line_number, line in iter_profiles(profiles_path):
+            try:
+                profile_id, inputs = parse_profile(line, line_number)
+            except ValueError as e:
+                record({"profile_id": str(line_number), "status": "failed", "seconds": 0.0, "error": f"Invalid profile: {e}"})
+                continue
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            future: Future = pool.submit(_execute, profile_id, inputs, parent_run_id, scheduler, max_concurrency)
+            pending.add(future)
+        collect(wait(pending)[0])
+
+    return throughput_report(runtimes, failures, time.perf_counter() - start)
@@ -0,0 +1,493 @@
+#!/usr/bin/env python
+"""
+Offline end-to-end benchmark of the crew pipeline.
+
+The full ten-task crew runs against local stand-ins for every network
+service, so orchestration overhead can be measured on any Linux box without
+API keys, a network connection or token costs:
+
+- an OpenAI-compatible ``/v1/chat/completions`` endpoint whose latency and
+  completion length are drawn from log-normal distributions (median and
+  sigma are configurable, the generator is seeded). Agents with web tools
+  are answered with a search and a scrape before their final answer, so
+  tool calls go through the same registry, caches and limiters as in a
+  real run;
+- a Serper ``/search`` endpoint whose organic results link to stub pages;
+- ``/page/<n>`` HTML pages for the scraping tool.
+
+The stub runs in a separate process so its CPU time is not counted against
+the crew. Each iteration builds a fresh crew with ``Marketing().crew()``,
+runs it and records wall time, CPU time, peak RSS and, per task, the
+overhead: task wall time not spent waiting on LLM or tool calls. The LLM
+cache is disabled and stub queries are unique per call, so every iteration
+does the same work; caches, checkpoints and task outputs go to a temporary
+directory. Results are printed and logged to MLflow as one ``benchmark``
+run, per iteration as step metrics and as medians.
+
+Usage:
+    python -m marketing.benchmark run --iterations 3 --latency-ms 300 --completion-tokens 400
+    python -m marketing.benchmark run --scheduler dag --no-mlflow
+    python -m marketing.benchmark serve --port 8099
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+SEARCH_TOOL = "Search the internet with Serper"
+SCRAPE_TOOL = "Read website content"
+STUB_API_KEY = "benchmark"
+STUB_MODEL = "gpt-4o-mini"
+
+_FINAL_ANSWER = "READY: I am ready to execute the task.\nThought: I now know the final answer\nFinal Answer: "
+_WORDS = (
+    "model", "training", "benchmark", "latency", "transformer", "attention", "dataset", "evaluation",
+    "inference", "research", "throughput", "retrieval", "embedding", "architecture", "scaling", "tokens",
+)
+
+
+class StubConfig(NamedTuple):
+    latency_ms: float = 300.0
+    latency_sigma: float = 0.5
+    completion_tokens: int = 400
+    tokens_sigma: float = 0.4
+    tool_calls: int = 2
+    seed: int = 0
+
+
+class StubServer(ThreadingHTTPServer):
+    """OpenAI-compatible LLM, Serper and web page stand-ins on one local port."""
+
+    daemon_threads = True
+
+    def __init__(self, config: StubConfig = StubConfig(), host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _StubHandler)
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.requests: Counter = Counter()
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def sample_latency(self) -> float:
+        """Seconds to wait before answering a chat completion."""
+        with self.lock:
+            return self.random.lognormvariate(math.log(max(self.config.latency_ms, 1e-3)), self.config.latency_sigma) / 1000
+
+    def sample_tokens(self) -> int:
+        with self.lock:
+            return max(1, round(self.random.lognormvariate(math.log(max(self.config.completion_tokens, 1)), self.config.tokens_sigma)))
+
+    def count(self, endpoint: str) -> int:
+        """Count a request to ``endpoint`` and return its sequence number."""
+        with self.lock:
+            self.requests[endpoint] += 1
+            return sum(self.requests.values())
+
+
+def _text(tokens: int, number: int) -> str:
+    # Words average about 1.3 tokens with the 4-characters-per-token estimate
+    count = max(1, round(tokens / 1.3))
+    return " ".join(_WORDS[(number + i * 7) % len(_WORDS)] for i in range(count))
+
+
+def _tool_action(messages: List[Dict[str, Any]], config: StubConfig, url: str, number: int) -> Optional[str]:
+    """Return the next tool action for a ReAct prompt, or ``None`` when it is time to answer."""
+    system = " ".join(str(m.get("content") or "") for m in messages if m.get("role") == "system")
+    if "Action Input:" not in system:
+        return None
+    made = sum(str(m.get("content") or "").count("Observation:") for m in messages if m.get("role") != "system")
+    if made >= config.tool_calls:
+        return None
+    if made % 2 and SCRAPE_TOOL in system:
+        action, arguments = SCRAPE_TOOL, {"website_url": f"{url}/page/{number}"}
+    elif SEARCH_TOOL in system:
+        action, arguments = SEARCH_TOOL, {"search_query": f"ai research trends {number}"}
+    else:
+        return None
+    return f"Thought: I need more information\nAction: {action}\nAction Input: {json.dumps(arguments)}"
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    server: StubServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, body: str, content_type: str = "application/json", status: int = 200) -> None:
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0].rstrip("/")
+        if path.endswith("/chat/completions"):
+            self._chat(self._body())
+        elif path in ("/search", "/news"):
+            self._search(self._body())
+        else:
+            self._send(json.dumps({"error": f"unknown endpoint {path}"}), status=404)
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path.startswith("/page/"):
+            number = self.server.count("page")
+            paragraphs = "".join(f"<p>{_text(60, number + i)}</p>" for i in range(8))
+            self._send(f"<html><head><title>Page {path[6:]}</title></head><body>{paragraphs}</body></html>", "text/html")
+        elif path == "/stats":
+            with self.server.lock:
+                self._send(json.dumps(dict(self.server.requests)))
+        else:
+            self._send(json.dumps({"error": f"unknown endpoint {path}"}), status=404)
+
+    def _chat(self, request: Dict[str, Any]) -> None:
+        server = self.server
+        number = server.count("chat")
+        messages = request.get("messages") or []
+        prompt_tokens = sum(len(str(m.get("content") or "")) for m in messages) // 4
+        content = _tool_action(messages, server.config, server.url, number)
+        completion_tokens = server.sample_tokens()
+        if content is None:
+            content = _FINAL_ANSWER + _text(completion_tokens, number)
+        time.sleep(server.sample_latency())
+        self._send(json.dumps({
+            "id": f"chatcmpl-stub-{number}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", STUB_MODEL),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }))
+
+    def _search(self, request: Dict[str, Any]) -> None:
+        number = self.server.count("search")
+        results = min(int(request.get("num", 10)), 10)
+        organic = [
+            {
+                "title": f"Result {i + 1} for {request.get('q', '')}",
+                "link": f"{self.server.url}/page/{number * 100 + i}",
+                "snippet": _text(30, number + i),
+                "position": i + 1,
+            }
+            for i in range(results)
+        ]
+        self._send(json.dumps({"searchParameters": {"q": request.get("q", "")}, "organic": organic}))
+
+
+def start_stub_server(config: StubConfig = StubConfig()) -> Tuple[subprocess.Popen, str]:
+    """Start a stub server process and return it with its URL once it accepts requests."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(Path(__file__).resolve().parents[1]), env.get("PYTHONPATH")]))
+    command = [
+        sys.executable, "-m", "marketing.benchmark", "serve", "--port", "0",
+        "--latency-ms", str(config.latency_ms), "--latency-sigma", str(config.latency_sigma),
+        "--completion-tokens", str(config.completion_tokens), "--tokens-sigma", str(config.tokens_sigma),
+        "--tool-calls", str(config.tool_calls), "--seed", str(config.seed),
+    ]
+    process = subprocess.Popen(command, env=env, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    match = re.search(r"(http://\S+)", line)
+    if not match:
+        process.kill()
+        raise RuntimeError(f"Stub server failed to start: {line!r}")
+    return process, match.group(1)
+
+
+def stub_requests(url: str) -> Dict[str, int]:
+    """Return the number of requests the stub at ``url`` has served, by endpoint."""
+    from urllib.request import urlopen
+
+    with urlopen(f"{url}/stats") as response:
+        return json.loads(response.read())
+
+
+def offline_environment(url: str) -> None:
+    """Point the crew's LLM and tools at the stub at ``url`` and keep crewai and litellm offline."""
+    os.environ.update({
+        "MODEL": STUB_MODEL,
+        "BASE_URL": f"{url}/v1",
+        "OPENAI_API_BASE": f"{url}/v1",
+        "OPENAI_API_KEY": STUB_API_KEY,
+        "SERPER_API_KEY": STUB_API_KEY,
+        "LITELLM_LOCAL_MODEL_COST_MAP": "True",
+        "CREWAI_DISABLE_TELEMETRY": "true",
+        "OTEL_SDK_DISABLED": "true",
+        # Skips crewAI's interactive first-run trace prompt
+        "CREWAI_TESTING": "true",
+    })
+    for name in ("MODEL_NAME", "OPENAI_MODEL_NAME", "API_BASE", "AZURE_API_BASE"):
+        os.environ.pop(name, None)
+
+    from marketing.llm_cache import configure_llm_cache
+    from marketing.rate_limits import configure_rate_limit
+    from marketing.tools.registry import get_tool
+
+    configure_llm_cache(enabled=False)
+    # Limits high enough that the limiters never hold a call back
+    for name in ("llm", "serper", "scrape"):
+        configure_rate_limit(name, rpm=1_000_000, tpm=1_000_000_000 if name == "llm" else None)
+    get_tool("serper_dev_tool").base_url = url
+
+
+def _reset_peak_rss() -> bool:
+    # Writing 5 to clear_refs resets the VmHWM high-water mark (Linux only)
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB since the last reset."""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is in kilobytes on Linux and never resets
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def task_overhead(records: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Return, per task, its wall time minus the time spent in its LLM and tool calls."""
+    waiting: Dict[str, float] = Counter()
+    for record in records:
+        if record["kind"] in ("llm", "tool"):
+            waiting[record["task"]] += record["wall_seconds"]
+    return {
+        record["name"]: max(0.0, record["wall_seconds"] - waiting[record["name"]])
+        for record in records
+        if record["kind"] == "task"
+    }
+
+
+def run_iteration(
+    inputs: Dict[str, Any],
+    output_dir: str,
+    scheduler: str = "sequential",
+    max_concurrency: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Build and run the crew once and return its measurements."""
+    from marketing.crew import Marketing
+    from marketing.instrumentation import get_instrumentation
+
+    instrumentation = get_instrumentation()
+    instrumentation.reset()
+    _reset_peak_rss()
+    start, cpu_start = time.perf_counter(), time.process_time()
+
+    crew = Marketing().crew()
+    for task in crew.tasks:
+        if task.output_file:
+            task.output_file = os.path.join(output_dir, os.path.basename(task.output_file))
+    built = time.perf_counter()
+    if scheduler == "dag":
+        from marketing.scheduler import kickoff_dag
+        result = kickoff_dag(crew, inputs, max_concurrency=max_concurrency, verbose=False)
+    else:
+        result = crew.kickoff(inputs)
+
+    wall, cpu = time.perf_counter() - start, time.process_time() - cpu_start
+    records = list(instrumentation.records)
+    overhead = task_overhead(records)
+    summary = instrumentation.summary()
+    return {
+        "wall_seconds": wall,
+        "cpu_seconds": cpu,
+        "crew_build_seconds": built - start,
+        "peak_rss_mb": peak_rss_mb(),
+        "tasks_completed": len(result.tasks_output),
+        "llm_calls": summary.get("llm_calls_total", 0),
+        "llm_seconds": summary.get("llm_calls_seconds", 0.0),
+        "tool_calls": summary.get("tool_calls_total", 0),
+        "tool_seconds": summary.get("tool_calls_seconds", 0.0),
+        "overhead_seconds": sum(overhead.values()),
+        "task_overhead_seconds": overhead,
+    }
+
+
+def _flatten(iteration: Dict[str, Any]) -> Dict[str, float]:
+    metrics = {f"benchmark_{key}": value for key, value in iteration.items() if key != "task_overhead_seconds"}
+    for task, seconds in iteration["task_overhead_seconds"].items():
+        metrics[f"benchmark_overhead_{task}_seconds"] = seconds
+    return metrics
+
+
+def run_suite(
+    config: StubConfig = StubConfig(),
+    iterations: int = 3,
+    warmup: int = 1,
+    scheduler: str = "sequential",
+    max_concurrency: Optional[int] = None,
+    log_to_mlflow: bool = True,
+) -> Dict[str, Any]:
+    """Run the crew ``warmup + iterations`` times against a stub server and return the results.
+
+    Warm-up iterations pay for one-off costs (imports, index builds) and are
+    not measured. Returns every measured iteration and the median of each
+    metric.
+    """
+    from marketing.main import get_inputs
+
+    stub, url = start_stub_server(config)
+    previous_cache_dir = os.environ.get("MARKETING_CACHE_DIR")
+    try:
+        with tempfile.TemporaryDirectory(prefix="marketing-benchmark-") as workdir:
+            os.environ["MARKETING_CACHE_DIR"] = os.path.join(workdir, "cache")
+            offline_environment(url)
+            inputs = get_inputs()
+
+            results = []
+            for number in range(warmup + iterations):
+                iteration = run_iteration(inputs, os.path.join(workdir, "outputs"), scheduler, max_concurrency)
+                if number >= warmup:
+                    results.append(iteration)
+                label = "warm-up" if number < warmup else f"{number - warmup + 1}/{iterations}"
+                print(f"Iteration {label}: {iteration['wall_seconds']:.2f}s wall, {iteration['cpu_seconds']:.2f}s CPU, "
+                      f"{iteration['overhead_seconds']:.2f}s overhead")
+            requests = stub_requests(url)
+    finally:
+        stub.terminate()
+        stub.wait()
+        if previous_cache_dir is None:
+            os.environ.pop("MARKETING_CACHE_DIR", None)
+        else:
+            os.environ["MARKETING_CACHE_DIR"] = previous_cache_dir
+
+    rows = [_flatten(iteration) for iteration in results]
+    medians = {key: statistics.median(row[key] for row in rows if key in row) for key in rows[0]} if rows else {}
+    report = {
+        "config": config._asdict(),
+        "scheduler": scheduler,
+        "iterations": results,
+        "median": medians,
+        "stub_requests": requests,
+    }
+    if log_to_mlflow:
+        _log_report(report, warmup, max_concurrency)
+    return report
+
+
+def _log_report(report: Dict[str, Any], warmup: int, max_concurrency: Optional[int]) -> None:
+    from mlflow_utils import create_run_context, log_metrics_safe, log_parameters_safe, log_step_metrics_safe
+
+    import crewai
+
+    params = {f"stub_{key}": value for key, value in report["config"].items()}
+    params.update({
+        "scheduler": report["scheduler"],
+        "max_concurrency": max_concurrency,
+        "iterations": len(report["iterations"]),
+        "warmup": warmup,
+        "crewai_version": crewai.__version__,
+        "python_version": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+    })
+    with create_run_context(run_name="benchmark"):
+        log_parameters_safe(params)
+        log_step_metrics_safe([{"step": step, "metrics": _flatten(iteration)} for step, iteration in enumerate(report["iterations"])])
+        log_metrics_safe(report["median"])
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Render the medians of a benchmark as plain text."""
+    median = report["median"]
+    if not median:
+        return "No measured iterations"
+    lines = [
+        f"Benchmark ({report['scheduler']}, {len(report['iterations'])} iterations, medians):",
+        f"  wall {median['benchmark_wall_seconds']:.2f}s, CPU {median['benchmark_cpu_seconds']:.2f}s, "
+        f"peak RSS {median['benchmark_peak_rss_mb']:.0f} MB, crew build {median['benchmark_crew_build_seconds']:.3f}s",
+        f"  {median['benchmark_llm_calls']:.0f} LLM calls ({median['benchmark_llm_seconds']:.2f}s), "
+        f"{median['benchmark_tool_calls']:.0f} tool calls ({median['benchmark_tool_seconds']:.2f}s), "
+        f"overhead {median['benchmark_overhead_seconds']:.2f}s",
+        "  Overhead per task:",
+    ]
+    prefix, suffix = "benchmark_overhead_", "_seconds"
+    for key, value in median.items():
+        if key.startswith(prefix) and key != "benchmark_overhead_seconds":
+            lines.append(f"    {key[len(prefix):-len(suffix)]:<35} {value * 1000:8.1f} ms")
+    return "\n".join(lines)
+
+
+def _add_stub_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = StubConfig()
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms, help="Median LLM response latency")
+    parser.add_argument("--latency-sigma", type=float, default=defaults.latency_sigma, help="Log-normal sigma of the latency")
+    parser.add_argument("--completion-tokens", type=int, default=defaults.completion_tokens, help="Median completion length in tokens")
+    parser.add_argument("--tokens-sigma", type=float, default=defaults.tokens_sigma, help="Log-normal sigma of the completion length")
+    parser.add_argument("--tool-calls", type=int, default=defaults.tool_calls, help="Tool calls per task for agents with web tools")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point for the stub server and the benchmark suite."""
+    parser = argparse.ArgumentParser(description="Offline benchmark of the crew against local LLM and web stand-ins")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="Run the benchmark suite")
+    _add_stub_arguments(run)
+    run.add_argument("--iterations", type=int, default=3)
+    run.add_argument("--warmup", type=int, default=1, help="Unmeasured iterations run first")
+    run.add_argument("--scheduler", choices=["sequential", "dag"], default="sequential")
+    run.add_argument("--max-concurrency", type=int, default=None)
+    run.add_argument("--no-mlflow", action="store_true", help="Print the results without logging them to MLflow")
+    run.add_argument("--json", metavar="PATH", default=None, help="Also write the full results to PATH")
+    serve = commands.add_parser("serve", help="Run only the stub server")
+    _add_stub_arguments(serve)
+    serve.add_argument("--port", type=int, default=8099)
+    args = parser.parse_args(argv)
+
+    config = StubConfig(args.latency_ms, args.latency_sigma, args.completion_tokens, args.tokens_sigma, args.tool_calls, args.seed)
+    if args.command == "serve":
+        server = StubServer(config, port=args.port)
+        print(f"Stub server listening on {server.url}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    report = run_suite(config, args.iterations, args.warmup, args.scheduler, args.max_concurrency, log_to_mlflow=not args.no_mlflow)
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""
+Task-level checkpoints for resuming failed crew runs.
+
+As each task completes, its output is stored together with a hash of the
+crew inputs. ``replay_crew`` rebuilds the outputs of completed tasks from the
+store and resumes at the first task without a checkpoint (or at a named
+task), so a failure late in the run does not re-run, and re-bill, the tasks
+before it.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from crewai.tasks.task_output import TaskOutput
+
+from marketing.storage import cache_path
+
+_OUTPUT_FIELDS = ("description", "name", "expected_output", "summary", "raw", "json_dict", "agent", "output_format")
+
+
+def inputs_hash(inputs: Optional[Dict[str, Any]]) -> str:
+    """Return a stable hash of the crew inputs."""
+    return hashlib.sha256(json.dumps(inputs or {}, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class CheckpointStore:
+    """SQLite store of task outputs keyed on task name and inputs hash."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            " task TEXT NOT NULL, inputs_hash TEXT NOT NULL, output TEXT NOT NULL, completed REAL NOT NULL,"
+            " PRIMARY KEY (task, inputs_hash))"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS inputs ("
+            " inputs_hash TEXT PRIMARY KEY, inputs TEXT NOT NULL, updated REAL NOT NULL)"
+        )
+
+    def record_inputs(self, inputs: Optional[Dict[str, Any]]) -> str:
+        """Remember ``inputs`` so a later replay can reuse them; return their hash."""
+        key = inputs_hash(inputs)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO inputs (inputs_hash, inputs, updated) VALUES (?, ?, ?)",
+                (key, json.dumps(inputs or {}, default=str), time.time()),
+            )
+        return key
+
+    def latest_inputs(self) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Return ``(hash, inputs)`` of the most recent run, if any."""
+        with self._lock:
+            row = self._db.execute("SELECT inputs_hash, inputs FROM inputs ORDER BY updated DESC LIMIT 1").fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def save(self, key: str, output: TaskOutput) -> None:
+        """Checkpoint the output of a completed task."""
+        payload = {field: getattr(output, field, None) for field in _OUTPUT_FIELDS}
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO checkpoints (task, inputs_hash, output, completed) VALUES (?, ?, ?, ?)",
+                (output.name, key, json.dumps(payload, default=str), time.time()),
+            )
+
+    def load(self, key: str) -> Dict[str, TaskOutput]:
+        """Return the checkpointed outputs for an inputs hash, by task name."""
+        with self._lock:
+            rows = self._db.execute("SELECT task, output FROM checkpoints WHERE inputs_hash = ?", (key,)).fetchall()
+        return {task: TaskOutput(**json.loads(output)) for task, output in rows}
+
+    def clear(self, key: Optional[str] = None) -> None:
+        """Drop the checkpoints of one inputs hash, or all of them."""
+        with self._lock:
+            if key is None:
+                self._db.execute("DELETE FROM checkpoints")
+            else:
+                self._db.execute("DELETE FROM checkpoints WHERE inputs_hash = ?", (key,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_checkpoint_store: Optional[CheckpointStore] = None
+_checkpoint_store_lock = threading.Lock()
+
+
+def get_checkpoint_store() -> CheckpointStore:
+    """Return the process-wide checkpoint store."""
+    global _checkpoint_store
+    if _checkpoint_store is None:
+        with _checkpoint_store_lock:
+            if _checkpoint_store is None:
+                _checkpoint_store = CheckpointStore(cache_path("checkpoints.sqlite"))
+    return _checkpoint_store
+
+
+def replay_crew(crew: Any, task_name: Optional[str] = None, inputs: Optional[Dict[str, Any]] = None) -> Any:
+    """Resume ``crew`` from checkpoints and return its ``CrewOutput``.
+
+    Uses the inputs of the most recent run unless ``inputs`` is given.
+    Execution starts at ``task_name`` or, by default, at the first task
+    without a checkpoint; earlier tasks get their checkpointed outputs.
+    """
+    from marketing.scheduler import prepare_crew
+
+    store = get_checkpoint_store()
+    if inputs is None:
+        latest = store.latest_inputs()
+        if latest is None:
+            raise ValueError("No checkpointed run to replay; run the crew first")
+        inputs = latest[1]
+    key = store.record_inputs(inputs)
+    completed = store.load(key)
+
+    names = [task.name for task in crew.tasks]
+    if task_name is not None:
+        if task_name not in names:
+            raise ValueError(f"Unknown task '{task_name}'. Tasks: {', '.join(names)}")
+        start_index = names.index(task_name)
+    else:
+        start_index = next((index for index, name in enumerate(names) if name not in completed), len(names))
+    missing = [name for name in names[:start_index] if name not in completed]
+    if missing:
+        raise ValueError(f"Cannot resume at '{names[start_index]}': no checkpoint for {', '.join(missing)}")
+    if start_index == len(names):
+        print("Every task has a checkpoint for these inputs; nothing to replay")
+        return crew._create_crew_output([completed[name] for name in names])
+
+    print(f"Resuming at '{names[start_index]}' ({start_index} of {len(names)} tasks restored from checkpoints)")
+    prepare_crew(crew, inputs)
+    for task in crew.tasks[:start_index]:
+        task.output = completed[task.name]
+    return crew._execute_tasks(crew.tasks, start_index, True)
@@ -1,34 +1,78 @@
 from crewai import Agent, Task, Crew, Process
-from crewai_tools import SerperDevTool, ScrapeWebsiteTool, DirectoryReadTool, FileWriterTool, FileReadTool, ArxivPaperTool
-from marketing.tools.custom_tool import LinkedInPostAnalyzer, ResearchTopicAnalyzer, ResumeOptimizer, InnovationTracker, ResearchPaperAnalyzer
+from crewai.tools import BaseTool
+from marketing.checkpoints import get_checkpoint_store
+from marketing.instrumentation import get_instrumentation
+from marketing.knowledge_index import knowledge_base
+from marketing.llm_cache import cached_llm
+from marketing.summarizer import ExtractiveSummarizerAgent, local_summarizer_settings
+from marketing.tools.registry import get_tool
 import yaml
 from pathlib import Path
-from crewai.project import CrewBase,agent,task,crew
+from crewai.project import CrewBase,agent,task,crew,tool,before_kickoff
+from crewai.tasks.task_output import TaskOutput
 from crewai.agents.agent_builder.base_agent import BaseAgent
 
 @CrewBase
 class Marketing:
     agents: list[BaseAgent]
     tasks: list[Task]
+    inputs_hash: str | None = None
+    
+    # Tools are shared process-wide through the registry; each agent gets
+    # the subset listed under `tools` in config/agents.yaml
+    @tool
+    def serper_dev_tool(self) -> BaseTool:
+        return get_tool('serper_dev_tool')
+    
+    @tool
+    def scrape_website_tool(self) -> BaseTool:
+        return get_tool('scrape_website_tool')
+    
+    @tool
+    def directory_read_tool(self) -> BaseTool:
+        return get_tool('directory_read_tool')
+    
+    @tool
+    def file_writer_tool(self) -> BaseTool:
+        return get_tool('file_writer_tool')
+    
+    @tool
+    def file_read_tool(self) -> BaseTool:
+        return get_tool('file_read_tool')
+    
+    @tool
+    def arxiv_paper_tool(self) -> BaseTool:
+        return get_tool('arxiv_paper_tool')
+    
+    @tool
+    def linkedin_post_analyzer(self) -> BaseTool:
+        return get_tool('linkedin_post_analyzer')
+    
+    @tool
+    def research_topic_analyzer(self) -> BaseTool:
+        return get_tool('research_topic_analyzer')
+    
+    @tool
+    def resume_optimizer(self) -> BaseTool:
+        return get_tool('resume_optimizer')
+    
+    @tool
+    def innovation_tracker(self) -> BaseTool:
+        return get_tool('innovation_tracker')
+    
+    @tool
+    def research_paper_analyzer(self) -> BaseTool:
+        return get_tool('research_paper_analyzer')
+    
+    @tool
+    def ai_ml_image_generator(self) -> BaseTool:
+        return get_tool('ai_ml_image_generator')
     
     @agent
     def ai_ml_research_scientist(self) -> Agent:
         return Agent(
             config=self.agents_config['ai_ml_research_scientist'],
-            tools=[
-                SerperDevTool(),
-                ScrapeWebsiteTool(),
-                DirectoryReadTool('resources/drafts'),
-                FileWriterTool(),
-                FileReadTool(),
-                ArxivPaperTool(),
-                LinkedInPostAnalyzer(),
-                ResearchTopicAnalyzer(),
-                ResumeOptimizer(),
-                InnovationTracker(),
-                ResearchPaperAnalyzer()
-            ],
-            max_rpm=3,
+            llm=cached_llm(),
             max_iter=3,
             reasoning=True,
             inject_date=True,
@@ -40,22 +84,9 @@ class Marketing:
     def research_content_creator(self) -> Agent:
         return Agent(
             config=self.agents_config['research_content_creator'],
-            tools=[
-                SerperDevTool(),
-                ScrapeWebsiteTool(),
-                DirectoryReadTool('resources/drafts'),
-                FileWriterTool(),
-                FileReadTool(),
-                ArxivPaperTool(),
-                LinkedInPostAnalyzer(),
-                ResearchTopicAnalyzer(),
-                ResumeOptimizer(),
-                InnovationTracker(),
-                ResearchPaperAnalyzer()
-            ],
+            llm=cached_llm(),
             inject_date=True,
             allow_delegation=True,
-            max_rpm=3,
             max_iter=3,
             verbose=True
         )
@@ -64,20 +95,7 @@ class Marketing:
     def research_blog_writer(self) -> Agent:
         return Agent(
             config=self.agents_config['research_blog_writer'],
-            tools=[
-                SerperDevTool(),
-                ScrapeWebsiteTool(),
-                DirectoryReadTool('resources/drafts'),
-                FileWriterTool(),
-                FileReadTool(),
-                ArxivPaperTool(),
-                LinkedInPostAnalyzer(),
-                ResearchTopicAnalyzer(),
-                ResumeOptimizer(),
-                InnovationTracker(),
-                ResearchPaperAnalyzer()
-            ],
-            max_rpm=3,
+            llm=cached_llm(),
             max_iter=2,
             allow_delegation=True,
             inject_date=True,
@@ -88,46 +106,28 @@ class Marketing:
     def content_optimizer(self) -> Agent:
         return Agent(
             config=self.agents_config['content_optimizer'],
-            tools=[
-                SerperDevTool(),
-                ScrapeWebsiteTool(),
-                DirectoryReadTool('resources/drafts'),
-                FileWriterTool(),
-                FileReadTool(),
-                ArxivPaperTool(),
-                LinkedInPostAnalyzer(),
-                ResearchTopicAnalyzer(),
-                ResumeOptimizer(),
-                InnovationTracker(),
-                ResearchPaperAnalyzer()
-            ],
+            llm=cached_llm(),
             verbose=True,
             allow_delegation=True,
-            max_rpm=3,
             max_iter=2,
             reasoning=False
         )
     
     @agent
     def content_summarizer(self) -> Agent:
+        # The summarize_* tasks only shrink context, which can be done locally
+        settings = local_summarizer_settings()
+        if settings['enabled']:
+            return ExtractiveSummarizerAgent(
+                config=self.agents_config['content_summarizer'],
+                token_budget=settings['token_budget'],
+                verbose=True
+            )
         return Agent(
             config=self.agents_config['content_summarizer'],
-            tools=[
-                SerperDevTool(),
-                ScrapeWebsiteTool(),
-                DirectoryReadTool('resources/drafts'),
-                FileWriterTool(),
-                FileReadTool(),
-                ArxivPaperTool(),
-                LinkedInPostAnalyzer(),
-                ResearchTopicAnalyzer(),
-                ResumeOptimizer(),
-                InnovationTracker(),
-                ResearchPaperAnalyzer()
-            ],
+            llm=cached_llm(),
             verbose=True,
             allow_delegation=True,
-            max_rpm=3,
             max_iter=2,
             reasoning=False
         )
@@ -206,6 +206,19 @@ class Marketing:
             output_file='resources/drafts/optimized_research_content.md'
         )
     
+    # Checkpoints: each completed task's output is stored under a hash of the
+    # run inputs so `replay` can resume a failed run
+    @before_kickoff
+    def record_inputs(self, inputs):
+        self.inputs_hash = get_checkpoint_store().record_inputs(inputs)
+        return inputs
+    
+    def task_completed(self, output: TaskOutput) -> None:
+        if self.inputs_hash is not None:
+            get_checkpoint_store().save(self.inputs_hash, output)
+        task = next((task for task in self.tasks if task.name == output.name), None)
+        get_instrumentation().record_task(task, output)
+    
     @crew
     def crew(self) -> Crew:
         """Creates the AI/ML Research Scientist LinkedIn Marketing and Research Publication crew"""
@@ -230,5 +243,10 @@ class Marketing:
                 self.optimize_research_content()
             ],
             process=Process.sequential,
+            # knowledge/ is embedded once into a persisted index; later crews
+            # memory-map it instead of re-embedding on every start-up
+            knowledge=knowledge_base(),
+            task_callback=self.task_completed,
+            step_callback=get_instrumentation().record_step,
             verbose=True
         )
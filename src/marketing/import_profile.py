@@ -0,0 +1,81 @@
+"""
+Import-time profiling for the crew entry points.
+
+Imports the entry point and the modules a full run loads later in a fresh
+interpreter with ``-X importtime``, then reports how long each stage takes
+and which top-level packages account for the time.
+"""
+
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+# Entry point first, then the heavy modules a run loads on demand
+DEFAULT_STAGES = ("marketing.main", "mlflow", "crewai", "crewai_tools", "marketing.crew")
+
+
+class ImportRecord(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    """Parse the stderr of ``python -X importtime`` into records."""
+    records = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        records.append(ImportRecord(name.strip(), int(self_us), int(cumulative_us), depth))
+    return records
+
+
+def profile_imports(stages: Sequence[str] = DEFAULT_STAGES, python: Optional[str] = None) -> Dict[str, object]:
+    """Import ``stages`` in order in a fresh interpreter and time them.
+
+    Returns the cumulative time of each stage (modules already loaded by an
+    earlier stage are not counted again) and the self time per top-level
+    package.
+    """
+    code = "; ".join(f"import {stage}" for stage in stages)
+    completed = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Profiling imports failed:\n{completed.stderr[-2000:]}")
+    records = parse_importtime(completed.stderr)
+
+    # A stage's own top-level import line carries its cumulative time
+    stage_times = {stage: 0 for stage in stages}
+    for record in records:
+        if record.depth == 0 and record.module in stage_times:
+            stage_times[record.module] = record.cumulative_us
+    package_times: Dict[str, int] = defaultdict(int)
+    for record in records:
+        package_times[record.module.split(".")[0]] += record.self_us
+
+    return {
+        "stages": stage_times,
+        "packages": dict(sorted(package_times.items(), key=lambda item: -item[1])),
+        "total_us": sum(record.self_us for record in records),
+        "modules": len(records),
+    }
+
+
+def format_report(profile: Dict[str, object], top: int = 15) -> str:
+    """Render an import profile as a plain-text report."""
+    lines = ["Import time by stage (modules loaded by an earlier stage are not counted again):"]
+    for stage, micros in profile["stages"].items():
+        lines.append(f"  {stage:<32} {micros / 1e6:8.3f}s")
+    lines.append(f"  {'total':<32} {profile['total_us'] / 1e6:8.3f}s  ({profile['modules']:,} modules)")
+    lines.append("")
+    lines.append(f"Top {top} packages by self time:")
+    for package, micros in list(profile["packages"].items())[:top]:
+        lines.append(f"  {package:<32} {micros / 1e6:8.3f}s")
+    return "\n".join(lines)
@@ -0,0 +1,196 @@
+"""
+Latency and token instrumentation of crew runs.
+
+Four kinds of spans are recorded:
+
+- ``llm``: every call that reaches the model (``CachedLLM``), with tokens in
+  and out from the provider's usage report (estimated when none is given);
+- ``tool``: every tool ``_run`` of the shared tool instances;
+- ``step``: every agent step, from the crew's step callback, covering the
+  LLM call and tool call that make up the step;
+- ``task``: every completed task, from the crew's task callback.
+
+Each span records wall time, time spent queued in the rate limiters, tokens
+in/out and rate-limit retries; step and task spans add up the LLM and tool
+spans inside them. The recorder is process-wide and thread-safe; state for
+the span being built lives in thread-locals, because a task and all of its
+steps, LLM calls and tool calls run on one thread.
+"""
+
+import csv
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+COLUMNS = (
+    "index", "kind", "name", "task", "agent", "started", "wall_seconds",
+    "queue_wait_seconds", "tokens_in", "tokens_out", "retries", "error",
+)
+_TOTALS = ("queue_wait_seconds", "tokens_in", "tokens_out", "retries")
+
+
+def _new_span(kind: str, name: str, task: Optional[str], agent: Optional[str], started: float) -> Dict[str, Any]:
+    return {
+        "kind": kind, "name": name, "task": task, "agent": agent.strip() if agent else agent, "started": started,
+        "wall_seconds": 0.0, "queue_wait_seconds": 0.0, "tokens_in": 0, "tokens_out": 0, "retries": 0, "error": "",
+    }
+
+
+class Instrumentation:
+    """Collects spans of a crew run."""
+
+    def __init__(self):
+        self.records: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+
+    # Thread-local state: open spans, the current task/agent, and the
+    # totals of the step and task in progress
+    def _state(self) -> threading.local:
+        local = self._local
+        if not hasattr(local, "open"):
+            local.open = []
+            local.task = None
+            local.agent = None
+            local.step = None
+            local.tasks = {}
+        return local
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            record["index"] = len(self.records)
+            self.records.append(record)
+
+    @contextmanager
+    def span(self, kind: str, name: str, task: Optional[str] = None, agent: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Time the enclosed block as an ``llm`` or ``tool`` span and yield it for annotation."""
+        state = self._state()
+        if task is not None or agent is not None:
+            state.task, state.agent = task or state.task, agent or state.agent
+        start = time.perf_counter()
+        record = _new_span(kind, name, state.task, state.agent, start - self._origin)
+        state.open.append(record)
+        try:
+            yield record
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"[:200]
+            raise
+        finally:
+            state.open.remove(record)
+            record["wall_seconds"] = time.perf_counter() - start
+            self._append(record)
+            if state.step is None:
+                state.step = _new_span("step", "", state.task, state.agent, record["started"])
+            for totals in (state.step, state.tasks.setdefault(state.task, dict.fromkeys(_TOTALS, 0))):
+                for key in _TOTALS:
+                    totals[key] += record[key]
+
+    def add_queue_wait(self, seconds: float) -> None:
+        """Add rate-limiter queue time to the innermost open span on this thread."""
+        state = self._state()
+        if state.open:
+            state.open[-1]["queue_wait_seconds"] += seconds
+
+    def add_retry(self) -> None:
+        """Count a retry against the innermost open span on this thread."""
+        state = self._state()
+        if state.open:
+            state.open[-1]["retries"] += 1
+
+    def record_step(self, step_output: Any) -> None:
+        """Close the agent step in progress on this thread (crew ``step_callback``)."""
+        state = self._state()
+        now = time.perf_counter() - self._origin
+        step = state.step or _new_span("step", "", state.task, state.agent, now)
+        step["name"] = type(step_output).__name__
+        step["wall_seconds"] = now - step["started"]
+        state.step = None
+        self._append(step)
+
+    def record_task(self, task: Any, output: Any) -> None:
+        """Record a completed task (crew ``task_callback``)."""
+        state = self._state()
+        totals = state.tasks.pop(output.name, None) or dict.fromkeys(_TOTALS, 0)
+        wall = (task.end_time - task.start_time).total_seconds() if task is not None and task.start_time and task.end_time else 0.0
+        record = _new_span("task", output.name, output.name, output.agent, time.perf_counter() - self._origin - wall)
+        record.update(totals, wall_seconds=wall)
+        self._append(record)
+
+    def step_metrics(self) -> List[Dict[str, Any]]:
+        """Return ``{"step": n, "metrics": {...}}`` for every span, ``n`` counting spans of its kind."""
+        with self._lock:
+            records = list(self.records)
+        counters: Dict[str, int] = {}
+        rows = []
+        for record in records:
+            kind = record["kind"]
+            step = counters.get(kind, 0)
+            counters[kind] = step + 1
+            rows.append({
+                "step": step,
+                "metrics": {
+                    f"{kind}_wall_seconds": record["wall_seconds"],
+                    f"{kind}_queue_wait_seconds": record["queue_wait_seconds"],
+                    f"{kind}_tokens_in": record["tokens_in"],
+                    f"{kind}_tokens_out": record["tokens_out"],
+                    f"{kind}_retries": record["retries"],
+                },
+            })
+        return rows
+
+    def summary(self) -> Dict[str, float]:
+        """Return run totals per span kind."""
+        metrics: Dict[str, float] = {}
+        with self._lock:
+            for record in self.records:
+                if record["kind"] in ("llm", "tool"):
+                    prefix = f"{record['kind']}_calls"
+                    metrics[f"{prefix}_total"] = metrics.get(f"{prefix}_total", 0) + 1
+                    metrics[f"{prefix}_seconds"] = metrics.get(f"{prefix}_seconds", 0.0) + record["wall_seconds"]
+                    for key in _TOTALS:
+                        metrics[f"{prefix}_{key}"] = metrics.get(f"{prefix}_{key}", 0) + record[key]
+        return metrics
+
+    def write_table(self, path: str) -> str:
+        """Write every span as one CSV row and return ``path``."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._lock:
+            records = list(self.records)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMNS)
+            writer.writeheader()
+            for record in records:
+                row = dict(record)
+                for key in ("started", "wall_seconds", "queue_wait_seconds"):
+                    row[key] = f"{row[key]:.4f}"
+                writer.writerow(row)
+        return path
+
+    def reset(self) -> None:
+        with self._lock:
+            self.records.clear()
+            self._origin = time.perf_counter()
+
+
+_instrumentation = Instrumentation()
+
+
+def get_instrumentation() -> Instrumentation:
+    """Return the process-wide span recorder."""
+    return _instrumentation
+
+
+def instrument_tool(tool: Any, name: str) -> Any:
+    """Record a ``tool`` span around every ``_run`` of ``tool`` and return it."""
+    run = tool._run
+
+    def _run(*args, **kwargs):
+        with _instrumentation.span("tool", name):
+            return run(*args, **kwargs)
+
+    # BaseTool is a pydantic model; set the wrapper on the instance directly
+    object.__setattr__(tool, "_run", _run)
+    return tool
@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+"""
+Persisted embedding index for the crew's knowledge sources.
+
+The files in ``knowledge/`` are chunked and embedded once and stored under
+the cache directory; crews built afterwards memory-map the vectors instead
+of re-chunking and re-embedding at start-up. Each file's SHA-256 is kept in
+the manifest: a rebuild embeds only files whose content changed and copies
+the vectors of the others, and when nothing changed nothing is rebuilt.
+
+Embeddings are computed locally by default (the hashed bag-of-words vectors
+of ``marketing.llm_cache.embed_text``), so building costs no API calls. Any
+litellm embedding model can be used instead, e.g. ``text-embedding-3-small``;
+changing the embedder or chunking rebuilds the whole index. Index layout::
+
+    vectors.npy     float32 L2-normalized chunk vectors (chunks x dimensions)
+    chunks.jsonl    one {"source", "content"} record per chunk
+    manifest.json   embedder, chunking and per-file hash / chunk range
+
+Builds take a lock shared by threads and processes, so crews built at the
+same time (``--batch``, for instance) embed the files once and never see a
+half-written index.
+
+``IndexedKnowledgeStorage`` serves the index to crewai through the
+``Knowledge`` interface, so it can be mounted with ``Crew(knowledge=...)``.
+
+Usage:
+    python -m marketing.knowledge_index build
+    python -m marketing.knowledge_index search "preferred post length"
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from marketing.storage import build_directory, cache_path, directory_lock, replace_directory
+
+DEFAULT_KNOWLEDGE_DIR = Path("knowledge")
+DEFAULT_EMBEDDER = "hashed"
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+# Hashed bag-of-words cosine similarities run well below dense-embedding ones
+HASHED_SCORE_THRESHOLD = 0.1
+
+_KNOWLEDGE_SUFFIXES = (".txt", ".md")
+
+
+def chunk_text(text: str, size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> List[str]:
+    """Split ``text`` into overlapping chunks of about ``size`` characters, breaking at whitespace."""
+    text = text.strip()
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(len(text), start + size)
+        if end < len(text):
+            space = text.rfind(" ", start + size // 2, end)
+            end = space if space > 0 else end
+        chunks.append(text[start:end].strip())
+        if end == len(text):
+            break
+        start = max(start + 1, end - overlap)
+    return [chunk for chunk in chunks if chunk]
+
+
+def file_hash(path: Union[str, Path]) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def knowledge_files(knowledge_dir: Union[str, Path] = DEFAULT_KNOWLEDGE_DIR) -> List[Path]:
+    return sorted(path for path in Path(knowledge_dir).glob("**/*") if path.suffix in _KNOWLEDGE_SUFFIXES)
+
+
+def embed_texts(texts: Sequence[str], embedder: str = DEFAULT_EMBEDDER) -> np.ndarray:
+    """Return L2-normalized float32 embeddings of ``texts``, one row each."""
+    if embedder == DEFAULT_EMBEDDER:
+        from marketing.llm_cache import embed_text
+        return np.stack([embed_text(text) for text in texts]) if texts else np.zeros((0, 0), dtype=np.float32)
+
+    import litellm
+
+    response = litellm.embedding(model=embedder, input=list(texts))
+    vectors = np.asarray([item["embedding"] for item in response.data], dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+
+def build_knowledge_index(
+    path: Union[str, Path],
+    files: Sequence[Union[str, Path]],
+    embedder: str = DEFAULT_EMBEDDER,
+    chunk_size: int = CHUNK_SIZE,
+    chunk_overlap: int = CHUNK_OVERLAP,
+) -> bool:
+    """Bring the index at ``path`` up to date with ``files``; return whether it was rebuilt.
+
+    Only files whose content hash changed since the last build are embedded.
+    Callers hold ``directory_lock(path)``.
+    """
+    path = Path(path)
+    settings = {"embedder": embedder, "chunk_size": chunk_size, "chunk_overlap": chunk_overlap}
+    hashes = {str(file): file_hash(file) for file in files}
+
+    previous: Optional[KnowledgeIndex] = None
+    if (path / "manifest.json").exists():
+        previous = KnowledgeIndex(path)
+        if previous.manifest["settings"] != settings:
+            previous = None
+        elif {name: entry["sha256"] for name, entry in previous.manifest["files"].items()} == hashes:
+            return False
+
+    tmp_path = build_directory(path)
+
+    blocks: List[np.ndarray] = []
+    entries: Dict[str, Dict[str, Any]] = {}
+    count = 0
+    with open(tmp_path / "chunks.jsonl", "w", encoding="utf-8") as f:
+        for name, digest in hashes.items():
+            reused = previous.manifest["files"].get(name) if previous else None
+            if reused and reused["sha256"] == digest:
+                start, end = reused["start"], reused["end"]
+                chunks = previous.chunks[start:end]
+                vectors = np.asarray(previous.vectors[start:end])
+            else:
+                with open(name, "r", encoding="utf-8") as source:
+                    chunks = [{"source": name, "content": chunk} for chunk in chunk_text(source.read(), chunk_size, chunk_overlap)]
+                vectors = embed_texts([chunk["content"] for chunk in chunks], embedder)
+            for chunk in chunks:
+                f.write(json.dumps(chunk, ensure_ascii=False) + "\n")
+            if len(chunks):
+                blocks.append(vectors)
+            entries[name] = {"sha256": digest, "start": count, "end": count + len(chunks)}
+            count += len(chunks)
+
+    vectors = np.concatenate(blocks) if blocks else np.zeros((0, 1), dtype=np.float32)
+    np.save(tmp_path / "vectors.npy", vectors.astype(np.float32))
+    with open(tmp_path / "manifest.json", "w", encoding="utf-8") as f:
+        json.dump({"settings": settings, "files": entries, "chunks": count, "built": time.time()}, f, indent=2)
+
+    if previous is not None:
+        previous.close()
+    replace_directory(tmp_path, path)
+    return True
+
+
+class KnowledgeIndex:
+    """Memory-mapped chunk vectors with cosine-similarity search."""
+
+    def __init__(self, path: Union[str, Path]):
+        # Resolved once, so every file comes from the same build
+        self.path = Path(path).resolve()
+        with open(self.path / "manifest.json", "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        with open(self.path / "chunks.jsonl", "r", encoding="utf-8") as f:
+            self.chunks = [json.loads(line) for line in f]
+        self.vectors = np.load(self.path / "vectors.npy", mmap_mode="r")
+
+    @property
+    def embedder(self) -> str:
+        return self.manifest["settings"]["embedder"]
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def search(self, query: str, limit: int = 5, score_threshold: float = 0.0) -> List[Dict[str, Any]]:
+        """Return up to ``limit`` chunks whose cosine similarity to ``query`` reaches ``score_threshold``."""
+        if not len(self) or not query.strip():
+            return []
+        scores = self.vectors @ embed_texts([query], self.embedder)[0]
+        limit = min(limit, len(scores))
+        best = np.argpartition(-scores, limit - 1)[:limit]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [
+            {
+                "id": f"{self.chunks[number]['source']}#{number}",
+                "content": self.chunks[number]["content"],
+                "metadata": {"source": self.chunks[number]["source"]},
+                "score": float(scores[number]),
+            }
+            for number in best
+            if scores[number] >= score_threshold
+        ]
+
+    def close(self) -> None:
+        mmap = getattr(self.vectors, "_mmap", None)
+        if mmap is not None:
+            mmap.close()
+
+
+def get_knowledge_index(
+    knowledge_dir: Union[str, Path] = DEFAULT_KNOWLEDGE_DIR,
+    embedder: str = DEFAULT_EMBEDDER,
+) -> Optional[KnowledgeIndex]:
+    """Return the index of ``knowledge_dir``, embedding only files that changed.
+
+    Returns ``None`` when the directory holds no knowledge files.
+    """
+    files = knowledge_files(knowledge_dir)
+    if not files:
+        return None
+    index_dir = cache_path("knowledge", "manifest.json").parent
+    # The manifest is checked again under the lock, so only one builder embeds
+    with directory_lock(index_dir):
+        build_knowledge_index(index_dir, files, embedder=embedder)
+        return KnowledgeIndex(index_dir)
+
+
+def knowledge_base(knowledge_dir: Union[str, Path] = DEFAULT_KNOWLEDGE_DIR, embedder: str = DEFAULT_EMBEDDER) -> Any:
+    """Return a crewai ``Knowledge`` backed by the persisted index, or ``None`` without knowledge files."""
+    from crewai.knowledge.knowledge import Knowledge
+    from crewai.knowledge.storage.knowledge_storage import KnowledgeStorage
+
+    index = get_knowledge_index(knowledge_dir, embedder)
+    if index is None:
+        return None
+
+    class IndexedKnowledgeStorage(KnowledgeStorage):
+        """``KnowledgeStorage`` that searches the persisted index instead of a vector database."""
+
+        def __init__(self):
+            self.collection_name = "knowledge"
+            self._client = None
+
+        def search(self, query, limit=5, metadata_filter=None, score_threshold=0.6):
+            if index.embedder == DEFAULT_EMBEDDER:
+                score_threshold = min(score_threshold, HASHED_SCORE_THRESHOLD)
+            return index.search(" ".join(query), limit=limit, score_threshold=score_threshold)
+
+        def save(self, documents):
+            # Documents are added by rebuilding the index from knowledge/
+            pass
+
+        def reset(self):
+            pass
+
+    return Knowledge(collection_name="knowledge", sources=[], storage=IndexedKnowledgeStorage())
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point for building and querying the knowledge index."""
+    parser = argparse.ArgumentParser(description="Persisted embedding index over the knowledge directory")
+    parser.add_argument("--knowledge-dir", default=str(DEFAULT_KNOWLEDGE_DIR))
+    parser.add_argument("--embedder", default=DEFAULT_EMBEDDER, help="'hashed' (local) or a litellm embedding model")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("build", help="Build or refresh the index")
+    search = commands.add_parser("search", help="Query the index")
+    search.add_argument("query")
+    search.add_argument("-k", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    index = get_knowledge_index(args.knowledge_dir, args.embedder)
+    if index is None:
+        print(f"No knowledge files in {args.knowledge_dir}")
+        return 1
+    if args.command == "build":
+        print(f"Index holds {len(index)} chunks from {len(index.manifest['files'])} files ({time.perf_counter() - start:.2f}s)")
+        return 0
+
+    for hit in index.search(args.query, limit=args.k):
+        print(f"{hit['score']:.3f}  {hit['id']}  {hit['content'][:80]!r}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
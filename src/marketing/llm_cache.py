@@ -0,0 +1,362 @@
+"""
+Response cache in front of the crew's LLM client.
+
+``CachedLLM`` is a drop-in ``crewai.LLM`` whose text completions are cached
+on disk. Exact lookups are keyed on a hash of the model, the sampling
+parameters that change the output and the whitespace-normalized messages.
+
+Near-duplicate lookup is optional. When a similarity threshold is set, a
+miss is retried among earlier calls that share everything except the last
+message (same model, parameters, system prompt and conversation so far);
+the last message is compared with locally computed hashed bag-of-words
+embeddings, and the closest stored response is reused when its cosine
+similarity reaches the threshold. Restricting candidates to the same
+conversation prefix keeps an agent's reasoning loop from being answered
+with a response to a different task.
+
+Responses live in a ``ResultCache`` (memory LRU + SQLite with TTL and size
+eviction). Embeddings for near-duplicate lookup are only stored while a
+threshold is set, sparsely (the non-zero columns and their weights), in a
+side table. The side table is pruned on the same write cadence as the
+responses: rows past the TTL, rows whose response was evicted and the
+oldest rows beyond the entry limit are deleted.
+
+Calls that reach the model go through the shared "llm" rate limiter.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from crewai import LLM
+from crewai.utilities.llm_utils import create_llm
+
+from marketing.instrumentation import get_instrumentation
+from marketing.rate_limits import call_with_rate_limit, get_rate_limiter
+from marketing.storage import cache_path
+from marketing.summarizer import estimate_tokens
+from marketing.tools.result_cache import ResultCache
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 20_000
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+EMBEDDING_DIMENSIONS = 2 ** 14
+# Completion size assumed when reserving tokens for a call without max_tokens
+DEFAULT_COMPLETION_TOKENS = 500
+# Side-table pruning runs once every this many writes, like ResultCache eviction
+_EVICTION_INTERVAL = 100
+
+# Parameters that change what the model returns for the same messages
+_OUTPUT_PARAMETERS = (
+    "temperature", "top_p", "n", "stop", "max_tokens", "max_completion_tokens",
+    "presence_penalty", "frequency_penalty", "logit_bias", "seed", "reasoning_effort",
+)
+# Constructor arguments copied when wrapping an existing LLM
+_LLM_ARGUMENTS = _OUTPUT_PARAMETERS + (
+    "model", "timeout", "logprobs", "top_logprobs", "base_url", "api_base", "api_version", "api_key",
+)
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+_MISSING = object()
+
+
+def normalize_messages(messages: Union[str, List[Dict[str, Any]]]) -> List[Tuple[str, str]]:
+    """Return ``(role, content)`` pairs with whitespace collapsed."""
+    if isinstance(messages, str):
+        messages = [{"role": "user", "content": messages}]
+    return [(message.get("role", "user"), " ".join(str(message.get("content", "")).split())) for message in messages]
+
+
+def _digest(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def embed_text(text: str, dimensions: int = EMBEDDING_DIMENSIONS) -> np.ndarray:
+    """Embed ``text`` as an L2-normalized hashed bag of unigrams and bigrams."""
+    tokens = _TOKEN_PATTERN.findall(text.lower())
+    terms = tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+    vector = np.zeros(dimensions, dtype=np.float32)
+    if not terms:
+        return vector
+    # crc32 keeps embeddings stable across processes
+    columns = np.fromiter((zlib.crc32(term.encode("utf-8")) % dimensions for term in terms), dtype=np.int64, count=len(terms))
+    np.add.at(vector, columns, 1.0)
+    np.log1p(vector, out=vector)
+    vector /= np.linalg.norm(vector)
+    return vector
+
+
+def _pack_vector(vector: np.ndarray) -> Tuple[bytes, bytes]:
+    """Return the non-zero columns (uint16) and weights (float32) of an embedding."""
+    columns = np.flatnonzero(vector)
+    return columns.astype(np.uint16).tobytes(), vector[columns].astype(np.float32).tobytes()
+
+
+def _unpack_vectors(rows: List[Tuple[bytes, bytes]], dimensions: int = EMBEDDING_DIMENSIONS) -> np.ndarray:
+    """Expand packed embeddings into a dense ``len(rows) x dimensions`` matrix."""
+    matrix = np.zeros((len(rows), dimensions), dtype=np.float32)
+    for number, (columns, weights) in enumerate(rows):
+        matrix[number, np.frombuffer(columns, dtype=np.uint16)] = np.frombuffer(weights, dtype=np.float32)
+    return matrix
+
+
+class LLMResponseCache:
+    """Exact and near-duplicate cache of LLM text responses."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        similarity_threshold: Optional[float] = None,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.path = Path(path)
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.responses = ResultCache(
+            self.path,
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+            max_age_seconds=ttl_seconds,
+        )
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._vectors = sqlite3.connect(
+            str(self.path.with_name(self.path.stem + "_vectors.sqlite")),
+            check_same_thread=False,
+            isolation_level=None,
+            uri=True,
+        )
+        self._vectors.execute("PRAGMA journal_mode=WAL")
+        # Dense 64 KiB rows of earlier versions
+        self._vectors.execute("DROP TABLE IF EXISTS vectors")
+        self._vectors.execute(
+            "CREATE TABLE IF NOT EXISTS sparse_vectors ("
+            " key TEXT PRIMARY KEY, prefix TEXT NOT NULL, columns BLOB NOT NULL, weights BLOB NOT NULL,"
+            " created REAL NOT NULL)"
+        )
+        self._vectors.execute("CREATE INDEX IF NOT EXISTS sparse_vectors_prefix ON sparse_vectors (prefix)")
+        self._vectors.execute("CREATE INDEX IF NOT EXISTS sparse_vectors_created ON sparse_vectors (created)")
+        # Read-only view of the responses, to drop vectors of evicted responses
+        self._vectors.execute("ATTACH DATABASE ? AS responses", (self.path.resolve().as_uri() + "?mode=ro",))
+
+    @staticmethod
+    def keys(model: str, parameters: Dict[str, Any], messages: List[Tuple[str, str]]) -> Tuple[str, str]:
+        """Return the exact key and the conversation-prefix key of a call."""
+        exact = _digest({"model": model, "parameters": parameters, "messages": messages})
+        prefix = _digest({"model": model, "parameters": parameters, "messages": messages[:-1]})
+        return exact, prefix
+
+    def get(self, model: str, parameters: Dict[str, Any], messages: List[Tuple[str, str]]) -> Optional[str]:
+        """Return a cached response for the call or ``None``."""
+        exact, prefix = self.keys(model, parameters, messages)
+        response = self.responses.get(exact, _MISSING)
+        if response is not _MISSING:
+            with self._lock:
+                self.exact_hits += 1
+            return response
+
+        if self.similarity_threshold is not None and messages:
+            key = self._nearest(prefix, embed_text(messages[-1][1]))
+            if key is not None:
+                response = self.responses.get(key, _MISSING)
+                if response is not _MISSING:
+                    with self._lock:
+                        self.near_hits += 1
+                    return response
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, model: str, parameters: Dict[str, Any], messages: List[Tuple[str, str]], response: str) -> None:
+        """Store ``response`` for the call."""
+        exact, prefix = self.keys(model, parameters, messages)
+        self.responses.put(exact, response)
+        with self._lock:
+            if self.similarity_threshold is not None and messages:
+                columns, weights = _pack_vector(embed_text(messages[-1][1]))
+                self._vectors.execute(
+                    "INSERT OR REPLACE INTO sparse_vectors (key, prefix, columns, weights, created) VALUES (?, ?, ?, ?, ?)",
+                    (exact, prefix, columns, weights, time.time()),
+                )
+            self._writes += 1
+            if self._writes % _EVICTION_INTERVAL == 0:
+                self._evict_vectors()
+
+    def _nearest(self, prefix: str, vector: np.ndarray) -> Optional[str]:
+        with self._lock:
+            rows = self._vectors.execute(
+                "SELECT key, columns, weights FROM sparse_vectors WHERE prefix = ? AND created >= ?",
+                (prefix, time.time() - self.ttl_seconds),
+            ).fetchall()
+        if not rows:
+            return None
+        matrix = _unpack_vectors([(columns, weights) for _, columns, weights in rows], len(vector))
+        similarities = matrix @ vector
+        best = int(np.argmax(similarities))
+        return rows[best][0] if similarities[best] >= self.similarity_threshold else None
+
+    def evict(self) -> None:
+        """Enforce the TTL and size limits now."""
+        self.responses.evict()
+        with self._lock:
+            self._evict_vectors()
+
+    def _evict_vectors(self) -> None:
+        self._vectors.execute("DELETE FROM sparse_vectors WHERE created < ?", (time.time() - self.ttl_seconds,))
+        self._vectors.execute("DELETE FROM sparse_vectors WHERE key NOT IN (SELECT key FROM responses.entries)")
+        (count,) = self._vectors.execute("SELECT COUNT(*) FROM sparse_vectors").fetchone()
+        if count > self.max_entries:
+            self._vectors.execute(
+                "DELETE FROM sparse_vectors WHERE key IN (SELECT key FROM sparse_vectors ORDER BY created LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters and store size."""
+        with self._lock:
+            lookups = self.exact_hits + self.near_hits + self.misses
+            hits = self.exact_hits + self.near_hits
+            return {
+                "exact_hits": self.exact_hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "entries": self.responses.stats()["entries"],
+            }
+
+    def close(self) -> None:
+        self.responses.close()
+        with self._lock:
+            self._vectors.close()
+
+
+_llm_cache: Optional[LLMResponseCache] = None
+_llm_cache_lock = threading.Lock()
+_llm_cache_settings: Dict[str, Any] = {"enabled": True, "similarity_threshold": None}
+
+
+def configure_llm_cache(enabled: bool = True, similarity_threshold: Optional[float] = None) -> None:
+    """Set how the process-wide LLM cache behaves; call before the first LLM call."""
+    global _llm_cache
+    with _llm_cache_lock:
+        _llm_cache_settings.update(enabled=enabled, similarity_threshold=similarity_threshold)
+        if _llm_cache is not None:
+            _llm_cache.similarity_threshold = similarity_threshold
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Return the process-wide LLM response cache, or ``None`` when disabled."""
+    global _llm_cache
+    if not _llm_cache_settings["enabled"]:
+        return None
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                _llm_cache = LLMResponseCache(
+                    cache_path("llm_responses.sqlite"),
+                    similarity_threshold=_llm_cache_settings["similarity_threshold"],
+                )
+    return _llm_cache
+
+
+def llm_cache_metrics() -> Dict[str, float]:
+    """Return the LLM cache counters as run metrics."""
+    if _llm_cache is None:
+        return {}
+    stats = _llm_cache.stats()
+    return {
+        "llm_cache_exact_hits": stats["exact_hits"],
+        "llm_cache_near_hits": stats["near_hits"],
+        "llm_cache_misses": stats["misses"],
+        "llm_cache_hit_rate": stats["hit_rate"],
+        "llm_cache_entries": stats["entries"],
+    }
+
+
+class _UsageRecorder:
+    """LLM callback that keeps the token usage the provider reported for a call."""
+
+    def __init__(self):
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def log_success_event(self, kwargs, response_obj, start_time, end_time):
+        usage = response_obj.get("usage")
+        self.prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+        self.completion_tokens += getattr(usage, "completion_tokens", 0) or 0
+
+
+class CachedLLM(LLM):
+    """``crewai.LLM`` that serves repeated text completions from the response cache.
+
+    Calls that pass tool schemas or streaming calls go straight to the model,
+    as do calls whose result is not plain text.
+    """
+
+    def _cache_parameters(self) -> Dict[str, Any]:
+        parameters = {name: getattr(self, name, None) for name in _OUTPUT_PARAMETERS}
+        if isinstance(parameters["stop"], list):
+            parameters["stop"] = sorted(parameters["stop"])
+        return parameters
+
+    def _call_model(self, messages, tools, callbacks, available_functions, from_task, from_agent):
+        prompt_tokens = sum(estimate_tokens(content) for _, content in normalize_messages(messages))
+        reserved = prompt_tokens + (self.max_tokens or DEFAULT_COMPLETION_TOKENS)
+        usage = _UsageRecorder()
+        with get_instrumentation().span(
+            "llm", self.model, task=getattr(from_task, "name", None), agent=getattr(from_agent, "role", None)
+        ) as span:
+            response = call_with_rate_limit(
+                "llm",
+                lambda: super(CachedLLM, self).call(
+                    messages, tools, list(callbacks or []) + [usage], available_functions, from_task, from_agent
+                ),
+                tokens=reserved,
+            )
+            completion_tokens = estimate_tokens(response) if isinstance(response, str) else 0
+            span["tokens_in"] = usage.prompt_tokens or prompt_tokens
+            span["tokens_out"] = usage.completion_tokens or completion_tokens
+        if isinstance(response, str):
+            get_rate_limiter("llm").record_tokens(reserved, span["tokens_in"] + span["tokens_out"])
+        return response
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        cache = get_llm_cache()
+        if cache is None or tools or self.stream:
+            return self._call_model(messages, tools, callbacks, available_functions, from_task, from_agent)
+
+        normalized = normalize_messages(messages)
+        parameters = self._cache_parameters()
+        response = cache.get(self.model, parameters, normalized)
+        if response is not None:
+            return response
+
+        response = self._call_model(messages, tools, callbacks, available_functions, from_task, from_agent)
+        if isinstance(response, str) and response:
+            cache.put(self.model, parameters, normalized, response)
+        return response
+
+
+def cached_llm(llm: Union[str, LLM, None] = None) -> CachedLLM:
+    """Return a ``CachedLLM`` configured like ``llm``.
+
+    ``None`` uses the same environment variables and default model crewai
+    uses for agents without an explicit LLM.
+    """
+    base = create_llm(llm)
+    arguments = {name: getattr(base, name, None) for name in _LLM_ARGUMENTS}
+    return CachedLLM(**{name: value for name, value in arguments.items() if value is not None})
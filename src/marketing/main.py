@@ -1,12 +1,11 @@
 #!/usr/bin/env python
+import argparse
 import sys
 import warnings
 
 from datetime import datetime
-import mlflow
 import os
 import time
-from marketing.crew import Marketing
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -16,34 +15,87 @@ warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
 # Add project root to path for mlflow imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
-from mlflow_utils import setup_mlflow, log_parameters_safe, log_metrics_safe, log_artifacts_safe, log_directories_safe, log_metrics_files_safe, create_run_context
+# mlflow_utils imports MLflow and connects to the tracking server on first use
+from mlflow_utils import log_parameters_safe, log_metrics_safe, log_step_metrics_safe, log_run_outputs_safe, create_run_context, async_run_context
 
-# Setup MLflow
-setup_mlflow()
+# crewai, crewai_tools and mlflow take seconds to import, so they are loaded
+# inside the functions that need them rather than at module import
 
-def run():
-    """Run the AI/ML Research Scientist LinkedIn Marketing and Research Publication crew"""
+CONFIG_DIR = os.path.join(os.path.dirname(__file__), 'config')
+INSTRUMENTATION_TABLE = 'resources/outputs/instrumentation.csv'
+
+def get_inputs():
+    """Return the inputs passed to the crew."""
+    return {
+        "user_profession": "AI/ML Research Scientist",
+        "target_industries": "Technology, Healthcare, Finance, Research Labs, AI Companies",
+        "user_location": "United States (open to relocation)",
+        "user_experience": "5+ years in AI/ML research and engineering with expertise in LLM architectures, performance analysis, and technical benchmarking",
+        "user_projects": "InboxAI: Intelligent Email Assistant using LLMs - Deployed LangGraph, OpenAI/Llama3 LLMs, and Gmail/Outlook APIs for seamless real-time email retrieval and dynamic reply generation. Orchestrated ML workflows with Apache Airflow, leveraging Chroma DB vector embeddings for rapid semantic search across email data. Health Bot: Healthcare Assistant using LLMs - Constructed a Bi-RNN, GloVe, BERT pipeline for NLP-driven disease diagnosis, boosting precision in healthcare conversational AI tasks. Enhanced response accuracy through LoRA and RLHF, enabling advanced semantic interaction and nuanced dialogue with healthcare users.",
+        "research_interests": "Advanced LLM architectures, Performance benchmarking and analysis, Transformer optimizations, Training methodologies, Efficiency improvements, Multimodal LLMs, RAG systems optimization, Technical implementation analysis, Comparative performance studies, Novel training techniques",
+        "current_date": datetime.now().strftime("%Y-%m-%d"),
+    }
+
+def dry_run():
+    """Print the crew configuration and inputs without importing crewai or contacting MLflow."""
+    import yaml
+    from marketing.scheduler import format_schedule, graph_from_config
+
+    with open(os.path.join(CONFIG_DIR, 'agents.yaml'), 'r') as f:
+        agents_config = yaml.safe_load(f)
+    with open(os.path.join(CONFIG_DIR, 'tasks.yaml'), 'r') as f:
+        tasks_config = yaml.safe_load(f)
+
+    print("Agents:")
+    for name, config in agents_config.items():
+        print(f"  {name}: {', '.join(config.get('tools', [])) or 'no tools'}")
+    print("Tasks:")
+    for index, name in enumerate(tasks_config, 1):
+        print(f"  {index}. {name}")
+    print(format_schedule(graph_from_config(tasks_config)))
+    print("Inputs:")
+    for key, value in get_inputs().items():
+        print(f"  {key}: {value[:80]}{'...' if len(value) > 80 else ''}")
+    print(f"OpenAI API Key configured: {'Yes' if os.getenv('OPENAI_API_KEY') else 'No'}")
+    print(f"Serper API Key configured: {'Yes' if os.getenv('SERPER_API_KEY') else 'No'}")
+
+def import_profile():
+    """Print the import-time breakdown of a full run."""
+    from marketing.import_profile import format_report, profile_imports
+
+    print(format_report(profile_imports()))
+
+def run(scheduler="sequential", max_concurrency=None, async_tracking=False, bundle_artifacts=False):
+    """Run the AI/ML Research Scientist LinkedIn Marketing and Research Publication crew
+
+    With scheduler="dag", tasks run as soon as the tasks listed in their
+    `depends_on` have finished, so independent branches run concurrently.
+    With async_tracking=True, MLflow calls are queued to a background thread
+    and only flushed when the run ends, so they overlap with the crew.
+    With bundle_artifacts=True, the run's output files are uploaded as one
+    compressed bundle instead of one artifact per file.
+    """
     
+    from marketing.crew import Marketing
+    from marketing.instrumentation import get_instrumentation
+    from marketing.llm_cache import llm_cache_metrics
+    from marketing.rate_limits import rate_limit_metrics
+    from marketing.tools.http_cache import http_cache_metrics
+    from marketing.tools.result_cache import tool_cache_metrics
+    
+    run_context = async_run_context if async_tracking else create_run_context
     try:
         print("Starting AI/ML Research Scientist Marketing Workflow...")
         print(f"OpenAI API Key configured: {'Yes' if os.getenv('OPENAI_API_KEY') else 'No'}")
         print(f"Serper API Key configured: {'Yes' if os.getenv('SERPER_API_KEY') else 'No'}")
         
         # Start MLflow run
-        with create_run_context():
+        with run_context():
             
             start_time = time.time()
             
             # Define inputs for the crew
-            inputs = {
-                "user_profession": "AI/ML Research Scientist",
-                "target_industries": "Technology, Healthcare, Finance, Research Labs, AI Companies",
-                "user_location": "United States (open to relocation)",
-                "user_experience": "5+ years in AI/ML research and engineering with expertise in LLM architectures, performance analysis, and technical benchmarking",
-                "user_projects": "InboxAI: Intelligent Email Assistant using LLMs - Deployed LangGraph, OpenAI/Llama3 LLMs, and Gmail/Outlook APIs for seamless real-time email retrieval and dynamic reply generation. Orchestrated ML workflows with Apache Airflow, leveraging Chroma DB vector embeddings for rapid semantic search across email data. Health Bot: Healthcare Assistant using LLMs - Constructed a Bi-RNN, GloVe, BERT pipeline for NLP-driven disease diagnosis, boosting precision in healthcare conversational AI tasks. Enhanced response accuracy through LoRA and RLHF, enabling advanced semantic interaction and nuanced dialogue with healthcare users.",
-                "research_interests": "Advanced LLM architectures, Performance benchmarking and analysis, Transformer optimizations, Training methodologies, Efficiency improvements, Multimodal LLMs, RAG systems optimization, Technical implementation analysis, Comparative performance studies, Novel training techniques",
-                "current_date": datetime.now().strftime("%Y-%m-%d"),
-            }
+            inputs = get_inputs()
             
             # Log parameters
             log_parameters_safe(inputs)
@@ -52,7 +104,11 @@ def run():
             print("Creating Marketing crew...")
             crew = Marketing()
             print("Starting crew execution...")
-            result = crew.crew().kickoff(inputs)
+            if scheduler == "dag":
+                from marketing.scheduler import kickoff_dag
+                result = kickoff_dag(crew.crew(), inputs, max_concurrency=max_concurrency)
+            else:
+                result = crew.crew().kickoff(inputs)
             print("Crew execution completed!")
             
             # Calculate execution time
@@ -67,12 +123,19 @@ def run():
                 "execution_time_minutes": execution_time_minutes,
                 "total_execution_time_seconds": execution_time
             }
+            metrics.update(tool_cache_metrics())
+            metrics.update(http_cache_metrics())
+            metrics.update(llm_cache_metrics())
+            metrics.update(rate_limit_metrics())
+            metrics.update(get_instrumentation().summary())
             log_metrics_safe(metrics)
             
-            # Log artifacts, directories, and metrics files
-            log_artifacts_safe()
-            log_directories_safe()
-            log_metrics_files_safe()
+            # Per task, agent step, LLM call and tool call timings
+            log_step_metrics_safe(get_instrumentation().step_metrics())
+            
+            # Log artifacts, directories, metrics files and the span table;
+            # only content the experiment does not store yet is uploaded
+            log_run_outputs_safe([get_instrumentation().write_table(INSTRUMENTATION_TABLE)], bundle=bundle_artifacts)
             
             print("Workflow completed successfully!")
             return result
@@ -81,16 +144,135 @@ def run():
         print(f"Error during workflow execution: {e}")
         # Log error metrics
         try:
-            with create_run_context():
+            with run_context():
                 log_metrics_safe({"execution_successful": 0, "error": str(e)})
         except:
             pass
         raise
 
-if __name__ == "__main__":
+def batch(profiles_path, results_path=None, workers=None, scheduler="sequential", max_concurrency=None):
+    """Run the crew for every profile in a JSONL file under one MLflow parent run."""
+    from marketing.batch import DEFAULT_RESULTS_PATH, DEFAULT_WORKERS, format_report, run_batch
+    from marketing.llm_cache import llm_cache_metrics
+    from marketing.rate_limits import rate_limit_metrics
+    from marketing.tools.http_cache import http_cache_metrics
+    from marketing.tools.result_cache import tool_cache_metrics
+
+    with create_run_context(run_name=f"batch_{os.path.splitext(os.path.basename(profiles_path))[0]}") as parent_run:
+        log_parameters_safe({"profiles_path": profiles_path, "workers": workers or DEFAULT_WORKERS, "scheduler": scheduler})
+        report = run_batch(
+            profiles_path,
+            results_path=results_path or DEFAULT_RESULTS_PATH,
+            workers=workers or DEFAULT_WORKERS,
+            parent_run_id=parent_run.info.run_id,
+            scheduler=scheduler,
+            max_concurrency=max_concurrency,
+        )
+        print(format_report(report))
+        metrics = dict(report)
+        metrics.update(tool_cache_metrics())
+        metrics.update(http_cache_metrics())
+        metrics.update(llm_cache_metrics())
+        metrics.update(rate_limit_metrics())
+        log_metrics_safe(metrics)
+    return report
+
+def replay():
+    """Resume the crew from its task checkpoints
+
+    Usage: replay [task_name | task_id]. Without an argument the crew resumes
+    at the first task that has no checkpoint for the most recent inputs; a
+    task name resumes at that task. Any other argument is treated as a
+    crewAI task id (see `crewai log-tasks-outputs`) and replayed by crewAI.
+    """
+    from marketing.checkpoints import replay_crew
+    from marketing.crew import Marketing
+
+    target = sys.argv[1] if len(sys.argv) > 1 else None
+    crew = Marketing().crew()
+    try:
+        if target is None or target in {task.name for task in crew.tasks}:
+            return replay_crew(crew, task_name=target)
+        return crew.replay(task_id=target)
+    except Exception as e:
+        raise Exception(f"An error occurred while replaying the crew: {e}")
+
+def train():
+    """Train the crew for a given number of iterations
+
+    Usage: train <n_iterations> <filename>
+    """
+    from marketing.crew import Marketing
+
+    try:
+        Marketing().crew().train(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=get_inputs())
+    except Exception as e:
+        raise Exception(f"An error occurred while training the crew: {e}")
+
+def test():
+    """Test the crew execution and return the results
+
+    Usage: test <n_iterations> <eval_llm>
+    """
+    from marketing.crew import Marketing
+
     try:
-        result = run()
-        sys.exit(0)  # Exit with success code
+        Marketing().crew().test(n_iterations=int(sys.argv[1]), eval_llm=sys.argv[2], inputs=get_inputs())
+    except Exception as e:
+        raise Exception(f"An error occurred while testing the crew: {e}")
+
+def main(argv=None):
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Run the AI/ML Research Scientist marketing crew")
+    parser.add_argument("--dry-run", action="store_true", help="Show agents, tools, tasks and inputs without running the crew")
+    parser.add_argument("--import-profile", action="store_true", help="Report the import-time breakdown of a full run and exit")
+    parser.add_argument("--scheduler", choices=["sequential", "dag"], default="sequential", help="Run tasks in order, or concurrently following their declared depends_on")
+    parser.add_argument("--no-llm-cache", action="store_true", help="Send every LLM call to the model instead of reusing cached responses")
+    parser.add_argument("--llm-cache-similarity", type=float, default=None, metavar="THRESHOLD", help="Also reuse responses to near-duplicate prompts with cosine similarity >= THRESHOLD (e.g. 0.97)")
+    parser.add_argument("--local-summarizer", type=int, nargs="?", const=800, default=None, metavar="TOKENS", help="Run the summarize_* tasks with a local extractive summarizer (default budget: 800 tokens) instead of the LLM")
+    parser.add_argument("--max-concurrency", type=int, default=None, help="Maximum number of tasks running at once with --scheduler dag")
+    parser.add_argument("--llm-rpm", type=float, default=None, help="LLM requests per minute shared by all agents (default: 500)")
+    parser.add_argument("--llm-tpm", type=float, default=None, help="LLM tokens per minute shared by all agents (default: 200000)")
+    parser.add_argument("--batch", metavar="PROFILES_JSONL", default=None, help="Run the crew for every profile (one JSON object of inputs per line) in the file")
+    parser.add_argument("--batch-output", metavar="RESULTS_JSONL", default=None, help="Where --batch appends per-profile results (default: resources/outputs/batch_results.jsonl)")
+    parser.add_argument("--workers", type=int, default=None, help="Number of profiles --batch runs at once (default: 4)")
+    parser.add_argument("--async-tracking", action="store_true", help="Send MLflow tracking calls through a background queue so they never delay the crew")
+    parser.add_argument("--bundle-artifacts", action="store_true", help="Upload the run's output files as one compressed, indexed bundle (python -m mlflow_utils.bundle reads it)")
+    args = parser.parse_args(argv)
+
+    if args.import_profile:
+        import_profile()
+        return 0
+    if args.dry_run:
+        dry_run()
+        return 0
+
+    if args.no_llm_cache or args.llm_cache_similarity is not None:
+        from marketing.llm_cache import configure_llm_cache
+        configure_llm_cache(enabled=not args.no_llm_cache, similarity_threshold=args.llm_cache_similarity)
+
+    if args.local_summarizer is not None:
+        from marketing.summarizer import configure_local_summarizer
+        configure_local_summarizer(token_budget=args.local_summarizer)
+
+    if args.llm_rpm is not None or args.llm_tpm is not None:
+        from marketing.rate_limits import configure_rate_limit
+        configure_rate_limit("llm", rpm=args.llm_rpm, tpm=args.llm_tpm)
+
+    if args.batch:
+        report = batch(args.batch, args.batch_output, args.workers, scheduler=args.scheduler, max_concurrency=args.max_concurrency)
+        return 0 if report["batch_profiles_failed"] == 0 else 1
+
+    try:
+        run(scheduler=args.scheduler, max_concurrency=args.max_concurrency, async_tracking=args.async_tracking, bundle_artifacts=args.bundle_artifacts)
+        return 0  # Exit with success code
     except Exception as e:
         print(f"Fatal error: {e}")
-        sys.exit(1)  # Exit with error code
+        return 1  # Exit with error code
+
+def cli():
+    """Console script entry point: run ``main`` on the command line arguments and exit with its status."""
+    sys.exit(main())
+
+if __name__ == "__main__":
+    cli()
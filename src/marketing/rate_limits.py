@@ -0,0 +1,284 @@
+"""
+Process-wide rate limiting for LLM and external API calls.
+
+Every agent and tool shares one ``RateLimiter`` per upstream service
+("llm", "serper", "scrape"). A limiter holds a requests-per-minute token
+bucket and, optionally, a tokens-per-minute bucket, so the crew as a whole
+uses the provider's quota rather than a fixed per-agent cap.
+
+Waiting callers are served by priority, then arrival. Tasks on the critical
+path run with a higher priority (see ``rate_limit_priority``), so when the
+quota is tight they are not stuck behind calls that have slack.
+
+A 429 response halves the limiter's effective rate and pauses it, honouring
+``Retry-After`` when present, with exponential backoff on consecutive 429s.
+Successful calls restore the rate gradually. Time spent waiting in the
+queue is recorded per limiter and reported as run metrics.
+
+Limits default to ``DEFAULT_LIMITS`` and can be overridden with
+``configure_rate_limit`` or environment variables such as
+``MARKETING_RATE_LIMIT_LLM_RPM`` and ``MARKETING_RATE_LIMIT_LLM_TPM``.
+"""
+
+import contextvars
+import heapq
+import itertools
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from marketing.instrumentation import get_instrumentation
+
+DEFAULT_LIMITS: Dict[str, Dict[str, Optional[float]]] = {
+    "llm": {"rpm": 500, "tpm": 200_000},
+    "serper": {"rpm": 100, "tpm": None},
+    "scrape": {"rpm": 60, "tpm": None},
+}
+ENV_PREFIX = "MARKETING_RATE_LIMIT_"
+
+DEFAULT_MAX_RETRIES = 4
+# Lower values are served first
+CRITICAL_PRIORITY = 0
+DEFAULT_PRIORITY = 1
+
+_MIN_RATE_FACTOR = 0.1
+_RATE_RECOVERY = 0.05
+_BASE_BACKOFF_SECONDS = 2.0
+_MAX_BACKOFF_SECONDS = 120.0
+
+_priority: contextvars.ContextVar = contextvars.ContextVar("rate_limit_priority", default=DEFAULT_PRIORITY)
+
+
+@contextmanager
+def rate_limit_priority(priority: int) -> Iterator[None]:
+    """Run the enclosed calls (and threads started with copied context) at ``priority``."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class TokenBucket:
+    """Continuously refilled bucket of ``per_minute`` units, holding at most one minute's worth."""
+
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self.capacity = per_minute
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def refill(self, now: float, factor: float = 1.0) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.per_minute * factor / 60)
+        self.updated = now
+
+    def wait_time(self, amount: float, factor: float = 1.0) -> float:
+        """Seconds until ``amount`` units are available (0 when they are now)."""
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) * 60 / (self.per_minute * factor)
+
+
+class RateLimiter:
+    """Shared RPM/TPM limiter with a priority queue and adaptive backoff."""
+
+    def __init__(self, name: str, rpm: float, tpm: Optional[float] = None):
+        self.name = name
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.rate_factor = 1.0
+        self.paused_until = 0.0
+        self.consecutive_throttles = 0
+
+        self._condition = threading.Condition()
+        self._queue: list = []
+        self._arrivals = itertools.count()
+
+        self.calls = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def acquire(self, tokens: float = 0, priority: Optional[int] = None) -> float:
+        """Block until a request (and ``tokens`` tokens) may be sent; return the wait in seconds."""
+        entry = (_priority.get() if priority is None else priority, next(self._arrivals))
+        start = time.monotonic()
+        with self._condition:
+            heapq.heappush(self._queue, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    delay = self._delay(now, tokens) if self._queue[0] == entry else None
+                    if delay == 0:
+                        break
+                    self._condition.wait(timeout=delay)
+                heapq.heappop(self._queue)
+                self.requests.level -= 1
+                if self.tokens is not None:
+                    self.tokens.level -= min(tokens, self.tokens.capacity)
+            finally:
+                if entry in self._queue:
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+                self._condition.notify_all()
+
+            waited = time.monotonic() - start
+            self.calls += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+        return waited
+
+    def _delay(self, now: float, tokens: float) -> float:
+        if now < self.paused_until:
+            return self.paused_until - now
+        self.requests.refill(now, self.rate_factor)
+        delay = self.requests.wait_time(1, self.rate_factor)
+        if self.tokens is not None:
+            self.tokens.refill(now, self.rate_factor)
+            delay = max(delay, self.tokens.wait_time(tokens, self.rate_factor))
+        return delay
+
+    def record_tokens(self, estimated: float, actual: float) -> None:
+        """Correct the token bucket once a call's real token count is known."""
+        if self.tokens is not None:
+            with self._condition:
+                self.tokens.level -= actual - estimated
+
+    def report_success(self) -> None:
+        with self._condition:
+            self.consecutive_throttles = 0
+            self.rate_factor = min(1.0, self.rate_factor + _RATE_RECOVERY)
+
+    def report_throttled(self, retry_after: Optional[float] = None) -> float:
+        """Slow down after a 429 and return how long the limiter pauses."""
+        with self._condition:
+            self.throttled += 1
+            self.consecutive_throttles += 1
+            self.rate_factor = max(_MIN_RATE_FACTOR, self.rate_factor / 2)
+            backoff = min(_MAX_BACKOFF_SECONDS, _BASE_BACKOFF_SECONDS * 2 ** (self.consecutive_throttles - 1))
+            pause = max(retry_after or 0.0, backoff)
+            self.paused_until = max(self.paused_until, time.monotonic() + pause)
+            # Drain the buckets so queued callers do not burst after the pause
+            self.requests.level = min(self.requests.level, 0)
+            self._condition.notify_all()
+            return pause
+
+    def stats(self) -> Dict[str, float]:
+        with self._condition:
+            return {
+                "calls": self.calls,
+                "throttled": self.throttled,
+                "wait_seconds_total": self.total_wait,
+                "wait_seconds_mean": self.total_wait / self.calls if self.calls else 0.0,
+                "wait_seconds_max": self.max_wait,
+                "rate_factor": self.rate_factor,
+            }
+
+
+_limit_overrides: Dict[str, Dict[str, Optional[float]]] = {}
+
+
+def _configured_limit(name: str, key: str) -> Optional[float]:
+    override = _limit_overrides.get(name, {}).get(key)
+    if override is not None:
+        return override
+    value = os.getenv(f"{ENV_PREFIX}{name.upper()}_{key.upper()}")
+    if value is not None:
+        return float(value) or None
+    return DEFAULT_LIMITS.get(name, {}).get(key)
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str) -> RateLimiter:
+    """Return the process-wide limiter for the service ``name``."""
+    limiter = _limiters.get(name)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(name)
+            if limiter is None:
+                rpm = _configured_limit(name, "rpm")
+                if rpm is None:
+                    raise KeyError(f"No rate limit configured for '{name}'; set {ENV_PREFIX}{name.upper()}_RPM")
+                limiter = _limiters[name] = RateLimiter(name, rpm, _configured_limit(name, "tpm"))
+    return limiter
+
+
+def configure_rate_limit(name: str, rpm: Optional[float] = None, tpm: Optional[float] = None) -> None:
+    """Override the requests and/or tokens per minute allowed for the service ``name``."""
+    with _limiters_lock:
+        _limit_overrides.setdefault(name, {}).update(
+            {key: value for key, value in (("rpm", rpm), ("tpm", tpm)) if value is not None}
+        )
+        # Limiters are rebuilt with the new limits on next use
+        _limiters.pop(name, None)
+
+
+def rate_limit_metrics() -> Dict[str, float]:
+    """Return queue wait and throttling counters of every limiter used so far."""
+    metrics = {}
+    for name, limiter in list(_limiters.items()):
+        for key, value in limiter.stats().items():
+            metrics[f"rate_limit_{name}_{key}"] = value
+    return metrics
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    """Return whether ``error`` is an HTTP 429 / rate-limit error.
+
+    Judged by the status code or the litellm error type only; error
+    messages can mention "429" or "rate limit" for unrelated reasons.
+    """
+    # litellm is only imported by the time one of its errors can be raised
+    litellm = sys.modules.get("litellm")
+    if litellm is not None and isinstance(error, litellm.RateLimitError):
+        return True
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    return status == 429
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def call_with_rate_limit(
+    name: str,
+    call: Callable[[], Any],
+    tokens: float = 0,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+) -> Any:
+    """Run ``call`` under the ``name`` limiter, retrying after 429 responses."""
+    limiter = get_rate_limiter(name)
+    instrumentation = get_instrumentation()
+    for attempt in range(max_retries + 1):
+        instrumentation.add_queue_wait(limiter.acquire(tokens))
+        try:
+            result = call()
+        except Exception as error:
+            if not is_rate_limited(error) or attempt == max_retries:
+                raise
+            limiter.report_throttled(_retry_after(error))
+            instrumentation.add_retry()
+            continue
+        limiter.report_success()
+        return result
+
+
+def rate_limited(tool_cls: type, name: str) -> type:
+    """Return a subclass of the crewai tool ``tool_cls`` whose calls go through the ``name`` limiter."""
+
+    def _run(self, *args, **kwargs):
+        return call_with_rate_limit(name, lambda: tool_cls._run(self, *args, **kwargs))
+
+    return type(tool_cls.__name__, (tool_cls,), {"_run": _run, "__module__": __name__})
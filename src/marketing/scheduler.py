@@ -0,0 +1,270 @@
+"""
+Dependency-graph scheduler for the crew's tasks.
+
+Tasks declare the tasks they build on under ``depends_on`` in ``tasks.yaml``.
+Only this scheduler reads that key; crewai ignores it, so the default
+sequential process still gives every task the output of all earlier tasks.
+This module turns the declarations into a dependency graph and runs the
+crew with asyncio, starting each task as soon as the tasks it depends on
+have finished, so independent branches (for example the blog path and the
+LinkedIn path) run at the same time. A task then sees the outputs of all
+its direct and indirect dependencies, in crew order, but not those of
+branches running alongside it.
+
+An agent works on one task at a time, because agents keep per-task
+executor state; delegation is turned off for the run, since a delegated
+call would drive the coworker outside that lock. Tasks on the critical
+path get priority in the shared rate limiters, so a tight quota delays the
+branches with slack first. The scheduler uses private ``Crew`` methods;
+when the installed crewai lacks one, ``kickoff_dag`` falls back to a plain
+sequential kickoff.
+
+Graph helpers work on plain ``{task_name: [dependency, ...]}`` mappings and
+need neither crewai nor an LLM, so the schedule can be printed in a dry run.
+"""
+
+import asyncio
+import os
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+TaskGraph = Dict[str, List[str]]
+
+TASKS_CONFIG = os.path.join(os.path.dirname(__file__), "config", "tasks.yaml")
+
+# Private Crew methods the scheduler and replay rely on; checked before use
+# because crewai may rename them in any release
+CREW_INTERNALS = (
+    "_task_output_handler",
+    "_interpolate_inputs",
+    "_set_tasks_callbacks",
+    "_prepare_tools",
+    "_log_task_start",
+    "_get_context",
+    "_process_task_result",
+    "_create_crew_output",
+)
+
+
+def missing_crew_internals(crew: Any) -> List[str]:
+    """Return the private ``Crew`` members this module needs that ``crew`` lacks."""
+    return [name for name in CREW_INTERNALS if not hasattr(crew, name)]
+
+
+def graph_from_config(tasks_config: Mapping[str, Mapping[str, Any]]) -> TaskGraph:
+    """Build the dependency graph from raw ``tasks.yaml`` contents."""
+    graph = {name: list(config.get("depends_on") or []) for name, config in tasks_config.items()}
+    validate_graph(graph)
+    return graph
+
+
+def load_task_graph(path: str = TASKS_CONFIG) -> TaskGraph:
+    """Build the dependency graph from the ``depends_on`` entries of ``tasks.yaml``."""
+    import yaml
+
+    with open(path, "r") as f:
+        return graph_from_config(yaml.safe_load(f))
+
+
+def ancestors(graph: TaskGraph, name: str) -> set:
+    """Return every task ``name`` depends on, directly or indirectly."""
+    found: set = set()
+    pending = list(graph[name])
+    while pending:
+        dependency = pending.pop()
+        if dependency not in found:
+            found.add(dependency)
+            pending.extend(graph[dependency])
+    return found
+
+
+def validate_graph(graph: TaskGraph) -> None:
+    """Raise ``ValueError`` for unknown dependencies or cycles."""
+    for name, dependencies in graph.items():
+        unknown = [dependency for dependency in dependencies if dependency not in graph]
+        if unknown:
+            raise ValueError(f"Task '{name}' depends on unknown tasks: {', '.join(unknown)}")
+    topological_levels(graph)
+
+
+def topological_levels(graph: TaskGraph) -> List[List[str]]:
+    """Group tasks into waves; every task only depends on earlier waves.
+
+    Tasks keep their declaration order within a wave.
+    """
+    remaining = dict(graph)
+    done: set = set()
+    levels = []
+    while remaining:
+        level = [name for name, dependencies in remaining.items() if all(d in done for d in dependencies)]
+        if not level:
+            raise ValueError(f"Task dependencies form a cycle among: {', '.join(remaining)}")
+        levels.append(level)
+        done.update(level)
+        for name in level:
+            del remaining[name]
+    return levels
+
+
+def critical_path(graph: TaskGraph, durations: Optional[Mapping[str, float]] = None) -> Tuple[List[str], float]:
+    """Return the longest dependency chain and its total duration.
+
+    Without ``durations`` every task counts as one step.
+    """
+    durations = durations or {}
+    finish: Dict[str, float] = {}
+    previous: Dict[str, Optional[str]] = {}
+    for level in topological_levels(graph):
+        for name in level:
+            before = max(graph[name], key=lambda dependency: finish[dependency], default=None)
+            previous[name] = before
+            finish[name] = (finish[before] if before else 0.0) + durations.get(name, 1.0)
+
+    if not finish:
+        return [], 0.0
+    node: Optional[str] = max(finish, key=finish.get)
+    length = finish[node]
+    path = []
+    while node is not None:
+        path.append(node)
+        node = previous[node]
+    return path[::-1], length
+
+
+def format_schedule(graph: TaskGraph, durations: Optional[Mapping[str, float]] = None) -> str:
+    """Render the waves and the critical path as plain text."""
+    unit = "s" if durations else " steps"
+    lines = ["Schedule:"]
+    for index, level in enumerate(topological_levels(graph), 1):
+        lines.append(f"  wave {index}: {', '.join(level)}")
+    path, length = critical_path(graph, durations)
+    total = sum((durations or {}).get(name, 1.0) for name in graph)
+    lines.append(f"Critical path ({length:.1f}{unit} of {total:.1f}{unit} sequential): {' -> '.join(path)}")
+    return "\n".join(lines)
+
+
+def prepare_crew(crew: Any, inputs: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Apply the preparation ``Crew.kickoff`` does before running its process.
+
+    Returns the inputs as rewritten by the crew's before-kickoff callbacks.
+    """
+    from crewai.utilities.i18n import I18N
+
+    missing = missing_crew_internals(crew)
+    if missing:
+        raise RuntimeError(f"This crewai version lacks Crew internals the scheduler needs: {', '.join(missing)}")
+
+    for before_callback in crew.before_kickoff_callbacks:
+        inputs = before_callback(inputs if inputs is not None else {})
+
+    crew._task_output_handler.reset()
+    if inputs is not None:
+        crew._inputs = inputs
+        crew._interpolate_inputs(inputs)
+    crew._set_tasks_callbacks()
+
+    i18n = I18N(prompt_file=crew.prompt_file)
+    for agent in crew.agents:
+        agent.i18n = i18n
+        agent.crew = crew
+        agent.set_knowledge(crew_embedder=crew.embedder)
+        if not agent.function_calling_llm:
+            agent.function_calling_llm = crew.function_calling_llm
+        if not agent.step_callback:
+            agent.step_callback = crew.step_callback
+        agent.create_agent_executor()
+    return inputs
+
+
+def _execute_task(crew: Any, task: Any, upstream: List[Any]) -> Any:
+    agent = task.agent
+    tools = crew._prepare_tools(agent, task, task.tools or agent.tools or [])
+    crew._log_task_start(task, agent.role)
+    output = task.execute_sync(agent=agent, context=crew._get_context(task, upstream), tools=tools)
+    crew._process_task_result(task, output)
+    return output
+
+
+async def kickoff_dag_async(
+    crew: Any,
+    inputs: Optional[Dict[str, Any]] = None,
+    max_concurrency: Optional[int] = None,
+    verbose: bool = True,
+    graph: Optional[TaskGraph] = None,
+) -> Any:
+    """Run ``crew`` following the task dependency graph and return its ``CrewOutput``.
+
+    ``graph`` defaults to the ``depends_on`` entries of ``tasks.yaml``. Each
+    task runs in a worker thread once its dependencies are done. At most
+    ``max_concurrency`` tasks run at once (unbounded by default).
+    """
+    missing = missing_crew_internals(crew)
+    if missing:
+        print(f"Warning: this crewai version lacks {', '.join(missing)}; running the tasks sequentially")
+        return await asyncio.to_thread(crew.kickoff, inputs=inputs)
+
+    graph = graph if graph is not None else load_task_graph()
+    names = [task.name for task in crew.tasks]
+    if sorted(graph) != sorted(names):
+        raise ValueError(f"Task graph does not match the crew's tasks: {', '.join(sorted(set(graph) ^ set(names)))}")
+    if verbose:
+        print(format_schedule(graph))
+
+    from marketing.rate_limits import CRITICAL_PRIORITY, DEFAULT_PRIORITY, rate_limit_priority
+
+    # A delegated call runs the coworker's shared executor outside the
+    # coworker's lock, so concurrent branches could drive one agent twice
+    for agent in crew.agents:
+        agent.allow_delegation = False
+    prepare_crew(crew, inputs)
+    critical = set(critical_path(graph)[0])
+    tasks_by_name = {task.name: task for task in crew.tasks}
+    upstream_names = {name: ancestors(graph, name) for name in graph}
+    agent_locks: Dict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+    semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else nullcontext()
+    timings: Dict[str, Tuple[float, float]] = {}
+    start = time.perf_counter()
+
+    async def run_task(name: str) -> Any:
+        await asyncio.gather(*(futures[dependency] for dependency in graph[name]))
+        task = tasks_by_name[name]
+        upstream = [futures[other].result() for other in names if other in upstream_names[name]]
+        async with agent_locks[id(task.agent)], semaphore:
+            started = time.perf_counter() - start
+            # to_thread copies the context, so the priority reaches the worker
+            with rate_limit_priority(CRITICAL_PRIORITY if name in critical else DEFAULT_PRIORITY):
+                output = await asyncio.to_thread(_execute_task, crew, task, upstream)
+            timings[name] = (started, time.perf_counter() - start)
+        return output
+
+    # Futures are created in dependency order, so every dependency exists
+    futures: Dict[str, asyncio.Future] = {}
+    for level in topological_levels(graph):
+        for name in level:
+            futures[name] = asyncio.ensure_future(run_task(name))
+    await asyncio.gather(*futures.values())
+
+    if verbose:
+        durations = {name: finished - started for name, (started, finished) in timings.items()}
+        path, length = critical_path(graph, durations)
+        print(f"Completed in {time.perf_counter() - start:.1f}s ({sum(durations.values()):.1f}s of task time)")
+        print(f"Measured critical path ({length:.1f}s): {' -> '.join(path)}")
+
+    result = crew._create_crew_output([futures[task.name].result() for task in crew.tasks])
+    for after_callback in crew.after_kickoff_callbacks:
+        result = after_callback(result)
+    crew.usage_metrics = crew.calculate_usage_metrics()
+    return result
+
+
+def kickoff_dag(
+    crew: Any,
+    inputs: Optional[Dict[str, Any]] = None,
+    max_concurrency: Optional[int] = None,
+    verbose: bool = True,
+    graph: Optional[TaskGraph] = None,
+) -> Any:
+    """Synchronous wrapper around :func:`kickoff_dag_async`."""
+    return asyncio.run(kickoff_dag_async(crew, inputs, max_concurrency=max_concurrency, verbose=verbose, graph=graph))
@@ -0,0 +1,115 @@
+"""
+Local storage locations for the workflow's caches and indexes.
+
+Everything lives under one cache directory so it can be wiped or mounted as a
+volume in one place. The directory defaults to ``.cache/marketing`` in the
+working directory and can be moved with the ``MARKETING_CACHE_DIR`` variable.
+
+Indexes built into a directory are guarded by ``directory_lock``, which
+serializes builders across threads and processes. Each builder writes into
+a fresh directory from ``build_directory`` and publishes it with
+``replace_directory``, which swaps a symbolic link so the index path always
+names a complete build.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows: locks only cover the threads of one process
+    fcntl = None
+
+CACHE_DIR_ENV = "MARKETING_CACHE_DIR"
+DEFAULT_CACHE_DIR = Path(".cache") / "marketing"
+
+
+def cache_dir() -> Path:
+    """Return the cache directory, creating it if needed."""
+    path = Path(os.getenv(CACHE_DIR_ENV, DEFAULT_CACHE_DIR))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def cache_path(*parts: str) -> Path:
+    """Return a path inside the cache directory, creating parent directories."""
+    path = cache_dir().joinpath(*parts)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+_directory_locks: Dict[str, threading.Lock] = {}
+_directory_locks_guard = threading.Lock()
+
+
+@contextmanager
+def directory_lock(path: Union[str, Path]) -> Iterator[None]:
+    """Hold an exclusive lock on ``path`` across threads and processes.
+
+    The lock file sits next to the directory as ``<name>.lock``. Not
+    reentrant: a thread must not take the lock of a directory twice.
+    """
+    path = Path(path)
+    key = str(path.resolve())
+    with _directory_locks_guard:
+        lock = _directory_locks.setdefault(key, threading.Lock())
+    with lock:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path.with_name(path.name + ".lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def build_directory(path: Union[str, Path]) -> Path:
+    """Create a directory next to ``path`` for building its new contents."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return Path(tempfile.mkdtemp(prefix=path.name + ".", dir=path.parent))
+
+
+def replace_directory(built: Union[str, Path], path: Union[str, Path]) -> None:
+    """Publish the directory ``built`` at ``path`` and delete the previous contents.
+
+    ``path`` is a symbolic link to the current build and is swapped with a
+    single ``os.replace``, so it always names a complete directory. Readers
+    resolve it once and open every file through the resolved path, under
+    ``directory_lock(path)`` since the previous build is deleted here. Files
+    already open or memory-mapped stay readable. Callers hold the lock.
+    """
+    built, path = Path(built), Path(path)
+    previous = path.resolve() if path.is_symlink() else None
+    link = built.with_name(built.name + ".link")
+    try:
+        os.symlink(built.name, link, target_is_directory=True)
+    except (OSError, NotImplementedError):
+        # No symlinks (Windows without the privilege): swap by renaming,
+        # which leaves ``path`` missing for a moment
+        _rename_directory(built, path)
+        return
+    if path.is_dir() and not path.is_symlink():
+        # Built before builds were versioned; replaced once, non-atomically
+        shutil.rmtree(path)
+    os.replace(link, path)
+    if previous is not None and previous != built.resolve():
+        shutil.rmtree(previous, ignore_errors=True)
+
+
+def _rename_directory(built: Path, path: Path) -> None:
+    """Move ``built`` to ``path`` by renaming, deleting the previous contents."""
+    previous = None
+    if path.exists():
+        previous = Path(tempfile.mkdtemp(prefix=path.name + ".", suffix=".old", dir=path.parent))
+        os.replace(path, previous / path.name)
+    os.replace(built, path)
+    if previous is not None:
+        shutil.rmtree(previous, ignore_errors=True)
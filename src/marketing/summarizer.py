@@ -0,0 +1,153 @@
+"""
+Local extractive summarization for the crew's summarize_* tasks.
+
+Sentences are ranked with TextRank: sentences become TF-IDF vectors, their
+cosine similarities form a NumPy matrix, and PageRank over that matrix
+scores how central each sentence is. The best sentences are kept, in their
+original order, until a target token budget is reached. Markdown headings
+are kept when a sentence below them is, so the summary keeps its structure.
+
+``ExtractiveSummarizerAgent`` runs this in place of an LLM call, which turns
+a network round trip into a few milliseconds of local work.
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+import numpy as np
+from crewai import Agent
+
+DEFAULT_TOKEN_BUDGET = 800
+DAMPING = 0.85
+
+# Rough size of a token for English prose with an OpenAI-style tokenizer
+CHARS_PER_TOKEN = 4
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9*#-])")
+_HEADING = re.compile(r"^\s*#{1,6}\s+")
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+\-]*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with "
+    "can which their these those into than more also such our we you your".split()
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of LLM tokens in ``text``."""
+    return max(1, len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+def split_sentences(text: str) -> List[Tuple[str, Optional[int]]]:
+    """Split ``text`` into units, pairing each with the index of its heading.
+
+    Headings, list items and table rows are kept as single units; paragraphs
+    are split into sentences.
+    """
+    units: List[Tuple[str, Optional[int]]] = []
+    heading: Optional[int] = None
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("```"):
+            continue
+        if _HEADING.match(line):
+            units.append((line, None))
+            heading = len(units) - 1
+        elif line.startswith(("-", "*", "|")) or re.match(r"^\d+[.)]\s", line):
+            units.append((line, heading))
+        else:
+            units.extend((sentence, heading) for sentence in _SENTENCE_END.split(line) if sentence)
+    return units
+
+
+def similarity_matrix(sentences: List[str]) -> np.ndarray:
+    """Return the cosine similarity of the sentences' TF-IDF vectors."""
+    vocabulary: dict = {}
+    rows, columns = [], []
+    for row, sentence in enumerate(sentences):
+        for token in _TOKEN.findall(sentence.lower()):
+            if token not in _STOPWORDS:
+                rows.append(row)
+                columns.append(vocabulary.setdefault(token, len(vocabulary)))
+
+    counts = np.zeros((len(sentences), max(len(vocabulary), 1)), dtype=np.float32)
+    np.add.at(counts, (np.asarray(rows, dtype=np.int64), np.asarray(columns, dtype=np.int64)), 1.0)
+    document_frequency = np.count_nonzero(counts, axis=0)
+    idf = np.log((1 + len(sentences)) / (1 + document_frequency)) + 1
+    vectors = np.log1p(counts) * idf
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    vectors /= norms
+    return vectors @ vectors.T
+
+
+def textrank(similarity: np.ndarray, damping: float = DAMPING, iterations: int = 50, tolerance: float = 1e-6) -> np.ndarray:
+    """Score sentences by PageRank over a similarity matrix."""
+    n = similarity.shape[0]
+    if n == 0:
+        return np.zeros(0, dtype=np.float32)
+    weights = similarity.copy()
+    np.fill_diagonal(weights, 0)
+    totals = weights.sum(axis=1, keepdims=True)
+    # Sentences sharing no terms with any other spread their score evenly
+    transition = np.where(totals > 0, weights / np.where(totals > 0, totals, 1), 1.0 / n)
+    scores = np.full(n, 1.0 / n, dtype=np.float64)
+    for _ in range(iterations):
+        updated = (1 - damping) / n + damping * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < tolerance:
+            return updated
+        scores = updated
+    return scores
+
+
+def summarize(text: str, token_budget: int = DEFAULT_TOKEN_BUDGET) -> str:
+    """Return an extractive summary of ``text`` of about ``token_budget`` tokens."""
+    if estimate_tokens(text) <= token_budget:
+        return text.strip()
+
+    units = split_sentences(text)
+    content = [index for index, (unit, _) in enumerate(units) if not _HEADING.match(unit)]
+    if not content:
+        return text.strip()[: token_budget * CHARS_PER_TOKEN]
+    scores = textrank(similarity_matrix([units[index][0] for index in content]))
+
+    kept: set = set()
+    used = 0
+    for position in np.argsort(-scores, kind="stable"):
+        index = content[position]
+        heading = units[index][1]
+        cost = estimate_tokens(units[index][0])
+        if heading is not None and heading not in kept:
+            cost += estimate_tokens(units[heading][0])
+        if used + cost > token_budget:
+            continue
+        kept.add(index)
+        if heading is not None:
+            kept.add(heading)
+        used += cost
+
+    return "\n".join(units[index][0] for index in sorted(kept))
+
+
+_summarizer_settings = {"enabled": False, "token_budget": DEFAULT_TOKEN_BUDGET}
+
+
+def configure_local_summarizer(enabled: bool = True, token_budget: int = DEFAULT_TOKEN_BUDGET) -> None:
+    """Choose whether crews built afterwards summarize locally instead of with an LLM."""
+    _summarizer_settings.update(enabled=enabled, token_budget=token_budget)
+
+
+def local_summarizer_settings() -> dict:
+    """Return the current local summarizer settings."""
+    return dict(_summarizer_settings)
+
+
+class ExtractiveSummarizerAgent(Agent):
+    """Agent that answers its tasks with a local extractive summary of their context.
+
+    No LLM is called; the task's ``context`` decides what gets summarized.
+    """
+
+    token_budget: int = DEFAULT_TOKEN_BUDGET
+
+    def execute_task(self, task, context=None, tools=None) -> str:
+        return summarize(context or "", token_budget=self.token_budget)
@@ -0,0 +1,344 @@
+#!/usr/bin/env python
+"""
+Local BM25 retrieval over stored abstracts and past workflow outputs.
+
+Grounds ResearchPaperAnalyzer and ResearchTopicAnalyzer in prior work without
+web searches. Two indexes are kept under the cache directory: one over the
+abstracts held by the local paper corpus (see ``marketing.tools.paper_index``),
+rebuilt only when the corpus changes, and a small one over passages of the
+markdown reports in ``resources/outputs``. Only reports written before the
+process started count as prior work, so the files a run writes are neither
+scored against itself nor a reason to rebuild anything mid-run. Builds are
+locked across threads and processes.
+
+BM25 term weights are precomputed at build time, so a query is a scatter-add
+of a few postings slices followed by a top-k selection. Index layout::
+
+    terms.json       sorted vocabulary
+    offsets.npy      int64 start of each term's postings (len = terms + 1)
+    doc_ids.npy      int32 document numbers grouped by term
+    weights.npy      float32 BM25 weight of each posting (idf included)
+    idf.npy          float32 idf of each term
+    docs.jsonl       one metadata record per document
+    doc_offsets.npy  int64 byte offset of each docs.jsonl line (len = docs + 1)
+    meta.json        build parameters and source fingerprint
+
+Usage:
+    python -m marketing.tools.bm25_index build
+    python -m marketing.tools.bm25_index search "speculative decoding latency"
+"""
+
+import argparse
+import json
+import mmap
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from marketing.storage import build_directory, cache_path, directory_lock, replace_directory
+from marketing.tools.paper_index import PaperIndex, get_paper_index, tokenize
+
+DEFAULT_OUTPUTS_DIR = Path("resources") / "outputs"
+DEFAULT_K1 = 1.2
+DEFAULT_B = 0.75
+PASSAGE_WORDS = 200
+
+_HEADING_PATTERN = re.compile(r"^#{1,6}\s+(.*)$")
+# Outputs modified after this are the current process's own work
+_PROCESS_START = time.time()
+
+
+def output_files(outputs_dir: Union[str, Path] = DEFAULT_OUTPUTS_DIR) -> List[Path]:
+    """Return the markdown reports in ``outputs_dir`` written before this process started."""
+    return [path for path in sorted(Path(outputs_dir).glob("*.md")) if path.stat().st_mtime < _PROCESS_START]
+
+
+def iter_output_passages(outputs_dir: Union[str, Path] = DEFAULT_OUTPUTS_DIR) -> Iterator[Tuple[Dict[str, Any], str]]:
+    """Yield ``(metadata, text)`` passages of the markdown files in ``outputs_dir``.
+
+    Paragraphs are grouped into passages of roughly ``PASSAGE_WORDS`` words,
+    titled by the closest preceding heading.
+    """
+    for path in output_files(outputs_dir):
+        heading = path.stem
+        passage: List[str] = []
+        words = 0
+        with open(path, "r", encoding="utf-8") as f:
+            paragraphs = re.split(r"\n\s*\n", f.read())
+        for paragraph in paragraphs:
+            match = _HEADING_PATTERN.match(paragraph.strip())
+            if match:
+                if passage:
+                    yield {"source": str(path), "title": heading}, " ".join(passage)
+                    passage, words = [], 0
+                heading = match.group(1).strip()
+                continue
+            passage.append(paragraph.strip())
+            words += len(paragraph.split())
+            if words >= PASSAGE_WORDS:
+                yield {"source": str(path), "title": heading}, " ".join(passage)
+                passage, words = [], 0
+        if passage:
+            yield {"source": str(path), "title": heading}, " ".join(passage)
+
+
+def iter_paper_abstracts(paper_index: Optional[PaperIndex]) -> Iterator[Tuple[Dict[str, Any], str]]:
+    """Yield ``(metadata, text)`` for every paper stored in ``paper_index``."""
+    if paper_index is None:
+        return
+    for paper in paper_index.iter_papers():
+        metadata = {"source": f"arXiv:{paper['id']}", "title": paper["title"], "date": paper["date"]}
+        yield metadata, f"{paper['title']} {paper.get('abstract', '')}"
+
+
+def outputs_fingerprint(outputs_dir: Union[str, Path]) -> Dict[str, Any]:
+    """Describe the indexed reports cheaply, to detect when a rebuild is needed."""
+    return {"outputs": {str(path): [path.stat().st_size, path.stat().st_mtime] for path in output_files(outputs_dir)}}
+
+
+def build_index(
+    path: Union[str, Path],
+    documents: Iterable[Tuple[Dict[str, Any], str]],
+    fingerprint: Optional[Dict[str, Any]] = None,
+    k1: float = DEFAULT_K1,
+    b: float = DEFAULT_B,
+) -> None:
+    """Build a BM25 index over ``(metadata, text)`` documents and save it at ``path``.
+
+    Callers hold ``directory_lock(path)``.
+    """
+    path = Path(path)
+    tmp_path = build_directory(path)
+
+    vocabulary: Dict[str, int] = {}
+    term_chunks, doc_chunks, tf_chunks = [], [], []
+    doc_lengths: List[int] = []
+    doc_offsets = [0]
+    with open(tmp_path / "docs.jsonl", "wb") as f:
+        for number, (metadata, text) in enumerate(documents):
+            line = (json.dumps(metadata, ensure_ascii=False) + "\n").encode("utf-8")
+            f.write(line)
+            doc_offsets.append(doc_offsets[-1] + len(line))
+
+            tokens = tokenize(text)
+            doc_lengths.append(len(tokens))
+            if not tokens:
+                continue
+            term_ids = np.fromiter(
+                (vocabulary.setdefault(token, len(vocabulary)) for token in tokens), dtype=np.int64, count=len(tokens)
+            )
+            unique_terms, counts = np.unique(term_ids, return_counts=True)
+            term_chunks.append(unique_terms)
+            doc_chunks.append(np.full(len(unique_terms), number, dtype=np.int32))
+            tf_chunks.append(counts.astype(np.float32))
+
+    n_docs = len(doc_lengths)
+    terms = np.concatenate(term_chunks) if term_chunks else np.zeros(0, dtype=np.int64)
+    docs = np.concatenate(doc_chunks) if doc_chunks else np.zeros(0, dtype=np.int32)
+    tfs = np.concatenate(tf_chunks) if tf_chunks else np.zeros(0, dtype=np.float32)
+
+    # Renumber terms alphabetically and group postings by term
+    sorted_terms = sorted(vocabulary)
+    alphabetical = np.empty(len(vocabulary), dtype=np.int64)
+    alphabetical[[vocabulary[term] for term in sorted_terms]] = np.arange(len(sorted_terms))
+    terms = alphabetical[terms] if len(terms) else terms
+    order = np.lexsort((docs, terms))
+    terms, docs, tfs = terms[order], docs[order], tfs[order]
+    offsets = np.searchsorted(terms, np.arange(len(sorted_terms) + 1), side="left").astype(np.int64)
+
+    lengths = np.asarray(doc_lengths, dtype=np.float32)
+    average_length = float(lengths.mean()) if n_docs and lengths.mean() > 0 else 1.0
+    document_frequency = np.diff(offsets).astype(np.float32)
+    idf = np.log(1 + (n_docs - document_frequency + 0.5) / (document_frequency + 0.5)).astype(np.float32)
+    norms = k1 * (1 - b + b * lengths[docs] / average_length)
+    weights = (np.repeat(idf, np.diff(offsets)) * tfs * (k1 + 1) / (tfs + norms)).astype(np.float32)
+
+    np.save(tmp_path / "offsets.npy", offsets)
+    np.save(tmp_path / "doc_ids.npy", docs.astype(np.int32))
+    np.save(tmp_path / "weights.npy", weights)
+    np.save(tmp_path / "idf.npy", idf)
+    np.save(tmp_path / "doc_offsets.npy", np.asarray(doc_offsets, dtype=np.int64))
+    with open(tmp_path / "terms.json", "w", encoding="utf-8") as f:
+        json.dump(sorted_terms, f)
+    with open(tmp_path / "meta.json", "w", encoding="utf-8") as f:
+        json.dump({"documents": n_docs, "k1": k1, "b": b, "average_length": average_length,
+                   "fingerprint": fingerprint or {}, "built": time.time()}, f, indent=2)
+
+    replace_directory(tmp_path, path)
+
+
+class BM25Index:
+    """Memory-mapped BM25 index with precomputed posting weights."""
+
+    def __init__(self, path: Union[str, Path]):
+        # Resolved once, so every file comes from the same build
+        self.path = Path(path).resolve()
+        with open(self.path / "meta.json", "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        with open(self.path / "terms.json", "r", encoding="utf-8") as f:
+            self.term_ids = {term: index for index, term in enumerate(json.load(f))}
+        self.offsets = np.load(self.path / "offsets.npy", mmap_mode="r")
+        self.doc_ids = np.load(self.path / "doc_ids.npy", mmap_mode="r")
+        self.weights = np.load(self.path / "weights.npy", mmap_mode="r")
+        self.idf = np.load(self.path / "idf.npy", mmap_mode="r")
+        self.doc_offsets = np.load(self.path / "doc_offsets.npy", mmap_mode="r")
+        self._docs_file = open(self.path / "docs.jsonl", "rb")
+        self._docs = mmap.mmap(self._docs_file.fileno(), 0, access=mmap.ACCESS_READ) if self.meta["documents"] else None
+
+    @property
+    def generation(self) -> str:
+        """Identifies this build; changes whenever the index is rebuilt."""
+        return str(self.meta["built"])
+
+    def __len__(self) -> int:
+        return self.meta["documents"]
+
+    def doc(self, number: int) -> Dict[str, Any]:
+        start, end = int(self.doc_offsets[number]), int(self.doc_offsets[number + 1])
+        return json.loads(self._docs[start:end])
+
+    def search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        """Return the ``k`` best documents for ``query``.
+
+        Each hit carries its BM25 ``score`` and an ``overlap`` in ``[0, 1]``:
+        the score relative to a document that contains every query term once
+        at average length. Overlap close to 1 means close prior work exists.
+        """
+        term_ids = [self.term_ids[term] for term in dict.fromkeys(tokenize(query)) if term in self.term_ids]
+        if not term_ids or not len(self):
+            return []
+
+        scores = np.zeros(len(self), dtype=np.float32)
+        for term_id in term_ids:
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            scores[self.doc_ids[start:end]] += self.weights[start:end]
+
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        reference = float(np.sum(self.idf[term_ids]))
+
+        hits = []
+        for number in best:
+            score = float(scores[number])
+            if score <= 0:
+                break
+            hit = self.doc(int(number))
+            hit["score"] = round(score, 4)
+            hit["overlap"] = round(min(1.0, score / reference), 4)
+            hits.append(hit)
+        return hits
+
+    def close(self) -> None:
+        if self._docs is not None:
+            self._docs.close()
+        self._docs_file.close()
+
+
+class PriorWorkIndex:
+    """Searches the abstract index and the past-outputs index together."""
+
+    def __init__(self, indexes: List[BM25Index]):
+        self.indexes = indexes
+
+    @property
+    def generation(self) -> str:
+        return "+".join(index.generation for index in self.indexes)
+
+    def __len__(self) -> int:
+        return sum(len(index) for index in self.indexes)
+
+    def search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        """Return the ``k`` best hits of both indexes, ranked by ``overlap``.
+
+        Raw BM25 scores of separate indexes are not comparable; overlap is
+        normalized per index.
+        """
+        hits = [hit for index in self.indexes for hit in index.search(query, k=k)]
+        hits.sort(key=lambda hit: (-hit["overlap"], -hit["score"]))
+        return hits[:k]
+
+
+_bm25_indexes: Dict[str, BM25Index] = {}
+_bm25_lock = threading.Lock()
+
+
+def _load_index(
+    name: str,
+    fingerprint: Dict[str, Any],
+    documents: Callable[[], Iterable[Tuple[Dict[str, Any], str]]],
+) -> BM25Index:
+    """Return the index stored under ``name``, rebuilding it first if its fingerprint changed."""
+    with _bm25_lock:
+        index = _bm25_indexes.get(name)
+    if index is not None and index.meta["fingerprint"] == fingerprint:
+        return index
+
+    index_dir = cache_path(name, "meta.json").parent
+    # Checked again under the lock: another builder may have just finished
+    with directory_lock(index_dir):
+        stale = True
+        if (index_dir / "meta.json").exists():
+            with open(index_dir / "meta.json", "r", encoding="utf-8") as f:
+                stale = json.load(f)["fingerprint"] != fingerprint
+        if stale:
+            build_index(index_dir, documents(), fingerprint)
+        index = BM25Index(index_dir)
+    # A replaced index is not closed: other threads may still be searching it
+    with _bm25_lock:
+        _bm25_indexes[name] = index
+    return index
+
+
+def get_bm25_index(outputs_dir: Union[str, Path] = DEFAULT_OUTPUTS_DIR) -> Optional[PriorWorkIndex]:
+    """Return the process-wide prior-work index, building or refreshing its parts if needed.
+
+    Returns ``None`` when there is nothing to index yet.
+    """
+    paper_index = get_paper_index()
+    indexes = []
+    if paper_index is not None:
+        fingerprint = {"paper_index_generation": paper_index.generation}
+        indexes.append(_load_index("bm25_papers", fingerprint, lambda: iter_paper_abstracts(paper_index)))
+    fingerprint = outputs_fingerprint(outputs_dir)
+    if fingerprint["outputs"]:
+        indexes.append(_load_index("bm25_outputs", fingerprint, lambda: iter_output_passages(outputs_dir)))
+    return PriorWorkIndex(indexes) if indexes else None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point for building and querying the BM25 index."""
+    parser = argparse.ArgumentParser(description="Local BM25 index over abstracts and past outputs")
+    parser.add_argument("--outputs-dir", default=str(DEFAULT_OUTPUTS_DIR))
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("build", help="Build or refresh the index")
+    search = commands.add_parser("search", help="Query the index")
+    search.add_argument("query")
+    search.add_argument("-k", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    index = get_bm25_index(args.outputs_dir)
+    if index is None:
+        print("Nothing to index: ingest a paper corpus or add markdown files to the outputs directory")
+        return 1
+    if args.command == "build":
+        print(f"Index holds {len(index):,} documents ({time.perf_counter() - start:.1f}s)")
+        return 0
+
+    start = time.perf_counter()
+    hits = index.search(args.query, k=args.k)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    for hit in hits:
+        print(f"{hit['score']:8.3f}  {hit['overlap']:.2f}  {hit['source']}  {hit['title']}")
+    print(f"{len(hits)} results in {elapsed_ms:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
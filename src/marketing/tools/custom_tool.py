@@ -1,9 +1,16 @@
-from crewai.tools import BaseTool
-from typing import Type
+from datetime import date
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Iterable, Sequence, Tuple, Type, Union
 from pydantic import BaseModel, Field
 import json
 import os
 
+from marketing.tools.bm25_index import get_bm25_index
+from marketing.tools.keyword_matcher import KeywordMatcher
+from marketing.tools.paper_index import get_paper_index, parse_timeframe, summarize_papers
+from marketing.tools.result_cache import CachedTool
+
 class LinkedInPostAnalyzerInput(BaseModel):
     post_content: str = Field(..., description="The LinkedIn post content to analyze")
     target_audience: str = Field(..., description="The target audience for the post")
@@ -14,7 +21,88 @@ class LinkedInPostAnalyzerOutput(BaseModel):
     optimization_tips: list = Field(..., description="Tips to improve the post")
     target_audience_match: str = Field(..., description="How well the post matches the target audience")
 
-class LinkedInPostAnalyzer(BaseTool):
+# AI/ML Research Scientist specific hashtags: category -> (keywords, hashtags)
+_LINKEDIN_HASHTAGS = {
+    "research": (("research", "paper"), ["#Research", "#AIResearch", "#MLResearch", "#AcademicResearch"]),
+    "llm": (("llm", "large language model"), ["#LLM", "#LargeLanguageModels", "#AI", "#MachineLearning"]),
+    "rag": (("rag", "retrieval augmented generation"), ["#RAG", "#RetrievalAugmentedGeneration", "#AI", "#NLP"]),
+    "innovation": (("innovation", "breakthrough"), ["#Innovation", "#AIInnovation", "#ResearchInnovation", "#TechInnovation"]),
+    "methods": (("optimal", "method"), ["#OptimalMethods", "#ResearchMethods", "#AI", "#MachineLearning"]),
+    "scientist": (("scientist", "research"), ["#ResearchScientist", "#AIScientist", "#MLScientist", "#TechResearch"]),
+    "frameworks": (("pytorch", "tensorflow"), ["#PyTorch", "#TensorFlow", "#DeepLearning", "#AI"]),
+    "papers": (("arxiv", "paper"), ["#ArXiv", "#ResearchPaper", "#Academic", "#AIResearch"]),
+    "healthcare": (("healthcare", "clinical"), ["#HealthcareAI", "#ClinicalAI", "#HealthTech", "#AI"]),
+    "finance": (("finance", "fintech"), ["#FinTech", "#FinanceAI", "#AI", "#MachineLearning"]),
+}
+_LINKEDIN_MATCHER = KeywordMatcher({category: keywords for category, (keywords, _) in _LINKEDIN_HASHTAGS.items()})
+
+def linkedin_post_features(post_content: str) -> dict:
+    """Count the engagement triggers of a single LinkedIn post."""
+    return {
+        "question_marks": post_content.count("?"),
+        "exclamations": post_content.count("!"),
+        "hashtags": post_content.count("#"),
+        "links": post_content.count("https://") + post_content.count("http://"),
+        "words": len(post_content.split()),
+        "characters": len(post_content),
+    }
+
+def score_linkedin_post(post_content: str, features: dict) -> dict:
+    """Score a LinkedIn post from its precomputed engagement features.
+
+    Shared by ``LinkedInPostAnalyzer`` and the batch scorer in
+    ``marketing.tools.linkedin_batch`` so both paths give identical results.
+    """
+    # This is a simplified analysis - in a real implementation, you might use
+    # LinkedIn's API or machine learning models for more accurate predictions
+    
+    # Basic engagement scoring based on content characteristics
+    score = 5  # Base score
+    
+    # Check for engagement triggers
+    if features["question_marks"]:
+        score += 1
+    if features["exclamations"]:
+        score += 1
+    if features["words"] > 50:
+        score += 1
+    if features["hashtags"]:
+        score += 1
+    if features["links"]:
+        score += 1
+        
+    # Suggested hashtags based on content for AI/ML research scientist
+    hashtags = []
+    found = _LINKEDIN_MATCHER.keywords(post_content)
+    for category in _LINKEDIN_MATCHER.categories_from(found):
+        hashtags.extend(_LINKEDIN_HASHTAGS[category][1])
+        
+    # Add general research scientist hashtags
+    hashtags.extend(["#LinkedIn", "#AIResearch", "#MachineLearning", "#ResearchScientist", "#TechResearch"])
+    
+    # Optimization tips for research scientist content
+    tips = []
+    if score < 7:
+        tips.append("Add research depth to demonstrate scientific expertise")
+        tips.append("Include relevant research hashtags")
+        tips.append("Add a call-to-action for research discussion")
+    if features["characters"] < 100:
+        tips.append("Expand on research concepts for better engagement")
+    if not features["question_marks"]:
+        tips.append("Ask a research question to encourage comments")
+    if found.isdisjoint(("research", "paper")):
+        tips.append("Consider adding research insights")
+    if found.isdisjoint(("innovation", "optimal")):
+        tips.append("Include innovation and optimal methods insights")
+        
+    return {
+        "engagement_score": min(score, 10),
+        "hashtag_suggestions": hashtags[:5],
+        "optimization_tips": tips,
+        "target_audience_match": "Good" if score >= 7 else "Needs improvement"
+    }
+
+class LinkedInPostAnalyzer(CachedTool):
     name: str = "LinkedIn Post Analyzer"
     description: str = "Analyzes LinkedIn posts for engagement potential and provides optimization suggestions for AI/ML research scientist roles"
     
@@ -22,74 +110,7 @@ class LinkedInPostAnalyzer(BaseTool):
         """
         Analyze a LinkedIn post for engagement potential and provide optimization suggestions for AI/ML research scientist roles.
         """
-        # This is a simplified analysis - in a real implementation, you might use
-        # LinkedIn's API or machine learning models for more accurate predictions
-        
-        # Basic engagement scoring based on content characteristics
-        score = 5  # Base score
-        
-        # Check for engagement triggers
-        if "?" in post_content:
-            score += 1
-        if "!" in post_content:
-            score += 1
-        if len(post_content.split()) > 50:
-            score += 1
-        if "#" in post_content:
-            score += 1
-        if "https://" in post_content or "http://" in post_content:
-            score += 1
-            
-        # Suggested hashtags based on content for AI/ML research scientist
-        hashtags = []
-        content_lower = post_content.lower()
-        
-        # AI/ML Research Scientist specific hashtags
-        if "research" in content_lower or "paper" in content_lower:
-            hashtags.extend(["#Research", "#AIResearch", "#MLResearch", "#AcademicResearch"])
-        if "llm" in content_lower or "large language model" in content_lower:
-            hashtags.extend(["#LLM", "#LargeLanguageModels", "#AI", "#MachineLearning"])
-        if "rag" in content_lower or "retrieval augmented generation" in content_lower:
-            hashtags.extend(["#RAG", "#RetrievalAugmentedGeneration", "#AI", "#NLP"])
-        if "innovation" in content_lower or "breakthrough" in content_lower:
-            hashtags.extend(["#Innovation", "#AIInnovation", "#ResearchInnovation", "#TechInnovation"])
-        if "optimal" in content_lower or "method" in content_lower:
-            hashtags.extend(["#OptimalMethods", "#ResearchMethods", "#AI", "#MachineLearning"])
-        if "scientist" in content_lower or "research" in content_lower:
-            hashtags.extend(["#ResearchScientist", "#AIScientist", "#MLScientist", "#TechResearch"])
-        if "pytorch" in content_lower or "tensorflow" in content_lower:
-            hashtags.extend(["#PyTorch", "#TensorFlow", "#DeepLearning", "#AI"])
-        if "arxiv" in content_lower or "paper" in content_lower:
-            hashtags.extend(["#ArXiv", "#ResearchPaper", "#Academic", "#AIResearch"])
-        if "healthcare" in content_lower or "clinical" in content_lower:
-            hashtags.extend(["#HealthcareAI", "#ClinicalAI", "#HealthTech", "#AI"])
-        if "finance" in content_lower or "fintech" in content_lower:
-            hashtags.extend(["#FinTech", "#FinanceAI", "#AI", "#MachineLearning"])
-            
-        # Add general research scientist hashtags
-        hashtags.extend(["#LinkedIn", "#AIResearch", "#MachineLearning", "#ResearchScientist", "#TechResearch"])
-        
-        # Optimization tips for research scientist content
-        tips = []
-        if score < 7:
-            tips.append("Add research depth to demonstrate scientific expertise")
-            tips.append("Include relevant research hashtags")
-            tips.append("Add a call-to-action for research discussion")
-        if len(post_content) < 100:
-            tips.append("Expand on research concepts for better engagement")
-        if "?" not in post_content:
-            tips.append("Ask a research question to encourage comments")
-        if "research" not in content_lower and "paper" not in content_lower:
-            tips.append("Consider adding research insights")
-        if "innovation" not in content_lower and "optimal" not in content_lower:
-            tips.append("Include innovation and optimal methods insights")
-            
-        result = {
-            "engagement_score": min(score, 10),
-            "hashtag_suggestions": hashtags[:5],
-            "optimization_tips": tips,
-            "target_audience_match": "Good" if score >= 7 else "Needs improvement"
-        }
+        result = score_linkedin_post(post_content, linkedin_post_features(post_content))
         
         return json.dumps(result, indent=2)
 
@@ -103,7 +124,146 @@ class AIMLImageGeneratorOutput(BaseModel):
     image_descriptions: list = Field(..., description="Descriptions for each generated image")
     alt_text_suggestions: list = Field(..., description="Alt-text suggestions for accessibility")
 
-class AIMLImageGenerator(BaseTool):
+_IMAGE_TOPIC_MATCHER = KeywordMatcher({
+    "llm": ("llm", "large language model"),
+    "rag": ("rag", "retrieval"),
+    "mlops": ("mlops", "production"),
+    "healthcare": ("healthcare", "clinical"),
+})
+_VISUALIZATION_MATCHER = KeywordMatcher({
+    "architecture": ("diagram", "architecture"),
+    "infographic": ("infographic", "info"),
+    "flowchart": ("flowchart", "process"),
+    "comparison": ("comparison", "chart"),
+})
+_CONTENT_TYPE_MATCHER = KeywordMatcher({
+    "linkedin": ("linkedin",),
+    "blog": ("blog",),
+})
+
+# Base prompt templates for different AI/ML topics
+_IMAGE_PROMPT_TEMPLATES = {
+    "llm": {
+        "architecture": "Professional technical diagram of {topic} architecture, clean minimalist design, blue and white color scheme, showing neural network layers, transformers, attention mechanisms, vector embeddings, professional infographic style, high quality, detailed",
+        "infographic": "Modern infographic about {topic}, clean design, professional color palette, showing key concepts, statistics, and insights, minimalist style, high quality, detailed",
+        "flowchart": "Professional flowchart of {topic} process, clean lines, logical flow, blue and white color scheme, technical diagram style, high quality, detailed",
+        "comparison": "Professional comparison chart of {topic}, side-by-side analysis, clean design, data visualization style, professional color scheme, high quality, detailed"
+    },
+    "rag": {
+        "architecture": "Technical diagram of RAG (Retrieval-Augmented Generation) system architecture, showing knowledge base, retrieval system, language model, clean professional design, blue and green color scheme, high quality, detailed",
+        "infographic": "Modern infographic explaining RAG systems, showing retrieval process, knowledge integration, response generation, clean design, professional colors, high quality, detailed",
+        "flowchart": "Professional flowchart of RAG system workflow, showing query processing, document retrieval, knowledge synthesis, response generation, clean design, high quality, detailed",
+        "comparison": "Comparison chart of different RAG approaches, showing performance metrics, accuracy comparisons, clean professional design, high quality, detailed"
+    },
+    "mlops": {
+        "architecture": "Technical diagram of MLOps pipeline architecture, showing data processing, model training, deployment, monitoring, clean professional design, blue and orange color scheme, high quality, detailed",
+        "infographic": "Modern infographic about MLOps best practices, showing automation, monitoring, deployment strategies, clean design, professional colors, high quality, detailed",
+        "flowchart": "Professional flowchart of MLOps workflow, showing CI/CD pipeline, model versioning, deployment stages, clean design, high quality, detailed",
+        "comparison": "Comparison chart of MLOps tools and platforms, showing features, capabilities, clean professional design, high quality, detailed"
+    },
+    "healthcare": {
+        "architecture": "Technical diagram of healthcare AI system architecture, showing medical data processing, AI models, clinical decision support, clean professional design, medical blue color scheme, high quality, detailed",
+        "infographic": "Modern infographic about healthcare AI applications, showing diagnosis, treatment, patient monitoring, clean design, professional medical colors, high quality, detailed",
+        "flowchart": "Professional flowchart of healthcare AI workflow, showing data collection, analysis, clinical decision making, clean design, high quality, detailed",
+        "comparison": "Comparison chart of healthcare AI approaches, showing accuracy, safety, regulatory compliance, clean professional design, high quality, detailed"
+    },
+    "general": {
+        "architecture": "Professional technical diagram of {topic} system architecture, clean minimalist design, modern color scheme, showing components and connections, professional infographic style, high quality, detailed",
+        "infographic": "Modern infographic about {topic}, clean design, professional color palette, showing key concepts and insights, minimalist style, high quality, detailed",
+        "flowchart": "Professional flowchart of {topic} process, clean lines, logical flow, modern color scheme, technical diagram style, high quality, detailed",
+        "comparison": "Professional comparison chart of {topic}, side-by-side analysis, clean design, data visualization style, professional color scheme, high quality, detailed"
+    }
+}
+
+def _compile_template(template: str) -> Tuple[str, ...]:
+    """Split a template around its ``{topic}`` placeholders for fast rendering."""
+    return tuple(template.split("{topic}"))
+
+# Frozen, precompiled prompt table: template_key -> visualization -> template parts
+_COMPILED_PROMPT_TEMPLATES = MappingProxyType({
+    template_key: MappingProxyType({
+        visualization: _compile_template(template)
+        for visualization, template in templates.items()
+    })
+    for template_key, templates in _IMAGE_PROMPT_TEMPLATES.items()
+})
+
+# Visualization kinds in output order: (description, alt text) templates
+_VISUALIZATION_TEXTS = MappingProxyType({
+    "architecture": (
+        _compile_template("Technical architecture diagram of {topic}"),
+        _compile_template("Technical diagram showing the architecture of {topic} system with components and data flow"),
+    ),
+    "infographic": (
+        _compile_template("Infographic explaining {topic} concepts and insights"),
+        _compile_template("Infographic displaying key concepts and insights about {topic}"),
+    ),
+    "flowchart": (
+        _compile_template("Flowchart showing {topic} process and workflow"),
+        _compile_template("Flowchart illustrating the process and workflow of {topic}"),
+    ),
+    "comparison": (
+        _compile_template("Comparison chart of {topic} approaches and methods"),
+        _compile_template("Comparison chart showing different approaches and methods for {topic}"),
+    ),
+})
+
+# Used when no specific visualization type matched
+_GENERAL_VISUALIZATION_TEXTS = (
+    _compile_template("Visual representation of {topic} concepts"),
+    _compile_template("Visual diagram illustrating key concepts of {topic}"),
+)
+
+# Content-type specific prompt suffixes, applied in table order
+_CONTENT_TYPE_SUFFIXES = MappingProxyType({
+    "linkedin": ", optimized for social media, professional networking content",
+    "blog": ", publication quality, academic research content",
+})
+
+IMAGE_PROMPT_CACHE_SIZE = 1024
+
+@lru_cache(maxsize=IMAGE_PROMPT_CACHE_SIZE)
+def _render_image_prompts(topic: str, content_type: str, visualization_type: str) -> MappingProxyType:
+    # Determine the appropriate template based on topic
+    templates = _COMPILED_PROMPT_TEMPLATES[_IMAGE_TOPIC_MATCHER.first(topic, "general")]
+    suffix = "".join(_CONTENT_TYPE_SUFFIXES[kind] for kind in _CONTENT_TYPE_MATCHER.categories(content_type))
+    
+    # Generate prompts based on visualization type
+    visualizations = _VISUALIZATION_MATCHER.categories(visualization_type)
+    slots = [(templates[kind], _VISUALIZATION_TEXTS[kind]) for kind in _VISUALIZATION_TEXTS if kind in visualizations]
+    
+    # Add a general visualization if no specific type matched
+    if not slots:
+        slots = [(templates["infographic"], _GENERAL_VISUALIZATION_TEXTS)]
+        
+    return MappingProxyType({
+        "image_prompts": tuple(topic.join(prompt) + suffix for prompt, _ in slots),
+        "image_descriptions": tuple(topic.join(description) for _, (description, _) in slots),
+        "alt_text_suggestions": tuple(topic.join(alt_text) for _, (_, alt_text) in slots),
+        "topic": topic,
+        "content_type": content_type,
+        "visualization_type": visualization_type
+    })
+
+def render_image_prompts(topic: str, content_type: str, visualization_type: str) -> dict:
+    """Render the image prompts for one content slot.
+    
+    Results are memoized in a bounded LRU keyed by the three arguments, so
+    repeated slots across a content calendar are rendered once.
+    """
+    rendered = _render_image_prompts(topic, content_type, visualization_type)
+    return {key: list(value) if isinstance(value, tuple) else value for key, value in rendered.items()}
+
+def render_calendar_image_prompts(calendar: Iterable[Union[dict, tuple]]) -> list:
+    """Render image prompts for every slot of a content calendar."""
+    results = []
+    for slot in calendar:
+        if isinstance(slot, dict):
+            slot = (slot["topic"], slot["content_type"], slot["visualization_type"])
+        results.append(render_image_prompts(*slot))
+    return results
+
+class AIMLImageGenerator(CachedTool):
     name: str = "AI/ML Image Generator"
     description: str = "Generates optimized DALL-E prompts for AI/ML research visualizations including diagrams, infographics, and technical illustrations"
     
@@ -111,112 +271,16 @@ class AIMLImageGenerator(BaseTool):
         """
         Generate optimized DALL-E prompts for AI/ML research visualizations.
         """
-        topic_lower = topic.lower()
-        content_lower = content_type.lower()
-        viz_lower = visualization_type.lower()
-        
-        # Base prompt templates for different AI/ML topics
-        prompt_templates = {
-            "llm": {
-                "architecture": "Professional technical diagram of {topic} architecture, clean minimalist design, blue and white color scheme, showing neural network layers, transformers, attention mechanisms, vector embeddings, professional infographic style, high quality, detailed",
-                "infographic": "Modern infographic about {topic}, clean design, professional color palette, showing key concepts, statistics, and insights, minimalist style, high quality, detailed",
-                "flowchart": "Professional flowchart of {topic} process, clean lines, logical flow, blue and white color scheme, technical diagram style, high quality, detailed",
-                "comparison": "Professional comparison chart of {topic}, side-by-side analysis, clean design, data visualization style, professional color scheme, high quality, detailed"
-            },
-            "rag": {
-                "architecture": "Technical diagram of RAG (Retrieval-Augmented Generation) system architecture, showing knowledge base, retrieval system, language model, clean professional design, blue and green color scheme, high quality, detailed",
-                "infographic": "Modern infographic explaining RAG systems, showing retrieval process, knowledge integration, response generation, clean design, professional colors, high quality, detailed",
-                "flowchart": "Professional flowchart of RAG system workflow, showing query processing, document retrieval, knowledge synthesis, response generation, clean design, high quality, detailed",
-                "comparison": "Comparison chart of different RAG approaches, showing performance metrics, accuracy comparisons, clean professional design, high quality, detailed"
-            },
-            "mlops": {
-                "architecture": "Technical diagram of MLOps pipeline architecture, showing data processing, model training, deployment, monitoring, clean professional design, blue and orange color scheme, high quality, detailed",
-                "infographic": "Modern infographic about MLOps best practices, showing automation, monitoring, deployment strategies, clean design, professional colors, high quality, detailed",
-                "flowchart": "Professional flowchart of MLOps workflow, showing CI/CD pipeline, model versioning, deployment stages, clean design, high quality, detailed",
-                "comparison": "Comparison chart of MLOps tools and platforms, showing features, capabilities, clean professional design, high quality, detailed"
-            },
-            "healthcare": {
-                "architecture": "Technical diagram of healthcare AI system architecture, showing medical data processing, AI models, clinical decision support, clean professional design, medical blue color scheme, high quality, detailed",
-                "infographic": "Modern infographic about healthcare AI applications, showing diagnosis, treatment, patient monitoring, clean design, professional medical colors, high quality, detailed",
-                "flowchart": "Professional flowchart of healthcare AI workflow, showing data collection, analysis, clinical decision making, clean design, high quality, detailed",
-                "comparison": "Comparison chart of healthcare AI approaches, showing accuracy, safety, regulatory compliance, clean professional design, high quality, detailed"
-            },
-            "general": {
-                "architecture": "Professional technical diagram of {topic} system architecture, clean minimalist design, modern color scheme, showing components and connections, professional infographic style, high quality, detailed",
-                "infographic": "Modern infographic about {topic}, clean design, professional color palette, showing key concepts and insights, minimalist style, high quality, detailed",
-                "flowchart": "Professional flowchart of {topic} process, clean lines, logical flow, modern color scheme, technical diagram style, high quality, detailed",
-                "comparison": "Professional comparison chart of {topic}, side-by-side analysis, clean design, data visualization style, professional color scheme, high quality, detailed"
-            }
-        }
-        
-        # Determine the appropriate template based on topic
-        if "llm" in topic_lower or "large language model" in topic_lower:
-            template_key = "llm"
-        elif "rag" in topic_lower or "retrieval" in topic_lower:
-            template_key = "rag"
-        elif "mlops" in topic_lower or "production" in topic_lower:
-            template_key = "mlops"
-        elif "healthcare" in topic_lower or "clinical" in topic_lower:
-            template_key = "healthcare"
-        else:
-            template_key = "general"
-            
-        # Generate prompts based on visualization type
-        image_prompts = []
-        image_descriptions = []
-        alt_text_suggestions = []
-        
-        if "diagram" in viz_lower or "architecture" in viz_lower:
-            prompt = prompt_templates[template_key]["architecture"].format(topic=topic)
-            image_prompts.append(prompt)
-            image_descriptions.append(f"Technical architecture diagram of {topic}")
-            alt_text_suggestions.append(f"Technical diagram showing the architecture of {topic} system with components and data flow")
-            
-        if "infographic" in viz_lower or "info" in viz_lower:
-            prompt = prompt_templates[template_key]["infographic"].format(topic=topic)
-            image_prompts.append(prompt)
-            image_descriptions.append(f"Infographic explaining {topic} concepts and insights")
-            alt_text_suggestions.append(f"Infographic displaying key concepts and insights about {topic}")
-            
-        if "flowchart" in viz_lower or "process" in viz_lower:
-            prompt = prompt_templates[template_key]["flowchart"].format(topic=topic)
-            image_prompts.append(prompt)
-            image_descriptions.append(f"Flowchart showing {topic} process and workflow")
-            alt_text_suggestions.append(f"Flowchart illustrating the process and workflow of {topic}")
-            
-        if "comparison" in viz_lower or "chart" in viz_lower:
-            prompt = prompt_templates[template_key]["comparison"].format(topic=topic)
-            image_prompts.append(prompt)
-            image_descriptions.append(f"Comparison chart of {topic} approaches and methods")
-            alt_text_suggestions.append(f"Comparison chart showing different approaches and methods for {topic}")
-            
-        # Add a general visualization if no specific type matched
-        if not image_prompts:
-            prompt = prompt_templates[template_key]["infographic"].format(topic=topic)
-            image_prompts.append(prompt)
-            image_descriptions.append(f"Visual representation of {topic} concepts")
-            alt_text_suggestions.append(f"Visual diagram illustrating key concepts of {topic}")
-            
-        # Add LinkedIn-specific optimizations
-        if "linkedin" in content_lower:
-            for i, prompt in enumerate(image_prompts):
-                image_prompts[i] = prompt + ", optimized for social media, professional networking content"
-                
-        # Add blog-specific optimizations
-        if "blog" in content_lower:
-            for i, prompt in enumerate(image_prompts):
-                image_prompts[i] = prompt + ", publication quality, academic research content"
-                
-        result = {
-            "image_prompts": image_prompts,
-            "image_descriptions": image_descriptions,
-            "alt_text_suggestions": alt_text_suggestions,
-            "topic": topic,
-            "content_type": content_type,
-            "visualization_type": visualization_type
-        }
+        return json.dumps(render_image_prompts(topic, content_type, visualization_type), indent=2)
+    
+    def render_calendar(self, calendar: Iterable[Union[dict, tuple]]) -> str:
+        """
+        Generate image prompts for every slot of a content calendar in one call.
         
-        return json.dumps(result, indent=2)
+        Each slot is either a dict with ``topic``, ``content_type`` and
+        ``visualization_type`` keys or a tuple of those three values.
+        """
+        return json.dumps(render_calendar_image_prompts(calendar), indent=2)
 
 class ResearchPaperAnalyzerInput(BaseModel):
     paper_topic: str = Field(..., description="The research paper topic or title to analyze")
@@ -229,34 +293,75 @@ class ResearchPaperAnalyzerOutput(BaseModel):
     practical_applications: list = Field(..., description="Practical applications and implications")
     publication_venues: list = Field(..., description="Suggested publication venues")
 
-class ResearchPaperAnalyzer(BaseTool):
+_SIGNIFICANCE_MATCHER = KeywordMatcher({
+    "Very High": ("novel", "breakthrough", "state-of-the-art", "sota"),
+    "High": ("improvement", "enhancement", "optimization"),
+    "Medium": ("comparison", "analysis", "study"),
+})
+_CONTRIBUTION_AREA_MATCHER = KeywordMatcher({
+    "llm": ("llm", "large language model"),
+    "rag": ("rag", "retrieval"),
+    "mlops": ("mlops", "production"),
+})
+_VENUE_AREA_MATCHER = KeywordMatcher({
+    "nlp": ("llm", "nlp"),
+    "vision": ("computer vision", "vision"),
+    "rl": ("reinforcement learning", "rl"),
+})
+_RESEARCH_AREA_KEYWORDS = KeywordMatcher.union(_CONTRIBUTION_AREA_MATCHER, _VENUE_AREA_MATCHER)
+
+PRIOR_WORK_RESULTS = 3
+# Below this overlap the closest hit only shares incidental words
+MIN_PRIOR_WORK_OVERLAP = 0.2
+
+
+def _prior_work_version() -> str:
+    index = get_bm25_index()
+    return index.generation if index else "0"
+
+
+def find_prior_work(query: str, k: int = PRIOR_WORK_RESULTS) -> list:
+    """Return the closest stored abstracts and past outputs for ``query``."""
+    index = get_bm25_index()
+    if index is None:
+        return []
+    return [
+        {"title": hit["title"], "source": hit["source"], "overlap": hit["overlap"]}
+        for hit in index.search(query, k=k)
+    ]
+
+class ResearchPaperAnalyzer(CachedTool):
     name: str = "Research Paper Analyzer"
-    description: str = "Analyzes research papers for significance, contributions, and insights for AI/ML research scientist content creation"
+    description: str = "Analyzes research papers for significance, contributions, and insights for AI/ML research scientist content creation. Significance is judged against the closest prior work in the local abstract and output index"
+    
+    @property
+    def cache_version(self) -> str:
+        return f"3:{_prior_work_version()}"
     
     def _run(self, paper_topic: str, research_area: str) -> str:
         """
         Analyze a research paper for significance, contributions, and insights.
         """
-        # This tool would integrate with research databases in production
-        # For now, providing structured guidance for research paper analysis
-        
-        topic_lower = paper_topic.lower()
-        area_lower = research_area.lower()
+        area_keywords = _RESEARCH_AREA_KEYWORDS.keywords(research_area)
         
-        # Research significance assessment
-        significance = "High"
-        if any(word in topic_lower for word in ["novel", "breakthrough", "state-of-the-art", "sota"]):
-            significance = "Very High"
-        elif any(word in topic_lower for word in ["improvement", "enhancement", "optimization"]):
-            significance = "High"
-        elif any(word in topic_lower for word in ["comparison", "analysis", "study"]):
+        # Research significance assessment: the closer the nearest prior
+        # work, the less significant the paper. Keyword rules are the
+        # fallback when nothing related has been indexed.
+        prior_work = find_prior_work(f"{paper_topic} {research_area}")
+        overlap = prior_work[0]["overlap"] if prior_work else 0.0
+        if overlap >= 0.7:
             significance = "Medium"
+        elif overlap >= 0.35:
+            significance = "High"
+        elif overlap >= MIN_PRIOR_WORK_OVERLAP:
+            significance = "Very High"
         else:
-            significance = "Medium"
+            significance = _SIGNIFICANCE_MATCHER.first(paper_topic, "Medium")
             
         # Key contributions based on research area
         contributions = []
-        if "llm" in area_lower or "large language model" in area_lower:
+        contribution_area = _CONTRIBUTION_AREA_MATCHER.first_from(area_keywords)
+        if contribution_area == "llm":
             contributions = [
                 "Novel architecture improvements",
                 "Efficiency optimizations",
@@ -264,7 +369,7 @@ class ResearchPaperAnalyzer(BaseTool):
                 "Scalability improvements",
                 "Interpretability advances"
             ]
-        elif "rag" in area_lower or "retrieval" in area_lower:
+        elif contribution_area == "rag":
             contributions = [
                 "Advanced retrieval mechanisms",
                 "Improved accuracy metrics",
@@ -272,7 +377,7 @@ class ResearchPaperAnalyzer(BaseTool):
                 "Multi-modal integration",
                 "Real-time optimization"
             ]
-        elif "mlops" in area_lower or "production" in area_lower:
+        elif contribution_area == "mlops":
             contributions = [
                 "Automation improvements",
                 "Monitoring enhancements",
@@ -309,11 +414,12 @@ class ResearchPaperAnalyzer(BaseTool):
         
         # Publication venues
         publication_venues = []
-        if "llm" in area_lower or "nlp" in area_lower:
+        venue_area = _VENUE_AREA_MATCHER.first_from(area_keywords)
+        if venue_area == "nlp":
             publication_venues = ["ACL", "EMNLP", "NAACL", "ICLR", "NeurIPS", "ICML"]
-        elif "computer vision" in area_lower or "vision" in area_lower:
+        elif venue_area == "vision":
             publication_venues = ["CVPR", "ICCV", "ECCV", "ICLR", "NeurIPS", "ICML"]
-        elif "reinforcement learning" in area_lower or "rl" in area_lower:
+        elif venue_area == "rl":
             publication_venues = ["ICLR", "NeurIPS", "ICML", "AAAI", "IJCAI"]
         else:
             publication_venues = ["ICLR", "NeurIPS", "ICML", "AAAI", "IJCAI", "KDD"]
@@ -327,6 +433,9 @@ class ResearchPaperAnalyzer(BaseTool):
             "paper_topic": paper_topic,
             "research_area": research_area
         }
+        if prior_work:
+            result["nearest_prior_work"] = prior_work
+            result["prior_work_overlap"] = prior_work[0]["overlap"]
         
         return json.dumps(result, indent=2)
 
@@ -340,18 +449,31 @@ class InnovationTrackerOutput(BaseModel):
     emerging_technologies: list = Field(..., description="Emerging technologies to watch")
     industry_insights: list = Field(..., description="Key industry insights and trends")
 
-class InnovationTracker(BaseTool):
+_INNOVATION_TOPIC_MATCHER = KeywordMatcher({
+    "llm": ("llm", "large language model"),
+    "mlops": ("mlops", "production ml"),
+    "rag": ("rag", "retrieval augmented generation"),
+    "healthcare": ("healthcare", "clinical"),
+})
+
+class InnovationTracker(CachedTool):
     name: str = "AI/ML Innovation Tracker"
-    description: str = "Tracks latest innovations, trends, and developments in AI/ML research for research scientist content creation"
+    description: str = "Tracks latest innovations, trends, and developments in AI/ML research for research scientist content creation. Answers from a local arXiv corpus when one has been ingested, so no web search is needed for recent papers"
+    
+    @property
+    def cache_version(self) -> str:
+        # Results depend on the corpus contents and, through relative
+        # timeframes, on the current date
+        index = get_paper_index()
+        return f"2:{index.generation if index else 0}:{date.today().isoformat()}"
     
     def _run(self, topic: str, timeframe: str) -> str:
         """
         Track latest innovations and trends in AI/ML research for content creation.
         """
-        # This tool would integrate with real-time APIs in production
-        # For now, providing structured guidance for innovation tracking
+        # Static guidance is used when no local paper corpus is available
         
-        topic_lower = topic.lower()
+        topic_area = _INNOVATION_TOPIC_MATCHER.first(topic, "general")
         
         # Latest innovations based on topic
         innovations = []
@@ -359,7 +481,7 @@ class InnovationTracker(BaseTool):
         emerging_technologies = []
         industry_insights = []
         
-        if "llm" in topic_lower or "large language model" in topic_lower:
+        if topic_area == "llm":
             innovations = [
                 "Multi-modal LLMs (GPT-4V, Claude 3 Vision)",
                 "LLM reasoning improvements (Chain-of-Thought, Tree-of-Thoughts)",
@@ -380,7 +502,7 @@ class InnovationTracker(BaseTool):
                 "Federated learning for LLMs"
             ]
             
-        elif "mlops" in topic_lower or "production ml" in topic_lower:
+        elif topic_area == "mlops":
             innovations = [
                 "MLOps automation and CI/CD for ML",
                 "Model monitoring and observability",
@@ -401,7 +523,7 @@ class InnovationTracker(BaseTool):
                 "ML model serving and inference optimization"
             ]
             
-        elif "rag" in topic_lower or "retrieval augmented generation" in topic_lower:
+        elif topic_area == "rag":
             innovations = [
                 "Advanced RAG architectures",
                 "Multi-modal RAG systems",
@@ -422,7 +544,7 @@ class InnovationTracker(BaseTool):
                 "RAG for edge computing"
             ]
             
-        elif "healthcare" in topic_lower or "clinical" in topic_lower:
+        elif topic_area == "healthcare":
             innovations = [
                 "AI for medical imaging and diagnosis",
                 "Clinical decision support systems",
@@ -482,6 +604,19 @@ class InnovationTracker(BaseTool):
             "topic": topic
         }
         
+        # Ground innovations and trends in the local paper corpus when available
+        index = get_paper_index()
+        if index is not None:
+            papers = index.search(topic, since=parse_timeframe(timeframe), limit=10)
+            if papers:
+                result["latest_innovations"] = [f"{paper['title']} ({paper['date']}, arXiv:{paper['id']})" for paper in papers[:5]]
+                result["trending_topics"] = summarize_papers(papers) or trending_topics
+                result["recent_papers"] = [
+                    {"id": paper["id"], "title": paper["title"], "date": paper["date"], "url": f"https://arxiv.org/abs/{paper['id']}"}
+                    for paper in papers
+                ]
+                result["source"] = "local_paper_corpus"
+        
         return json.dumps(result, indent=2)
 
 class ResearchTopicAnalyzerInput(BaseModel):
@@ -494,39 +629,56 @@ class ResearchTopicAnalyzerOutput(BaseModel):
     research_gaps: list = Field(..., description="Identified research gaps")
     methodology_suggestions: list = Field(..., description="Suggested research methodologies")
 
-class ResearchTopicAnalyzer(BaseTool):
+_PUBLICATION_POTENTIAL_MATCHER = KeywordMatcher({
+    "High": ("llm", "large language model", "rag", "retrieval augmented generation", "mlops", "production ml",
+             "research", "novel", "breakthrough", "innovation"),
+    "Medium": ("ai", "machine learning", "deep learning", "neural networks"),
+})
+_JOURNAL_FIELD_MATCHER = KeywordMatcher({
+    "llm": ("llm", "large language model"),
+    "mlops": ("mlops", "production"),
+    "research": ("research", "academic"),
+    "healthcare": ("healthcare", "clinical"),
+    "finance": ("finance", "fintech"),
+})
+
+class ResearchTopicAnalyzer(CachedTool):
     name: str = "Research Topic Analyzer"
-    description: str = "Analyzes research topics for publication potential and provides suggestions for AI/ML research scientist content"
+    description: str = "Analyzes research topics for publication potential and provides suggestions for AI/ML research scientist content. Potential is judged against the closest prior work in the local abstract and output index"
+    
+    @property
+    def cache_version(self) -> str:
+        return f"2:{_prior_work_version()}"
     
     def _run(self, topic: str, field: str) -> str:
         """
         Analyze a research topic for publication potential and provide suggestions for AI/ML research scientist content.
         """
-        # This is a simplified analysis - in a real implementation, you might use
-        # academic databases or research APIs for more accurate assessments
-        
-        # Basic publication potential assessment for AI/ML research scientist
-        potential = "Medium"
-        if any(word in topic.lower() for word in ["llm", "large language model", "rag", "retrieval augmented generation", "mlops", "production ml"]):
-            potential = "High"
-        elif any(word in topic.lower() for word in ["research", "novel", "breakthrough", "innovation"]):
-            potential = "High"
-        elif any(word in topic.lower() for word in ["ai", "machine learning", "deep learning", "neural networks"]):
+        # Publication potential: a topic that is already well covered by
+        # prior work has less room for a new contribution, while a topic with
+        # related but distinct prior work has an audience and a gap to fill.
+        # Keyword rules decide when prior work is unrelated or not indexed.
+        prior_work = find_prior_work(f"{topic} {field}")
+        overlap = prior_work[0]["overlap"] if prior_work else 0.0
+        if overlap >= 0.7:
             potential = "Medium"
+        elif overlap >= MIN_PRIOR_WORK_OVERLAP:
+            potential = "High"
         else:
-            potential = "Low"
+            potential = _PUBLICATION_POTENTIAL_MATCHER.first(topic, "Low")
             
         # Suggested target journals/platforms for AI/ML research scientist
         journals = []
-        if "llm" in field.lower() or "large language model" in field.lower():
+        field_area = _JOURNAL_FIELD_MATCHER.first(field)
+        if field_area == "llm":
             journals.extend(["arXiv", "ACL", "EMNLP", "ICLR", "NeurIPS", "ICML", "Medium", "Towards Data Science"])
-        elif "mlops" in field.lower() or "production" in field.lower():
+        elif field_area == "mlops":
             journals.extend(["ICML", "KDD", "MLOps Community", "Towards Data Science", "Medium"])
-        elif "research" in field.lower() or "academic" in field.lower():
+        elif field_area == "research":
             journals.extend(["ICLR", "NeurIPS", "ICML", "AAAI", "IJCAI", "arXiv"])
-        elif "healthcare" in field.lower() or "clinical" in field.lower():
+        elif field_area == "healthcare":
             journals.extend(["Nature Medicine", "JAMA", "Healthcare AI Blog", "Medium", "HealthTech Blogs"])
-        elif "finance" in field.lower() or "fintech" in field.lower():
+        elif field_area == "finance":
             journals.extend(["Quantitative Finance", "FinTech Blogs", "Medium", "TechCrunch"])
         else:
             journals.extend(["ICLR", "NeurIPS", "ICML", "arXiv", "Medium", "Towards Data Science"])
@@ -552,6 +704,9 @@ class ResearchTopicAnalyzer(BaseTool):
             "research_gaps": gaps,
             "methodology_suggestions": methodologies
         }
+        if prior_work:
+            result["nearest_prior_work"] = prior_work
+            result["prior_work_overlap"] = overlap
         
         return json.dumps(result, indent=2)
 
@@ -565,7 +720,21 @@ class ResumeOptimizerOutput(BaseModel):
     missing_keywords: list = Field(..., description="Keywords that should be added")
     overall_score: int = Field(..., description="Overall optimization score (1-10)")
 
-class ResumeOptimizer(BaseTool):
+# Common keywords for AI/ML research scientist roles
+_ROLE_KEYWORDS = {
+    "ai ml research scientist": ["research", "novel", "breakthrough", "innovation", "optimal methods", "publication", "academic", "scientist", "research", "analysis", "methodology"],
+    "senior ai research scientist": ["research", "novel", "breakthrough", "innovation", "optimal methods", "publication", "academic", "scientist", "research", "analysis", "methodology", "senior", "lead", "mentor"],
+    "ai research scientist": ["research", "novel", "breakthrough", "innovation", "optimal methods", "publication", "academic", "scientist", "research", "analysis", "methodology"],
+    "ml research scientist": ["research", "novel", "breakthrough", "innovation", "optimal methods", "publication", "academic", "scientist", "research", "analysis", "methodology", "machine learning"],
+    "research scientist": ["research", "novel", "breakthrough", "innovation", "optimal methods", "publication", "academic", "scientist", "research", "analysis", "methodology"]
+}
+_TARGET_ROLE_MATCHER = KeywordMatcher({role: (role,) for role in _ROLE_KEYWORDS})
+_RESUME_KEYWORDS = KeywordMatcher({
+    **_ROLE_KEYWORDS,
+    "suggestions": ("quantified", "metrics", "research", "scientist", "publication", "paper", "innovation", "novel"),
+})
+
+class ResumeOptimizer(CachedTool):
     name: str = "Resume Optimizer"
     description: str = "Analyzes and optimizes resume content for AI/ML research scientist roles"
     
@@ -576,30 +745,19 @@ class ResumeOptimizer(BaseTool):
         # This is a simplified analysis - in a real implementation, you might use
         # ATS systems or job description APIs for more accurate matching
         
-        resume_lower = resume_content.lower()
-        role_lower = target_role.lower()
-        
-        # Common keywords for AI/ML research scientist roles
-        role_keywords = {
-            "ai ml research scientist": ["research", "novel", "breakthrough", "innovation", "optimal methods", "publication", "academic", "scientist", "research", "analysis", "methodology"],
-            "senior ai research scientist": ["research", "novel", "breakthrough", "innovation", "optimal methods", "publication", "academic", "scientist", "research", "analysis", "methodology", "senior", "lead", "mentor"],
-            "ai research scientist": ["research", "novel", "breakthrough", "innovation", "optimal methods", "publication", "academic", "scientist", "research", "analysis", "methodology"],
-            "ml research scientist": ["research", "novel", "breakthrough", "innovation", "optimal methods", "publication", "academic", "scientist", "research", "analysis", "methodology", "machine learning"],
-            "research scientist": ["research", "novel", "breakthrough", "innovation", "optimal methods", "publication", "academic", "scientist", "research", "analysis", "methodology"]
-        }
+        resume_keywords = _RESUME_KEYWORDS.keywords(resume_content)
         
         # Find matching keywords
         matching_keywords = []
         missing_keywords = []
         
-        for role, keywords in role_keywords.items():
-            if role in role_lower:
-                for keyword in keywords:
-                    if keyword in resume_lower:
-                        matching_keywords.append(keyword)
-                    else:
-                        missing_keywords.append(keyword)
-                break
+        role = _TARGET_ROLE_MATCHER.first(target_role)
+        if role is not None:
+            for keyword in _ROLE_KEYWORDS[role]:
+                if keyword in resume_keywords:
+                    matching_keywords.append(keyword)
+                else:
+                    missing_keywords.append(keyword)
                 
         # Optimization suggestions for research scientist roles
         suggestions = []
@@ -607,13 +765,13 @@ class ResumeOptimizer(BaseTool):
             suggestions.append(f"Add missing research scientist keywords: {', '.join(missing_keywords[:3])}")
         if len(resume_content.split()) < 300:
             suggestions.append("Expand on research responsibilities and scientific achievements")
-        if "quantified" not in resume_lower and "metrics" not in resume_lower:
+        if resume_keywords.isdisjoint(("quantified", "metrics")):
             suggestions.append("Add quantified research achievements and performance metrics")
-        if "research" not in resume_lower and "scientist" not in resume_lower:
+        if resume_keywords.isdisjoint(("research", "scientist")):
             suggestions.append("Emphasize research responsibilities and scientific expertise")
-        if "publication" not in resume_lower and "paper" not in resume_lower:
+        if resume_keywords.isdisjoint(("publication", "paper")):
             suggestions.append("Highlight research publications and papers")
-        if "innovation" not in resume_lower and "novel" not in resume_lower:
+        if resume_keywords.isdisjoint(("innovation", "novel")):
             suggestions.append("Include research innovations and novel approaches")
             
         # Calculate overall score
@@ -630,3 +788,15 @@ class ResumeOptimizer(BaseTool):
         }
         
         return json.dumps(result, indent=2)
+    
+    def rank_matches(self, resumes: Sequence[str], job_descriptions: Sequence[str], top_k: int = 5) -> str:
+        """
+        Rank job descriptions for many resume variants at once.
+        
+        Scores every resume/job pair with one sparse TF-IDF matrix product and
+        returns the top-k job matches per resume.
+        """
+        # Imported on first use so loading the tools does not pull in SciPy
+        from marketing.tools.resume_matching import rank_resume_matches
+        
+        return json.dumps(rank_resume_matches(resumes, job_descriptions, top_k=top_k), indent=2)
@@ -0,0 +1,191 @@
+"""
+Persistent response cache for the web search and scraping tools.
+
+``http_cached`` wraps a crewai tool class so its responses are stored on
+disk in a ``ResultCache`` per source, each with its own TTL: search results
+go stale within hours, scraped pages much more slowly. Identical requests
+that are in flight at the same time, typically the same trending-topic page
+requested by agents on concurrent branches, are coalesced into one call
+whose result every caller receives.
+
+Wrapped outside the rate limiter, a cached response costs neither a network
+round trip nor a slot in the shared requests-per-minute budget. Hits,
+misses, coalesced calls and response sizes are reported per source as run
+metrics.
+
+Only successful responses are cached: errors raised by the wrapped call are
+passed to every waiting caller and never stored. ``ScrapeWebsiteTool``
+returns the body of any page, error pages included, so the scrape tool is
+built with ``checked_scrape_tool``, which raises ``requests.HTTPError`` for
+non-2xx responses; a 429 then also reaches the rate limiter's backoff.
+
+TTLs default to ``DEFAULT_TTLS`` and can be overridden with environment
+variables such as ``MARKETING_HTTP_CACHE_TTL_SERPER`` (seconds).
+"""
+
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, Optional
+
+from marketing.storage import cache_path
+from marketing.tools.result_cache import ResultCache, tool_cache_key
+
+DEFAULT_TTLS: Dict[str, float] = {
+    "serper": 6 * 3600,
+    "scrape": 7 * 24 * 3600,
+}
+DEFAULT_TTL_SECONDS = 24 * 3600
+ENV_PREFIX = "MARKETING_HTTP_CACHE_TTL_"
+
+_MISSING = object()
+
+
+def source_ttl(source: str) -> float:
+    """Return the configured TTL in seconds of cached responses from ``source``."""
+    value = os.getenv(f"{ENV_PREFIX}{source.upper()}")
+    return float(value) if value is not None else DEFAULT_TTLS.get(source, DEFAULT_TTL_SECONDS)
+
+
+class _InFlight:
+    """A call in progress that identical requests wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class HTTPResponseCache:
+    """Disk cache of one source's responses with in-flight request coalescing."""
+
+    def __init__(self, source: str, ttl_seconds: Optional[float] = None):
+        self.source = source
+        self.ttl_seconds = source_ttl(source) if ttl_seconds is None else ttl_seconds
+        self.responses = ResultCache(cache_path("http", f"{source}.sqlite"), max_age_seconds=self.ttl_seconds)
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, _InFlight] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.bytes_fetched = 0
+        self.bytes_served = 0
+        self.largest_response = 0
+
+    def fetch(self, key: str, call) -> Any:
+        """Return the cached response for ``key``, or run ``call`` once for all waiting callers."""
+        response = self.responses.get(key, _MISSING)
+        if response is not _MISSING:
+            self._count(response, hit=True)
+            return response
+
+        with self._lock:
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = _InFlight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            self._count(flight.result, hit=True)
+            return flight.result
+
+        try:
+            flight.result = call()
+            self._count(flight.result, hit=False)
+            self.responses.put(key, flight.result)
+            return flight.result
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            flight.done.set()
+
+    def _count(self, response: Any, hit: bool) -> None:
+        size = len(response.encode("utf-8")) if isinstance(response, str) else len(json.dumps(response, default=str))
+        with self._lock:
+            if hit:
+                self.hits += 1
+                self.bytes_served += size
+            else:
+                self.misses += 1
+                self.bytes_fetched += size
+            self.largest_response = max(self.largest_response, size)
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss/coalescing counters and response sizes."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "bytes_fetched": self.bytes_fetched,
+                "bytes_served": self.bytes_served,
+                "largest_response_bytes": self.largest_response,
+                "entries": self.responses.stats()["entries"],
+            }
+
+
+_http_caches: Dict[str, HTTPResponseCache] = {}
+_http_caches_lock = threading.Lock()
+
+
+def get_http_cache(source: str) -> HTTPResponseCache:
+    """Return the process-wide response cache for ``source``."""
+    cache = _http_caches.get(source)
+    if cache is None:
+        with _http_caches_lock:
+            cache = _http_caches.get(source)
+            if cache is None:
+                cache = _http_caches[source] = HTTPResponseCache(source)
+    return cache
+
+
+def http_cache_metrics() -> Dict[str, float]:
+    """Return the counters of every response cache used so far as run metrics."""
+    metrics = {}
+    for source, cache in list(_http_caches.items()):
+        for key, value in cache.stats().items():
+            metrics[f"http_cache_{source}_{key}"] = value
+    return metrics
+
+
+def http_cached(tool_cls: type, source: str) -> type:
+    """Return a subclass of the crewai tool ``tool_cls`` whose responses are cached as ``source``."""
+
+    def _run(self, *args, **kwargs):
+        key = tool_cache_key(self.name, source, {"args": list(args), "kwargs": kwargs})
+        return get_http_cache(source).fetch(key, lambda: tool_cls._run(self, *args, **kwargs))
+
+    return type(tool_cls.__name__, (tool_cls,), {"_run": _run, "__module__": __name__})
+
+
+def checked_scrape_tool(tool_cls: type) -> type:
+    """Return a subclass of ``ScrapeWebsiteTool`` that raises ``requests.HTTPError`` for non-2xx pages."""
+
+    def _run(self, **kwargs):
+        import requests
+        from bs4 import BeautifulSoup
+
+        website_url = kwargs.get("website_url", self.website_url)
+        page = requests.get(website_url, timeout=15, headers=self.headers, cookies=self.cookies or {})
+        page.raise_for_status()
+        if not 200 <= page.status_code < 300:
+            raise requests.HTTPError(f"{page.status_code} response for url: {website_url}", response=page)
+        page.encoding = page.apparent_encoding
+        # Same text extraction as ScrapeWebsiteTool._run
+        text = "The following text is scraped website content:\n\n"
+        text += BeautifulSoup(page.text, "html.parser").get_text(" ")
+        text = re.sub("[ \t]+", " ", text)
+        return re.sub("\\s+\n\\s+", "\n", text)
+
+    return type(tool_cls.__name__, (tool_cls,), {"_run": _run, "__module__": __name__})
@@ -0,0 +1,103 @@
+"""
+Single-pass keyword matching shared by the custom tools.
+
+Every tool classifies its input by checking which keywords occur as substrings
+of the lowercased text. Instead of one ``"x" in text`` scan per keyword, each
+keyword table is compiled once into a trie-shaped regular expression. A single
+scan of the text then reports every keyword present, so matching cost depends on
+the length of the text rather than on the number of keywords.
+"""
+
+import re
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """Build a regex alternation shaped like a trie over ``keywords``.
+
+    Branches are emitted so that the longest keyword starting at a position is
+    preferred over its prefixes.
+    """
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def render(node: Dict[str, dict]) -> str:
+        terminal = "" in node
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            body = body if len(branches) > 1 else "(?:" + body + ")"
+            return body + "?"
+        return body
+
+    return render(trie)
+
+
+class KeywordMatcher:
+    """Matches a table of keyword categories against text in one pass.
+
+    ``table`` maps a category name to the keywords that select it. Category
+    order is preserved so callers that take the first matching category get the
+    same result as an ``if``/``elif`` chain over the same table.
+    """
+
+    def __init__(self, table: Mapping[str, Iterable[str]]):
+        self.table: Dict[str, tuple] = {category: tuple(keywords) for category, keywords in table.items()}
+        vocabulary = {keyword for keywords in self.table.values() for keyword in keywords}
+        if not all(vocabulary):
+            raise ValueError("Keywords must be non-empty strings")
+
+        # A scan only reports the longest keyword at each position, so every
+        # keyword also implies all shorter keywords contained in it.
+        self._implied: Dict[str, FrozenSet[str]] = {
+            keyword: frozenset(other for other in vocabulary if other in keyword)
+            for keyword in vocabulary
+        }
+        self._pattern = re.compile("(?=(" + _trie_pattern(vocabulary) + "))") if vocabulary else None
+
+    @classmethod
+    def union(cls, *matchers: "KeywordMatcher") -> "KeywordMatcher":
+        """Build a matcher whose scan covers the vocabulary of all ``matchers``.
+
+        The resulting keyword set can be passed to ``categories_from`` or
+        ``first_from`` of each input matcher, so one scan serves several tables.
+        """
+        return cls({
+            f"{index}.{category}": keywords
+            for index, matcher in enumerate(matchers)
+            for category, keywords in matcher.table.items()
+        })
+
+    def keywords(self, text: str) -> FrozenSet[str]:
+        """Return every keyword occurring in ``text`` (case-insensitive)."""
+        if self._pattern is None:
+            return frozenset()
+        found = set()
+        for match in self._pattern.finditer(text.lower()):
+            found |= self._implied[match.group(1)]
+        return frozenset(found)
+
+    def categories(self, text: str) -> List[str]:
+        """Return the matched categories of ``text`` in table order."""
+        return self.categories_from(self.keywords(text))
+
+    def categories_from(self, found: FrozenSet[str]) -> List[str]:
+        """Return the categories selected by an already computed keyword set."""
+        return [category for category, keywords in self.table.items() if not found.isdisjoint(keywords)]
+
+    def first(self, text: str, default: Optional[str] = None) -> Optional[str]:
+        """Return the first matching category of ``text``, or ``default``."""
+        return self.first_from(self.keywords(text), default)
+
+    def first_from(self, found: FrozenSet[str], default: Optional[str] = None) -> Optional[str]:
+        """Return the first category selected by an already computed keyword set."""
+        for category, keywords in self.table.items():
+            if not found.isdisjoint(keywords):
+                return category
+        return default
@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+"""
+Batch scoring for LinkedIn post drafts.
+
+Scores large backlogs of posts with the same rules as ``LinkedInPostAnalyzer``.
+Posts are split into chunks, engagement features are counted a chunk at a
+time, chunks are scored on a process pool and the results are streamed out as
+JSON Lines in input order.
+
+Usage:
+    python -m marketing.tools.linkedin_batch drafts.jsonl -o scores.jsonl
+    python -m marketing.tools.linkedin_batch --benchmark 20000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from marketing.tools.custom_tool import LinkedInPostAnalyzer, score_linkedin_post
+
+DEFAULT_CHUNK_SIZE = 500
+
+PostSource = Union[str, Path, Iterable[Union[str, Dict[str, Any]]]]
+
+
+def extract_features(posts: Sequence[str]) -> Dict[str, List[int]]:
+    """Count engagement triggers for a chunk of posts, one list per feature."""
+    return {
+        "question_marks": [post.count("?") for post in posts],
+        "exclamations": [post.count("!") for post in posts],
+        "hashtags": [post.count("#") for post in posts],
+        "links": [post.count("https://") + post.count("http://") for post in posts],
+        "words": [len(post.split()) for post in posts],
+        "characters": [len(post) for post in posts],
+    }
+
+
+def score_chunk(chunk: List[Tuple[Any, str]]) -> List[str]:
+    """Score a chunk of ``(post_id, post_content)`` pairs into JSON lines."""
+    features = extract_features([post for _, post in chunk])
+
+    lines = []
+    for index, (post_id, post) in enumerate(chunk):
+        post_features = {key: values[index] for key, values in features.items()}
+        record = {"id": post_id}
+        record.update(score_linkedin_post(post, post_features))
+        lines.append(json.dumps(record))
+    return lines
+
+
+def iter_posts(source: PostSource) -> Iterator[Tuple[Any, str]]:
+    """Yield ``(post_id, post_content)`` pairs from a file or an iterable.
+
+    Files ending in ``.jsonl`` hold one JSON value per line: either a string or
+    an object with ``post_content`` and an optional ``id``. Any other file is
+    read as one post per line. Iterables may yield strings or such objects.
+    """
+    if isinstance(source, (str, Path)):
+        path = Path(source)
+        with open(path, "r", encoding="utf-8") as f:
+            if path.suffix == ".jsonl":
+                items = (json.loads(line) for line in f if line.strip())
+                yield from iter_posts(items)
+            else:
+                for index, line in enumerate(f):
+                    line = line.rstrip("\n")
+                    if line.strip():
+                        yield index, line
+        return
+
+    for index, item in enumerate(source):
+        if isinstance(item, dict):
+            yield item.get("id", index), item["post_content"]
+        else:
+            yield index, item
+
+
+def _chunks(pairs: Iterator[Tuple[Any, str]], chunk_size: int) -> Iterator[List[Tuple[Any, str]]]:
+    while True:
+        chunk = list(islice(pairs, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def analyze_posts(
+    source: PostSource,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: Optional[int] = None,
+) -> Iterator[str]:
+    """Stream JSON lines with the analysis of every post in ``source``.
+
+    Results come back in input order. At most ``2 * workers`` chunks are in
+    flight at a time, so memory stays bounded for arbitrarily large inputs.
+    ``workers=0`` scores in the calling process.
+    """
+    chunks = _chunks(iter_posts(source), chunk_size)
+
+    if workers == 0:
+        for chunk in chunks:
+            yield from score_chunk(chunk)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(score_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def analyze_posts_to_file(
+    source: PostSource,
+    output_file: Union[str, Path],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: Optional[int] = None,
+) -> int:
+    """Write the analysis of every post in ``source`` to a JSONL file."""
+    count = 0
+    with open(output_file, "w", encoding="utf-8") as f:
+        for line in analyze_posts(source, chunk_size=chunk_size, workers=workers):
+            f.write(line + "\n")
+            count += 1
+    return count
+
+
+def _synthetic_posts(n_posts: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    vocabulary = (
+        "research paper LLM RAG transformer benchmark innovation breakthrough optimal method "
+        "scientist PyTorch arXiv healthcare clinical fintech latency throughput attention "
+        "what do you think? great results! #AI #MachineLearning https://arxiv.org/abs/2401.00001"
+    ).split()
+    return [" ".join(rng.choice(vocabulary) for _ in range(rng.randint(20, 400))) for _ in range(n_posts)]
+
+
+def benchmark(n_posts: int = 20000, chunk_size: int = DEFAULT_CHUNK_SIZE, workers: Optional[int] = None) -> Dict[str, float]:
+    """Compare single-post and batch throughput on synthetic drafts.
+
+    Also checks that both paths produce the same scores.
+    """
+    posts = _synthetic_posts(n_posts)
+    analyzer = LinkedInPostAnalyzer(cache_results=False)
+
+    start = time.perf_counter()
+    single = [json.loads(analyzer._run(post, "AI/ML researchers")) for post in posts]
+    single_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = [json.loads(line) for line in analyze_posts(posts, chunk_size=chunk_size, workers=workers)]
+    batch_seconds = time.perf_counter() - start
+
+    for expected, record in zip(single, batch):
+        record.pop("id")
+        if record != expected:
+            raise AssertionError(f"Batch result differs from single-post result: {record} != {expected}")
+
+    return {
+        "posts": n_posts,
+        "single_seconds": single_seconds,
+        "single_posts_per_second": n_posts / single_seconds,
+        "batch_seconds": batch_seconds,
+        "batch_posts_per_second": n_posts / batch_seconds,
+        "speedup": single_seconds / batch_seconds,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point for batch scoring and benchmarking."""
+    parser = argparse.ArgumentParser(description="Batch-score LinkedIn post drafts")
+    parser.add_argument("input", nargs="?", help="JSONL file (or one post per line) to score")
+    parser.add_argument("-o", "--output", help="JSONL output file (defaults to stdout)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (0 scores in-process)")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="Benchmark throughput on N synthetic posts")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        results = benchmark(args.benchmark, chunk_size=args.chunk_size, workers=args.workers)
+        print(f"Posts: {results['posts']:,}")
+        print(f"Single-post path: {results['single_seconds']:.2f}s ({results['single_posts_per_second']:,.0f} posts/s)")
+        print(f"Batch path: {results['batch_seconds']:.2f}s ({results['batch_posts_per_second']:,.0f} posts/s)")
+        print(f"Speedup: {results['speedup']:.1f}x")
+        return 0
+
+    if not args.input:
+        parser.error("an input file is required unless --benchmark is given")
+
+    if args.output:
+        count = analyze_posts_to_file(args.input, args.output, chunk_size=args.chunk_size, workers=args.workers)
+        print(f"Scored {count:,} posts -> {args.output}")
+    else:
+        for line in analyze_posts(args.input, chunk_size=args.chunk_size, workers=args.workers):
+            sys.stdout.write(line + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,473 @@
+#!/usr/bin/env python
+"""
+Offline paper corpus index backing the InnovationTracker tool.
+
+Ingests arXiv metadata dumps (one JSON record per line, as in the public
+arXiv metadata snapshot) into an on-disk inverted index. Each ingestion writes
+a new immutable segment, so adding a day's dump never rebuilds what is already
+indexed. Inside a segment papers are sorted by date and every postings list is
+sorted by document number, which makes a timeframe filter a pair of binary
+searches per term. All arrays are memory-mapped at query time. Ingestion and
+compaction hold a lock shared by threads and processes, so concurrent writers
+never lose each other's segments.
+
+Segment layout::
+
+    dates.npy        int32 days since 1970-01-01, ascending
+    terms.json       sorted vocabulary
+    offsets.npy      int64 start of each term's postings (len = terms + 1)
+    postings.npy     int32 document numbers grouped by term
+    docs.jsonl       one metadata record per document, in date order
+    doc_offsets.npy  int64 byte offset of each docs.jsonl line (len = docs + 1)
+
+Usage:
+    python -m marketing.tools.paper_index ingest arxiv-metadata-2024-06-01.jsonl
+    python -m marketing.tools.paper_index search "mixture of experts" --timeframe "last 3 months"
+    python -m marketing.tools.paper_index compact
+"""
+
+import argparse
+import json
+import mmap
+import os
+import re
+import shutil
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from marketing.storage import build_directory, cache_path, directory_lock
+
+_EPOCH = date(1970, 1, 1)
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or our that the their "
+    "this to we with which via using based new can than these those".split()
+)
+_TIMEFRAME_PATTERN = re.compile(r"(?:last|past)\s+(\d+)?\s*(day|week|month|year)s?")
+_SINCE_PATTERN = re.compile(r"(?:since|after|from)\s+(\d{4}-\d{2}-\d{2})")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens of ``text`` without stopwords."""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in _STOPWORDS]
+
+
+def parse_timeframe(timeframe: str, today: Optional[date] = None) -> Optional[date]:
+    """Return the earliest date covered by a timeframe such as ``"last 3 months"``.
+
+    Also understands ``"since 2024-01-01"`` and a bare year such as ``"2024"``.
+    Returns ``None`` when no timeframe can be recognised, including
+    impossible dates such as ``"since 2024-02-30"``.
+    """
+    today = today or date.today()
+    text = timeframe.lower().strip()
+
+    # Timeframes come from the LLM, so out-of-range values are expected
+    try:
+        match = _TIMEFRAME_PATTERN.search(text)
+        if match:
+            amount = int(match.group(1) or 1)
+            days = {"day": 1, "week": 7, "month": 30, "year": 365}[match.group(2)]
+            return today - timedelta(days=amount * days)
+
+        match = _SINCE_PATTERN.search(text)
+        if match:
+            return date.fromisoformat(match.group(1))
+
+        if re.fullmatch(r"\d{4}", text):
+            return date(int(text), 1, 1)
+    except (ValueError, OverflowError):
+        pass
+    return None
+
+
+def _days(value: date) -> int:
+    return (value - _EPOCH).days
+
+
+def _record_date(record: Dict[str, Any]) -> Optional[date]:
+    versions = record.get("versions")
+    if versions:
+        try:
+            return parsedate_to_datetime(versions[0]["created"]).date()
+        except (KeyError, TypeError, ValueError):
+            pass
+    for field in ("published", "update_date", "date"):
+        value = record.get(field)
+        if value:
+            try:
+                return date.fromisoformat(str(value)[:10])
+            except ValueError:
+                continue
+    return None
+
+
+def _write_array(path: Path, values: np.ndarray) -> None:
+    np.save(path, values, allow_pickle=False)
+
+
+class _Segment:
+    """A memory-mapped immutable index segment."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.dates = np.load(path / "dates.npy", mmap_mode="r")
+        self.offsets = np.load(path / "offsets.npy", mmap_mode="r")
+        self.postings = np.load(path / "postings.npy", mmap_mode="r")
+        self.doc_offsets = np.load(path / "doc_offsets.npy", mmap_mode="r")
+        with open(path / "terms.json", "r", encoding="utf-8") as f:
+            self.terms = json.load(f)
+        self.term_ids = {term: index for index, term in enumerate(self.terms)}
+        self._docs_file = open(path / "docs.jsonl", "rb")
+        self._docs = mmap.mmap(self._docs_file.fileno(), 0, access=mmap.ACCESS_READ) if len(self.dates) else None
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def doc(self, number: int) -> Dict[str, Any]:
+        start, end = int(self.doc_offsets[number]), int(self.doc_offsets[number + 1])
+        return json.loads(self._docs[start:end])
+
+    def term_postings(self, term: str) -> np.ndarray:
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            return self.postings[:0]
+        return self.postings[self.offsets[term_id]:self.offsets[term_id + 1]]
+
+    def doc_range(self, since: Optional[date], until: Optional[date]) -> Tuple[int, int]:
+        low = int(np.searchsorted(self.dates, _days(since), side="left")) if since else 0
+        high = int(np.searchsorted(self.dates, _days(until), side="right")) if until else len(self.dates)
+        return low, high
+
+    def close(self) -> None:
+        if self._docs is not None:
+            self._docs.close()
+        self._docs_file.close()
+
+
+def _build_segment(path: Path, records: List[Tuple[date, Dict[str, Any], List[str]]]) -> None:
+    """Write ``(date, metadata, terms)`` records as a new segment at ``path``."""
+    records.sort(key=lambda record: record[0])
+    tmp_path = build_directory(path)
+
+    postings: Dict[str, List[int]] = defaultdict(list)
+    doc_offsets = [0]
+    with open(tmp_path / "docs.jsonl", "wb") as f:
+        for number, (_, metadata, terms) in enumerate(records):
+            line = (json.dumps(metadata, ensure_ascii=False) + "\n").encode("utf-8")
+            f.write(line)
+            doc_offsets.append(doc_offsets[-1] + len(line))
+            for term in set(terms):
+                postings[term].append(number)
+
+    vocabulary = sorted(postings)
+    offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(postings[term]) for term in vocabulary])
+    flat = np.fromiter(
+        (number for term in vocabulary for number in postings[term]), dtype=np.int32, count=int(offsets[-1])
+    )
+
+    _write_array(tmp_path / "dates.npy", np.array([_days(record[0]) for record in records], dtype=np.int32))
+    _write_array(tmp_path / "offsets.npy", offsets)
+    _write_array(tmp_path / "postings.npy", flat)
+    _write_array(tmp_path / "doc_offsets.npy", np.array(doc_offsets, dtype=np.int64))
+    with open(tmp_path / "terms.json", "w", encoding="utf-8") as f:
+        json.dump(vocabulary, f)
+    os.replace(tmp_path, path)
+
+
+class PaperIndex:
+    """Segmented, date-ordered inverted index over a local paper corpus."""
+
+    def __init__(self, path: Union[str, Path, None] = None):
+        self.path = Path(path) if path is not None else cache_path("paper_index", "manifest.json").parent
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.manifest = self._load_manifest()
+        self._segments: Optional[List[_Segment]] = None
+
+    @property
+    def generation(self) -> int:
+        """Number of index changes so far; changes whenever results may change."""
+        return self.manifest["generation"]
+
+    @property
+    def segments(self) -> List[_Segment]:
+        if self._segments is None:
+            # Opened under the lock, so a compaction cannot delete them mid-load
+            with directory_lock(self.path):
+                self._refresh()
+                self._open_segments()
+        return self._segments
+
+    def _open_segments(self) -> List[_Segment]:
+        if self._segments is None:
+            self._segments = [_Segment(self.path / name) for name in self.manifest["segments"]]
+        return self._segments
+
+    def __len__(self) -> int:
+        return sum(len(segment) for segment in self.segments)
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        manifest_file = self.path / "manifest.json"
+        if manifest_file.exists():
+            with open(manifest_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {"segments": [], "sources": {}, "generation": 0, "next_segment": 1}
+
+    def _save_manifest(self) -> None:
+        tmp_file = self.path / "manifest.json.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_file, self.path / "manifest.json")
+
+    def _reload(self) -> None:
+        for segment in self._segments or []:
+            segment.close()
+        self._segments = None
+
+    def _refresh(self) -> None:
+        """Pick up changes saved by other writers; callers hold ``directory_lock(self.path)``."""
+        manifest = self._load_manifest()
+        if manifest != self.manifest:
+            self.manifest = manifest
+            self._reload()
+
+    def ingest(self, source: Union[str, Path]) -> int:
+        """Add the papers of a metadata dump as a new segment.
+
+        Dumps that were already ingested unchanged are skipped. Returns the
+        number of papers added.
+        """
+        source = Path(source)
+        stat = source.stat()
+        fingerprint = {"size": stat.st_size, "mtime": stat.st_mtime}
+        with directory_lock(self.path):
+            self._refresh()
+            if self.manifest["sources"].get(str(source.resolve())) == fingerprint:
+                return 0
+
+            with open(source, "r", encoding="utf-8") as f:
+                added = self._add_segment(json.loads(line) for line in f if line.strip())
+            self.manifest["sources"][str(source.resolve())] = fingerprint
+            self._save_manifest()
+        return added
+
+    def add_records(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Add paper metadata records as a new segment."""
+        with directory_lock(self.path):
+            self._refresh()
+            return self._add_segment(records)
+
+    def _add_segment(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Write ``records`` as a new segment; callers hold ``directory_lock(self.path)``."""
+        entries = []
+        for record in records:
+            published = _record_date(record)
+            if published is None:
+                continue
+            title = " ".join(str(record.get("title", "")).split())
+            abstract = " ".join(str(record.get("abstract", "")).split())
+            categories = str(record.get("categories", "")).split()
+            metadata = {
+                "id": record.get("id"),
+                "title": title,
+                "date": published.isoformat(),
+                "categories": categories,
+                "abstract": abstract,
+            }
+            terms = tokenize(title) + tokenize(abstract) + [f"cat:{category.lower()}" for category in categories]
+            entries.append((published, metadata, terms))
+
+        if not entries:
+            return 0
+
+        name = f"segment-{self.manifest['next_segment']:06d}"
+        _build_segment(self.path / name, entries)
+        self.manifest["next_segment"] += 1
+        self.manifest["segments"].append(name)
+        self.manifest["generation"] += 1
+        self._save_manifest()
+        self._reload()
+        return len(entries)
+
+    def iter_papers(self) -> Iterator[Dict[str, Any]]:
+        """Yield the stored metadata of every indexed paper, segment by segment."""
+        for segment in self.segments:
+            for number in range(len(segment)):
+                yield segment.doc(number)
+
+    def compact(self) -> None:
+        """Merge every segment into one date-ordered segment."""
+        with directory_lock(self.path):
+            self._refresh()
+            if len(self.manifest["segments"]) >= 2:
+                self._compact(self._open_segments())
+
+    def _compact(self, segments: List[_Segment]) -> None:
+        """Merge ``segments`` into a new one; callers hold ``directory_lock(self.path)``."""
+        vocabulary = sorted({term for segment in segments for term in segment.terms})
+        global_ids = {term: index for index, term in enumerate(vocabulary)}
+
+        dates = np.concatenate([np.asarray(segment.dates) for segment in segments])
+        order = np.argsort(dates, kind="stable")
+        renumber = np.empty_like(order)
+        renumber[order] = np.arange(len(order))
+
+        term_columns, doc_columns = [], []
+        base = 0
+        for segment in segments:
+            local_to_global = np.array([global_ids[term] for term in segment.terms], dtype=np.int64)
+            lengths = np.diff(np.asarray(segment.offsets))
+            term_columns.append(np.repeat(local_to_global, lengths))
+            doc_columns.append(renumber[np.asarray(segment.postings, dtype=np.int64) + base])
+            base += len(segment)
+        terms = np.concatenate(term_columns)
+        docs = np.concatenate(doc_columns)
+        by_term = np.lexsort((docs, terms))
+        terms, docs = terms[by_term], docs[by_term]
+
+        name = f"segment-{self.manifest['next_segment']:06d}"
+        tmp_path = build_directory(self.path / name)
+
+        doc_offsets = [0]
+        with open(tmp_path / "docs.jsonl", "wb") as f:
+            locations = [(segment, number) for segment in segments for number in range(len(segment))]
+            for position in order:
+                segment, number = locations[position]
+                line = segment._docs[int(segment.doc_offsets[number]):int(segment.doc_offsets[number + 1])]
+                f.write(line)
+                doc_offsets.append(doc_offsets[-1] + len(line))
+
+        offsets = np.searchsorted(terms, np.arange(len(vocabulary) + 1), side="left").astype(np.int64)
+        _write_array(tmp_path / "dates.npy", dates[order].astype(np.int32))
+        _write_array(tmp_path / "offsets.npy", offsets)
+        _write_array(tmp_path / "postings.npy", docs.astype(np.int32))
+        _write_array(tmp_path / "doc_offsets.npy", np.array(doc_offsets, dtype=np.int64))
+        with open(tmp_path / "terms.json", "w", encoding="utf-8") as f:
+            json.dump(vocabulary, f)
+        os.replace(tmp_path, self.path / name)
+
+        old_segments = self.manifest["segments"]
+        self._reload()
+        self.manifest["segments"] = [name]
+        self.manifest["next_segment"] += 1
+        self.manifest["generation"] += 1
+        self._save_manifest()
+        for old in old_segments:
+            shutil.rmtree(self.path / old, ignore_errors=True)
+
+    def search(
+        self,
+        query: str,
+        since: Optional[date] = None,
+        until: Optional[date] = None,
+        limit: int = 10,
+    ) -> List[Dict[str, Any]]:
+        """Return the papers best matching ``query`` published in ``[since, until]``.
+
+        Papers are ranked by the number of distinct query terms they contain,
+        then by recency. When a paper appears in several segments the most
+        recently ingested copy wins.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        candidates = []
+        for segment_number, segment in enumerate(self.segments):
+            low, high = segment.doc_range(since, until)
+            if low >= high:
+                continue
+            hits = []
+            for term in terms:
+                postings = segment.term_postings(term)
+                start = np.searchsorted(postings, low, side="left")
+                end = np.searchsorted(postings, high, side="left")
+                hits.append(np.asarray(postings[start:end]))
+            hits = np.concatenate(hits)
+            if not len(hits):
+                continue
+            numbers, counts = np.unique(hits, return_counts=True)
+            # Later document numbers are more recent within a segment
+            best = np.lexsort((numbers, counts))[::-1][:limit]
+            for position in best:
+                number = int(numbers[position])
+                candidates.append((int(counts[position]), int(segment.dates[number]), segment_number, segment, number))
+
+        candidates.sort(key=lambda candidate: candidate[:3], reverse=True)
+        results, seen = [], set()
+        for matched, _, _, segment, number in candidates:
+            paper = segment.doc(number)
+            if paper["id"] in seen:
+                continue
+            seen.add(paper["id"])
+            paper["matched_terms"] = matched
+            results.append(paper)
+            if len(results) == limit:
+                break
+        return results
+
+
+_paper_index: Optional[PaperIndex] = None
+
+
+def get_paper_index() -> Optional[PaperIndex]:
+    """Return the process-wide paper index, or ``None`` if nothing is ingested."""
+    global _paper_index
+    if _paper_index is None:
+        index_dir = cache_path("paper_index", "manifest.json").parent
+        if not (index_dir / "manifest.json").exists():
+            return None
+        _paper_index = PaperIndex(index_dir)
+    return _paper_index if _paper_index.manifest["segments"] else None
+
+
+def summarize_papers(papers: List[Dict[str, Any]], limit: int = 4) -> List[str]:
+    """Return the most common arXiv categories among ``papers``."""
+    counts = Counter(category for paper in papers for category in paper.get("categories", []))
+    return [f"{category} ({count} recent papers)" for category, count in counts.most_common(limit)]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point for ingesting and querying the paper index."""
+    parser = argparse.ArgumentParser(description="Local arXiv paper corpus index")
+    parser.add_argument("--index", help="Index directory (defaults to the cache directory)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser("ingest", help="Ingest one or more metadata JSONL dumps")
+    ingest.add_argument("dumps", nargs="+")
+    search = commands.add_parser("search", help="Query the index")
+    search.add_argument("query")
+    search.add_argument("--timeframe", default="", help="e.g. 'last 3 months' or 'since 2024-01-01'")
+    search.add_argument("--limit", type=int, default=10)
+    commands.add_parser("compact", help="Merge all segments into one")
+    args = parser.parse_args(argv)
+
+    index = PaperIndex(args.index)
+    if args.command == "ingest":
+        for dump in args.dumps:
+            start = time.perf_counter()
+            added = index.ingest(dump)
+            print(f"{dump}: {added:,} papers added in {time.perf_counter() - start:.1f}s")
+        print(f"Index holds {len(index):,} papers in {len(index.manifest['segments'])} segments")
+    elif args.command == "search":
+        start = time.perf_counter()
+        papers = index.search(args.query, since=parse_timeframe(args.timeframe), limit=args.limit)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        for paper in papers:
+            print(f"{paper['date']}  {paper['id']}  {paper['title']}")
+        print(f"{len(papers)} results in {elapsed_ms:.1f} ms")
+    elif args.command == "compact":
+        index.compact()
+        print(f"Compacted into {len(index.manifest['segments'])} segment(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
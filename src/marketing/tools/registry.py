@@ -0,0 +1,124 @@
+"""
+Process-wide registry of the tools available to the crew's agents.
+
+Each tool is created lazily, the first time any agent asks for it, and the
+same instance is shared by every agent and crew in the process. Agents
+declare the subset they need by name under ``tools`` in ``agents.yaml``, so
+each agent's prompt only describes the tools it can actually use. Tools that
+call paid web APIs serve repeated requests from ``marketing.tools.http_cache``
+and share the process-wide limiters in ``marketing.rate_limits``; every tool
+call is timed by ``marketing.instrumentation``.
+"""
+
+import threading
+from typing import Callable, Dict, Iterable, List
+
+from crewai.tools import BaseTool
+
+from marketing.instrumentation import instrument_tool
+from marketing.rate_limits import rate_limited
+from marketing.tools.http_cache import checked_scrape_tool, http_cached
+
+DRAFTS_DIR = "resources/drafts"
+
+
+def _serper_dev_tool() -> BaseTool:
+    from crewai_tools import SerperDevTool
+    return http_cached(rate_limited(SerperDevTool, "serper"), "serper")()
+
+
+def _scrape_website_tool() -> BaseTool:
+    from crewai_tools import ScrapeWebsiteTool
+    return http_cached(rate_limited(checked_scrape_tool(ScrapeWebsiteTool), "scrape"), "scrape")()
+
+
+def _directory_read_tool() -> BaseTool:
+    from crewai_tools import DirectoryReadTool
+    return DirectoryReadTool(DRAFTS_DIR)
+
+
+def _file_writer_tool() -> BaseTool:
+    from crewai_tools import FileWriterTool
+    return FileWriterTool()
+
+
+def _file_read_tool() -> BaseTool:
+    from crewai_tools import FileReadTool
+    return FileReadTool()
+
+
+def _arxiv_paper_tool() -> BaseTool:
+    from crewai_tools import ArxivPaperTool
+    return ArxivPaperTool()
+
+
+def _linkedin_post_analyzer() -> BaseTool:
+    from marketing.tools.custom_tool import LinkedInPostAnalyzer
+    return LinkedInPostAnalyzer()
+
+
+def _research_topic_analyzer() -> BaseTool:
+    from marketing.tools.custom_tool import ResearchTopicAnalyzer
+    return ResearchTopicAnalyzer()
+
+
+def _resume_optimizer() -> BaseTool:
+    from marketing.tools.custom_tool import ResumeOptimizer
+    return ResumeOptimizer()
+
+
+def _innovation_tracker() -> BaseTool:
+    from marketing.tools.custom_tool import InnovationTracker
+    return InnovationTracker()
+
+
+def _research_paper_analyzer() -> BaseTool:
+    from marketing.tools.custom_tool import ResearchPaperAnalyzer
+    return ResearchPaperAnalyzer()
+
+
+def _ai_ml_image_generator() -> BaseTool:
+    from marketing.tools.custom_tool import AIMLImageGenerator
+    return AIMLImageGenerator()
+
+
+TOOL_FACTORIES: Dict[str, Callable[[], BaseTool]] = {
+    "serper_dev_tool": _serper_dev_tool,
+    "scrape_website_tool": _scrape_website_tool,
+    "directory_read_tool": _directory_read_tool,
+    "file_writer_tool": _file_writer_tool,
+    "file_read_tool": _file_read_tool,
+    "arxiv_paper_tool": _arxiv_paper_tool,
+    "linkedin_post_analyzer": _linkedin_post_analyzer,
+    "research_topic_analyzer": _research_topic_analyzer,
+    "resume_optimizer": _resume_optimizer,
+    "innovation_tracker": _innovation_tracker,
+    "research_paper_analyzer": _research_paper_analyzer,
+    "ai_ml_image_generator": _ai_ml_image_generator,
+}
+
+_tools: Dict[str, BaseTool] = {}
+_tools_lock = threading.Lock()
+
+
+def get_tool(name: str) -> BaseTool:
+    """Return the shared instance of the tool registered as ``name``."""
+    tool = _tools.get(name)
+    if tool is None:
+        if name not in TOOL_FACTORIES:
+            raise KeyError(f"Unknown tool '{name}'. Registered tools: {', '.join(sorted(TOOL_FACTORIES))}")
+        with _tools_lock:
+            tool = _tools.get(name)
+            if tool is None:
+                tool = _tools[name] = instrument_tool(TOOL_FACTORIES[name](), name)
+    return tool
+
+
+def get_tools(names: Iterable[str]) -> List[BaseTool]:
+    """Return the shared instances of the tools registered as ``names``."""
+    return [get_tool(name) for name in names]
+
+
+def loaded_tools() -> Dict[str, BaseTool]:
+    """Return the tools created so far in this process, by name."""
+    return dict(_tools)
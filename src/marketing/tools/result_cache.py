@@ -0,0 +1,247 @@
+"""
+Content-addressed result cache for deterministic tools.
+
+Tools that are pure functions of their arguments subclass ``CachedTool``. Each
+call is keyed on a hash of the tool name, the tool's ``cache_version`` and the
+call arguments. Hot entries are served from an in-memory LRU; every entry is
+also persisted to a local SQLite store so results survive across runs. The
+store is bounded by entry count, total size and age.
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, ClassVar, Dict, Optional, Union
+
+from crewai.tools import BaseTool
+
+from marketing.storage import cache_path
+
+DEFAULT_MEMORY_ENTRIES = 1024
+DEFAULT_MAX_ENTRIES = 50_000
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_AGE_SECONDS = 30 * 24 * 3600
+
+# Eviction is checked once every this many writes
+_EVICTION_INTERVAL = 100
+
+_MISSING = object()
+
+
+def tool_cache_key(tool_name: str, version: str, arguments: Dict[str, Any]) -> str:
+    """Return the content address of a tool call."""
+    payload = json.dumps(
+        {"tool": tool_name, "version": version, "arguments": arguments},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Two-level (memory LRU + SQLite) cache of JSON-serializable results."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS,
+    ):
+        self.path = Path(path)
+        self.memory_entries = memory_entries
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+            " created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the cached value for ``key`` or ``default``."""
+        with self._lock:
+            value = self._memory.get(key, _MISSING)
+            if value is not _MISSING:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                self.memory_hits += 1
+                return value
+
+            now = time.time()
+            row = self._db.execute(
+                "SELECT value, created FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.max_age_seconds:
+                self.misses += 1
+                return default
+
+            self._db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            value = json.loads(row[0])
+            self._remember(key, value)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Store ``value`` under ``key`` in memory and on disk."""
+        encoded = json.dumps(value)
+        now = time.time()
+        with self._lock:
+            self._remember(key, value)
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, encoded, len(encoded), now, now),
+            )
+            self._writes += 1
+            if self._writes % _EVICTION_INTERVAL == 0:
+                self._evict(now)
+
+    def evict(self) -> None:
+        """Drop expired entries and enforce the size limits now."""
+        with self._lock:
+            self._evict(time.time())
+
+    def clear(self) -> None:
+        """Remove every entry from memory and disk."""
+        with self._lock:
+            self._memory.clear()
+            self._db.execute("DELETE FROM entries")
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters and store size."""
+        with self._lock:
+            entries, total_bytes = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.hits - self.memory_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": entries,
+                "bytes": total_bytes,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _remember(self, key: str, value: Any) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self, now: float) -> None:
+        self._db.execute("DELETE FROM entries WHERE created < ?", (now - self.max_age_seconds,))
+        entries, total_bytes = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        if entries <= self.max_entries and total_bytes <= self.max_bytes:
+            return
+
+        # Drop least recently used entries until both limits hold
+        excess_bytes = total_bytes - self.max_bytes
+        excess_entries = entries - self.max_entries
+        dropped_bytes = dropped_entries = 0
+        stale = []
+        for key, size in self._db.execute("SELECT key, size FROM entries ORDER BY accessed"):
+            if dropped_bytes >= excess_bytes and dropped_entries >= excess_entries:
+                break
+            stale.append((key,))
+            dropped_bytes += size
+            dropped_entries += 1
+        self._db.executemany("DELETE FROM entries WHERE key = ?", stale)
+        for (key,) in stale:
+            self._memory.pop(key, None)
+
+
+_result_cache: Optional[ResultCache] = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """Return the process-wide tool result cache."""
+    global _result_cache
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                _result_cache = ResultCache(cache_path("tool_results.sqlite"))
+    return _result_cache
+
+
+def tool_cache_metrics() -> Dict[str, float]:
+    """Return the tool cache counters as run metrics."""
+    if _result_cache is None:
+        return {}
+    stats = _result_cache.stats()
+    return {
+        "tool_cache_hits": stats["hits"],
+        "tool_cache_misses": stats["misses"],
+        "tool_cache_hit_rate": stats["hit_rate"],
+        "tool_cache_entries": stats["entries"],
+    }
+
+
+def _cached_run(run):
+    signature = inspect.signature(run)
+
+    @functools.wraps(run)
+    def cached_run(self, *args, **kwargs):
+        if not self.cache_results:
+            return run(self, *args, **kwargs)
+
+        # Positional and keyword calls with the same values share one entry
+        arguments = signature.bind(self, *args, **kwargs).arguments
+        arguments.pop(next(iter(signature.parameters)))
+
+        cache = get_result_cache()
+        key = tool_cache_key(self.name, self.cache_version, dict(arguments))
+        result = cache.get(key, _MISSING)
+        if result is _MISSING:
+            result = run(self, *args, **kwargs)
+            cache.put(key, result)
+        return result
+
+    return cached_run
+
+
+class CachedTool(BaseTool):
+    """Base class for tools whose output depends only on their arguments.
+
+    The ``_run`` of every subclass is wrapped with the shared result cache.
+    Bump ``cache_version`` whenever a tool's output for the same arguments
+    changes, so stale entries stop matching.
+    """
+
+    cache_version: ClassVar[str] = "1"
+    cache_results: bool = True
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs: Any) -> None:
+        super().__pydantic_init_subclass__(**kwargs)
+        if "_run" in cls.__dict__:
+            cls._run = _cached_run(cls.__dict__["_run"])
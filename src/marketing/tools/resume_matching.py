@@ -0,0 +1,111 @@
+"""
+Matrix scoring of resume variants against job descriptions.
+
+Both sides are turned into hashed TF-IDF vectors (unigrams and bigrams hashed
+into a fixed number of columns, so no vocabulary has to be kept). Every
+resume/job pair is then scored with a single sparse matrix product, and the
+top-k jobs are selected per resume.
+"""
+
+import re
+import zlib
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from scipy import sparse
+
+DEFAULT_N_FEATURES = 2 ** 18
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+
+def _terms(text: str) -> List[str]:
+    tokens = _TOKEN_PATTERN.findall(text.lower())
+    return tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+
+
+class HashedTfidfVectorizer:
+    """Hashed TF-IDF vectorizer with sublinear term frequency and L2 norm."""
+
+    def __init__(self, n_features: int = DEFAULT_N_FEATURES):
+        self.n_features = n_features
+        self.idf: Optional[np.ndarray] = None
+
+    def _counts(self, documents: Sequence[str]) -> sparse.csr_matrix:
+        indptr = [0]
+        indices: List[int] = []
+        for document in documents:
+            # crc32 keeps column assignment stable across processes
+            indices.extend(zlib.crc32(term.encode("utf-8")) % self.n_features for term in _terms(document))
+            indptr.append(len(indices))
+        data = np.ones(len(indices), dtype=np.float32)
+        counts = sparse.csr_matrix(
+            (data, np.asarray(indices, dtype=np.int64), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(documents), self.n_features),
+        )
+        counts.sum_duplicates()
+        return counts
+
+    def fit(self, documents: Sequence[str]) -> "HashedTfidfVectorizer":
+        """Learn inverse document frequencies from ``documents``."""
+        counts = self._counts(documents)
+        document_frequency = np.bincount(counts.indices, minlength=self.n_features)
+        self.idf = (np.log((1 + counts.shape[0]) / (1 + document_frequency)) + 1).astype(np.float32)
+        return self
+
+    def transform(self, documents: Sequence[str]) -> sparse.csr_matrix:
+        """Return L2-normalized TF-IDF rows for ``documents``."""
+        if self.idf is None:
+            raise ValueError("HashedTfidfVectorizer must be fitted before transform")
+        matrix = self._counts(documents)
+        matrix.data = (1 + np.log(matrix.data)) * self.idf[matrix.indices]
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return sparse.csr_matrix(sparse.diags(1 / norms) @ matrix)
+
+
+def score_matrix(resumes: Sequence[str], job_descriptions: Sequence[str], n_features: int = DEFAULT_N_FEATURES) -> sparse.csr_matrix:
+    """Return the sparse cosine-similarity matrix of resumes x job descriptions.
+
+    IDF weights are learned from both sides together so terms common to every
+    document contribute little to any pair.
+    """
+    vectorizer = HashedTfidfVectorizer(n_features).fit(list(resumes) + list(job_descriptions))
+    return (vectorizer.transform(resumes) @ vectorizer.transform(job_descriptions).T).tocsr()
+
+
+def top_k_matches(scores: sparse.csr_matrix, top_k: int) -> List[List[tuple]]:
+    """Return the ``top_k`` ``(column, score)`` pairs of every row, best first."""
+    matches = []
+    for row in range(scores.shape[0]):
+        start, end = scores.indptr[row], scores.indptr[row + 1]
+        columns, values = scores.indices[start:end], scores.data[start:end]
+        if len(values) > top_k:
+            keep = np.argpartition(-values, top_k - 1)[:top_k]
+            columns, values = columns[keep], values[keep]
+        order = np.argsort(-values, kind="stable")
+        matches.append([(int(columns[i]), float(values[i])) for i in order])
+    return matches
+
+
+def rank_resume_matches(
+    resumes: Sequence[str],
+    job_descriptions: Sequence[str],
+    top_k: int = 5,
+    resume_ids: Optional[Sequence[Any]] = None,
+    job_ids: Optional[Sequence[Any]] = None,
+) -> List[Dict[str, Any]]:
+    """Rank job descriptions for every resume by hashed TF-IDF cosine similarity."""
+    resume_ids = list(resume_ids) if resume_ids is not None else list(range(len(resumes)))
+    job_ids = list(job_ids) if job_ids is not None else list(range(len(job_descriptions)))
+    if not resumes or not job_descriptions:
+        return [{"resume": resume_id, "matches": []} for resume_id in resume_ids]
+
+    matches = top_k_matches(score_matrix(resumes, job_descriptions), top_k)
+    return [
+        {
+            "resume": resume_id,
+            "matches": [{"job": job_ids[column], "score": round(score, 4)} for column, score in row],
+        }
+        for resume_id, row in zip(resume_ids, matches)
+    ]